@@ -0,0 +1,445 @@
+# benchmarks/bench.py
+"""
+Benchmark suite: pinned scenarios over synthetic bug corpora, results as JSON.
+
+    python benchmarks/bench.py                          # 1k / 100k / 1m bugs, every scenario
+    python benchmarks/bench.py --sizes 1k,100k --out bench.json
+    python benchmarks/bench.py --sizes 1k --compare bench.json
+
+Scenarios (per corpus size):
+- route:     rule_route latency per question
+- analytics: analytics_dispatch latency per question
+- lookup:    lookup_dispatch latency per question
+- reports:   bugs_to_df + analytics_reports build time
+- index:     build_chroma_collection throughput (first build, into a new collection) and re-sync time
+- query:     collection.query latency (one question per call, and one batched call)
+- answer:    answer_question latency on RAG questions
+
+Corpora come from qa_rag.synthetic (seeded, written to a temporary CSV and
+read back through the normal ingest path). Runs offline: the LLM is a stub
+that cites the first retrieved bug, and embeddings come from a deterministic
+hashing embedder unless --embedder model (the configured sentence-transformers
+model). The vector store lives in the same temporary directory, removed at
+exit unless --keep.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+SCENARIOS = ("route", "analytics", "lookup", "reports", "index", "query", "answer")
+
+# Timing metrics: *_ms / *_s lower is better, *_per_s higher is better (see compare)
+REGRESSION_TOLERANCE = 0.2
+
+ROUTE_QUESTIONS = [
+    "How many open bugs by component?",
+    "What are the critical bugs for all bugs?",
+    "Show details for BUG-100042.",
+    "What is the average resolution time (days) by component for closed bugs?",
+    "Give me a release readiness summary: total open bugs, total critical (P0) open bugs, and top risky components.",
+    "Is there a known bug where Apple Pay succeeds but order stays pending?",
+    "App is slow sometimes and feels buggy?",
+    "p90 time to close for Payments",
+]
+
+ANALYTICS_QUESTIONS = [
+    "How many open bugs by component?",
+    "How many open bugs for payments?",
+    "What are the critical bugs for all bugs?",
+    "What are the closed bugs for component Payments?",
+    "What is the average resolution time (days) by component for closed bugs?",
+    "median resolution time for Checkout",
+    "Give me a release readiness summary: total open bugs, total critical (P0) open bugs, and top risky components.",
+]
+
+RAG_QUESTIONS = [
+    "Is there a known bug where Apple Pay succeeds but order stays pending?",
+    "Which bug makes the checkout button stay disabled on iOS?",
+    "Why does login fail with invalid token after relaunch?",
+    "Known issue with push notifications not arriving on Android?",
+    "Is there a known bug where search results show duplicates after filters?",
+]
+
+# Bug positions (fractions of the corpus) looked up by id
+LOOKUP_POSITIONS = [0.0, 0.25, 0.5, 0.75, 0.999]
+
+
+# -------------------------
+# Offline stand-ins (embedder, LLM)
+# -------------------------
+def hashing_embedder(dim: int = 384):
+    """
+    EmbeddingService that hashes tokens into a bag-of-words vector: no model,
+    no network, same vector for the same text.
+    """
+    from qa_rag.embeddings import EmbeddingService
+    from qa_rag.lexical import tokenize
+
+    class HashingEmbeddingService(EmbeddingService):
+        def __init__(self):
+            super().__init__(model_name=f"hashing-{dim}")
+
+        def encode(self, texts: list[str]) -> np.ndarray:
+            out = np.zeros((len(texts), dim), dtype=np.float32)
+            for row, text in enumerate(texts):
+                for token in tokenize(text):
+                    h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+                    out[row, h % dim] += 1.0
+                if not out[row].any():
+                    out[row, 0] = 1.0
+            return out
+
+    return HashingEmbeddingService()
+
+
+def use_embedding_service(service) -> None:
+    # Every module that resolves the shared service gets this one
+    from qa_rag import chroma_store, embeddings
+
+    embeddings.get_embedding_service = lambda: service
+    chroma_store.get_embedding_service = lambda: service
+
+
+def stub_llm(prompt: str, **kwargs) -> str:
+    # Grounded answer citing the first bug of the context
+    start = prompt.find("BUG_ID: ")
+    bug_id = prompt[start + 8:].split("\n", 1)[0] if start >= 0 else "none"
+    return f"The closest match is {bug_id}.\nBug IDs used: {bug_id}"
+
+
+# -------------------------
+# Measurements
+# -------------------------
+def latency(fn, inputs, repeat: int) -> dict:
+    """
+    Calls fn(x) for every input, `repeat` times; per-call latency stats in ms.
+    """
+    samples = []
+    for _ in range(repeat):
+        for x in inputs:
+            t = time.perf_counter()
+            fn(x)
+            samples.append(time.perf_counter() - t)
+    ms = np.asarray(samples) * 1000.0
+    return {
+        "calls": len(samples),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def timed(fn):
+    t = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - t
+
+
+class Corpus:
+    """
+    One corpus size: the generated CSV, its bugs and whatever the scenarios
+    built from them (state, vector store), built on first use.
+    """
+
+    def __init__(self, size: int, seed: int, repeat: int, workdir: str):
+        from qa_rag.data import load_bugs_from_csv
+        from qa_rag.synthetic import iter_synthetic_bugs, write_bugs_csv
+
+        self.size = size
+        self.repeat = repeat
+        self.csv_path = os.path.join(workdir, f"bugs_{size}_{seed}.csv")
+        write_bugs_csv(self.csv_path, iter_synthetic_bugs(size, seed=seed))
+        self.bugs = load_bugs_from_csv(self.csv_path)
+        self.collection_name = f"bench_{size}"
+        self._state = None
+        self._collection = None
+        self._builds = itertools.count(1)
+
+    @property
+    def state(self):
+        if self._state is None:
+            from qa_rag.app import build_state_from_csv_or_memory
+
+            self._state = build_state_from_csv_or_memory(
+                bugs_in_memory=[],
+                CSV_PATH=self.csv_path,
+                collection_name=self.collection_name,
+            )
+        return self._state
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self.index()
+        return self._collection
+
+    def fresh_collection_name(self) -> str:
+        # Not indexed yet, whatever ran before
+        return f"{self.collection_name}_build{next(self._builds)}"
+
+    def index(self, collection_name: str | None = None) -> dict:
+        """
+        Builds, then re-syncs, the shared collection (or collection_name); the
+        "first build" is only one if that collection is still empty.
+        """
+        from qa_rag.chroma_store import build_chroma_collection
+
+        name = collection_name or self.collection_name
+        collection, first = timed(lambda: build_chroma_collection(self.bugs, name))
+        _, resync = timed(lambda: build_chroma_collection(self.bugs, name))
+        if name == self.collection_name:
+            self._collection = collection
+        return {
+            "vectors": collection.count(),
+            "build_s": first,
+            "bugs_per_s": self.size / first if first else 0.0,
+            "resync_s": resync,
+        }
+
+
+# -------------------------
+# Scenarios
+# -------------------------
+def bench_route(corpus: Corpus) -> dict:
+    from qa_rag.router import rule_route
+
+    return latency(rule_route, ROUTE_QUESTIONS, corpus.repeat * 100)
+
+
+def bench_analytics(corpus: Corpus) -> dict:
+    from qa_rag.results import AnswerResult
+    from qa_rag.router import analytics_dispatch, scan_question
+
+    state = corpus.state
+
+    def run(q):
+        analytics_dispatch(
+            user_question=q,
+            df=state.df,
+            open_by_component=state.open_by_component,
+            resolution_by_component=state.resolution_by_component,
+            open_critical=state.open_critical,
+            open_critical_by_component=state.open_critical_by_component,
+            cube=state.cube,
+            intent=scan_question(q),
+            component_matcher=state.component_matcher,
+            out=AnswerResult(question=q),
+        )
+
+    return latency(run, ANALYTICS_QUESTIONS, corpus.repeat)
+
+
+def bench_lookup(corpus: Corpus) -> dict:
+    from qa_rag.results import AnswerResult
+    from qa_rag.router import lookup_dispatch
+
+    store = corpus.state.store
+    ids = [corpus.bugs[int(f * (corpus.size - 1))]["id"] for f in LOOKUP_POSITIONS]
+    questions = [f"Show details for {bug_id}." for bug_id in ids] + [f"Compare {', '.join(ids)}"]
+    return latency(lambda q: lookup_dispatch(user_question=q, store=store, out=AnswerResult(question=q)), questions, corpus.repeat)
+
+
+def bench_reports(corpus: Corpus) -> dict:
+    from qa_rag.analytics import analytics_reports, bugs_to_df
+
+    df, to_df = timed(lambda: bugs_to_df(corpus.bugs))
+    _, reports = timed(lambda: analytics_reports(df))
+    return {"bugs_to_df_s": to_df, "analytics_reports_s": reports, "total_s": to_df + reports}
+
+
+def bench_index(corpus: Corpus) -> dict:
+    # query / answer may have indexed the shared collection already
+    return corpus.index(corpus.fresh_collection_name())
+
+
+def bench_query(corpus: Corpus) -> dict:
+    from qa_rag.chroma_store import embed_queries
+
+    collection = corpus.collection
+    embeddings = embed_queries(RAG_QUESTIONS)
+    include = ["documents", "metadatas", "distances"]
+    out = latency(
+        lambda e: collection.query(query_embeddings=[e], n_results=3, include=include),
+        embeddings, corpus.repeat,
+    )
+    _, batch = timed(lambda: collection.query(query_embeddings=embeddings, n_results=3, include=include))
+    out["batch_ms"] = batch * 1000.0
+    out["batch_queries"] = len(embeddings)
+    return out
+
+
+def bench_answer(corpus: Corpus) -> dict:
+    from qa_rag import app
+
+    corpus.collection  # index outside the timing
+    state = corpus.state
+    state.collection.open()  # re-sync of an indexed store: no embedding
+    app.ollama_generate = stub_llm
+
+    grounded = []
+
+    def run(q):
+        grounded.append(bool(app.answer_question(state, q, echo=False).grounded))
+
+    out = latency(run, RAG_QUESTIONS, corpus.repeat)
+    out["grounded_rate"] = sum(grounded) / len(grounded)
+    return out
+
+
+BENCHES = {
+    "route": bench_route,
+    "analytics": bench_analytics,
+    "lookup": bench_lookup,
+    "reports": bench_reports,
+    "index": bench_index,
+    "query": bench_query,
+    "answer": bench_answer,
+}
+
+
+# -------------------------
+# Compare
+# -------------------------
+def compare(current: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> list[str]:
+    """
+    Timing metrics present in both runs, as report lines; the ones more than
+    `tolerance` worse than the baseline are marked REGRESSION.
+    """
+    base = {(r["scenario"], r["size"]): r["metrics"] for r in baseline.get("results", [])}
+    lines = []
+    for r in current.get("results", []):
+        old = base.get((r["scenario"], r["size"]))
+        if old is None:
+            continue
+        for metric, value in r["metrics"].items():
+            before = old.get(metric)
+            if not before or not isinstance(value, (int, float)):
+                continue
+            if metric.endswith("_per_s"):
+                worse = before / value if value else float("inf")
+            elif metric.endswith(("_ms", "_s")):
+                worse = value / before
+            else:
+                continue
+            flag = "  REGRESSION" if worse > 1.0 + tolerance else ""
+            lines.append(f"{r['scenario']:>9} {r['size']:>8} {metric:<20} {before:12.3f} -> {value:12.3f}  x{worse:.2f}{flag}")
+    return lines
+
+
+# -------------------------
+# CLI
+# -------------------------
+def parse_sizes(text: str) -> list[int]:
+    return [SIZES[s] if s in SIZES else int(s) for s in text.lower().split(",") if s]
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,100k,1m", help="corpus sizes: 1k, 100k, 1m or bug counts (comma-separated)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="passes over each question list")
+    parser.add_argument("--embedder", choices=("hashing", "model"), default="hashing")
+    parser.add_argument("--vector-backend", choices=("chroma", "numpy"), default=None, help="default: VECTOR_BACKEND")
+    parser.add_argument("--out", default="-", help="JSON results file ('-': stdout)")
+    parser.add_argument("--compare", default=None, help="baseline JSON; prints the change of every timing metric")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary directory (CSVs, vector store)")
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = [s for s in scenarios if s not in BENCHES]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    if args.keep:
+        workdir = tempfile.mkdtemp(prefix="qa_rag_bench_")
+        print(f"[bench] keeping {workdir}", file=sys.stderr)
+        return run(args, scenarios, workdir)
+    with tempfile.TemporaryDirectory(prefix="qa_rag_bench_", ignore_cleanup_errors=True) as workdir:
+        return run(args, scenarios, workdir)
+
+
+def run(args, scenarios: list[str], workdir: str) -> int:
+    # Read by qa_rag at import: isolated store, no caches that would turn repeats into hits
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    os.environ.setdefault("CHROMA_PATH", os.path.join(workdir, "chroma"))
+    os.environ.setdefault("EMBED_CACHE_PATH", "")
+    os.environ.setdefault("SEMANTIC_CACHE_SIZE", "0")
+    os.environ.setdefault("QUERY_EMBED_CACHE_SIZE", "0")
+    if args.vector_backend:
+        os.environ["VECTOR_BACKEND"] = args.vector_backend
+
+    if args.embedder == "hashing":
+        use_embedding_service(hashing_embedder())
+    from qa_rag import retrieval, vector_store
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "embedder": args.embedder,
+            "vector_backend": vector_store.VECTOR_BACKEND,
+            "retrieval_mode": retrieval.RETRIEVAL_MODE,
+        },
+        "results": [],
+    }
+    for size in parse_sizes(args.sizes):
+        corpus = Corpus(size, args.seed, args.repeat, workdir)
+        for scenario in scenarios:
+            metrics = BENCHES[scenario](corpus)
+            report["results"].append({"scenario": scenario, "size": size, "metrics": metrics})
+            print(f"[bench] {scenario:>9} {size:>8}: " + ", ".join(
+                f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in metrics.items()
+            ), file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out == "-":
+        print(text)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            lines = compare(report, json.load(f))
+        print("\n".join(lines), file=sys.stderr)
+        return 1 if any(line.endswith("REGRESSION") for line in lines) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
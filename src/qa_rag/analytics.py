@@ -57,8 +57,18 @@
 #     return open_by_component, resolution_by_component, open_critical, open_critical_by_component
 
 
+import os
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 
+from .sketches import QuantileSketch
+
+
+# Optional: percentiles from per-component quantile sketches instead of raw values
+USE_QUANTILE_SKETCH = os.getenv("ANALYTICS_QUANTILE_SKETCH", "0") == "1"
+
 
 # -------------------------
 # Build DF from bugs
@@ -83,6 +93,11 @@ def bugs_to_df(bugs):
 # Normalization helpers
 # -------------------------
 def _norm_series(s: pd.Series) -> pd.Series:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # normalize the (few) categories once, then expand by code; code -1 (missing) -> ""
+        cats = pd.Index(s.cat.categories).astype(str).str.strip().str.lower()
+        lookup = np.append(cats.to_numpy(dtype=object), "")
+        return pd.Series(lookup[s.cat.codes.to_numpy()], index=s.index)
     return s.fillna("").astype(str).str.strip().str.lower()
 
 
@@ -122,7 +137,7 @@ def apply_filters(
 # -------------------------
 def bugs_count_by_component(df: pd.DataFrame, count_col_name: str = "bugs") -> pd.DataFrame:
     return (
-        df.groupby("component", dropna=False)["id"]
+        df.groupby("component", dropna=False, observed=True)["id"]
         .count()
         .sort_values(ascending=False)
         .rename(count_col_name)
@@ -133,7 +148,7 @@ def bugs_count_by_component(df: pd.DataFrame, count_col_name: str = "bugs") -> p
 def bugs_count_by_severity(df: pd.DataFrame, count_col_name: str = "bugs") -> pd.DataFrame:
     # keep severity normalized but show original value; simplest: use current column as-is
     return (
-        df.groupby("severity", dropna=False)["id"]
+        df.groupby("severity", dropna=False, observed=True)["id"]
         .count()
         .sort_values(ascending=False)
         .rename(count_col_name)
@@ -141,13 +156,18 @@ def bugs_count_by_severity(df: pd.DataFrame, count_col_name: str = "bugs") -> pd
     )
 
 
-def resolution_time_by_component(df: pd.DataFrame) -> pd.DataFrame:
+def resolution_time_by_component(df: pd.DataFrame, use_sketch: bool | None = None) -> pd.DataFrame:
+    if use_sketch is None:
+        use_sketch = USE_QUANTILE_SKETCH
+    if use_sketch:
+        return resolution_frame_from_sketches(resolution_sketches_by_component(df))
+
     closed = df[~df["is_open"]].dropna(subset=["resolution_days"]).copy()
     if closed.empty:
-        return pd.DataFrame(columns=["component", "closed_bugs", "median_days", "avg_days", "p75_days", "p90_days"])
+        return pd.DataFrame(columns=RESOLUTION_COLUMNS)
 
     return (
-        closed.groupby("component")["resolution_days"]
+        closed.groupby("component", observed=True)["resolution_days"]
         .agg(
             closed_bugs="count",
             median_days="median",
@@ -160,6 +180,61 @@ def resolution_time_by_component(df: pd.DataFrame) -> pd.DataFrame:
     )
 
 
+# -------------------------
+# Sketch-backed resolution percentiles
+# -------------------------
+RESOLUTION_COLUMNS = ["component", "closed_bugs", "median_days", "avg_days", "p75_days", "p90_days"]
+
+
+def resolution_sketches_by_component(df: pd.DataFrame) -> dict[str, QuantileSketch]:
+    """
+    One small QuantileSketch of resolution_days per component (closed bugs only).
+    Sketches from different windows/datasets combine with merge_resolution_sketches.
+    """
+    closed = df[~df["is_open"]].dropna(subset=["resolution_days"])
+    sketches: dict[str, QuantileSketch] = {}
+    for comp, days in closed.groupby("component", observed=True)["resolution_days"]:
+        sketch = QuantileSketch()
+        sketch.update_many(days.to_numpy())
+        sketches[comp] = sketch
+    return sketches
+
+
+def merge_resolution_sketches(*parts: dict[str, QuantileSketch]) -> dict[str, QuantileSketch]:
+    merged: dict[str, QuantileSketch] = {}
+    for part in parts:
+        for comp, sketch in part.items():
+            if comp not in merged:
+                merged[comp] = QuantileSketch(k=sketch.k)
+            merged[comp].merge(sketch)
+    return merged
+
+
+def resolution_frame_from_sketches(sketches: dict[str, QuantileSketch]) -> pd.DataFrame:
+    """
+    Same columns as resolution_time_by_component, answered from the summaries only.
+    """
+    rows = [
+        {
+            "component": comp,
+            "closed_bugs": s.count,
+            "median_days": s.quantile(0.5),
+            "avg_days": s.mean,
+            "p75_days": s.quantile(0.75),
+            "p90_days": s.quantile(0.90),
+        }
+        for comp, s in sorted(sketches.items(), key=lambda kv: str(kv[0]))
+        if s.count
+    ]
+    if not rows:
+        return pd.DataFrame(columns=RESOLUTION_COLUMNS)
+    return (
+        pd.DataFrame(rows, columns=RESOLUTION_COLUMNS)
+        .sort_values(by="median_days", ascending=False)
+        .reset_index(drop=True)
+    )
+
+
 def bugs_list_view(df: pd.DataFrame) -> pd.DataFrame:
     cols = ["id", "title", "component", "severity", "created_date", "closed_date", "resolution_days", "is_open"]
     cols = [c for c in cols if c in df.columns]
@@ -187,3 +262,147 @@ def analytics_reports(df):
     open_critical_by_component = bugs_count_by_component(open_critical, count_col_name="open_critical_bugs")
 
     return open_by_component, resolution_by_component, open_critical, open_critical_by_component
+
+
+# -------------------------
+# Aggregate cube (status x component x severity)
+# -------------------------
+STATUS_INDEX = {"open": 0, "closed": 1}
+
+
+@dataclass
+class AggregateCube:
+    """
+    Dense counts over status x component x severity, built once per dataset.
+    Count/breakdown questions slice this (O(components x severities)) instead of scanning rows.
+
+    - counts[status, c, s]: number of bugs (status 0=open, 1=closed)
+    - resolution_sum[c, s] / resolution_count[c, s]: closed bugs with a known resolution_days
+    Component/severity labels are kept as in the data; None is the missing-value slot.
+    """
+    components: list
+    severities: list
+    counts: np.ndarray
+    resolution_sum: np.ndarray
+    resolution_count: np.ndarray
+
+    def _axis_mask(self, labels: list, value: str | None) -> np.ndarray:
+        if value is None:
+            return np.ones(len(labels), dtype=bool)
+        v = value.strip().lower()
+        return np.array([lab is not None and str(lab).strip().lower() == v for lab in labels], dtype=bool)
+
+    def _status_slice(self, status: str | None) -> np.ndarray:
+        if status:
+            st = STATUS_INDEX.get(status.strip().lower())
+            if st is not None:
+                return self.counts[st]
+        return self.counts.sum(axis=0)
+
+    def count(self, status: str | None = None, component: str | None = None, severity: str | None = None) -> int:
+        view = self._status_slice(status)
+        view = view[self._axis_mask(self.components, component)]
+        view = view[:, self._axis_mask(self.severities, severity)]
+        return int(view.sum())
+
+    def by_component(self, status: str | None = None, severity: str | None = None, component: str | None = None) -> pd.Series:
+        """
+        Counts per component (alphabetical, non-zero only, missing component dropped),
+        i.e. what df.groupby("component")["id"].count() returns for the same filter.
+        """
+        view = self._status_slice(status)[:, self._axis_mask(self.severities, severity)].sum(axis=1)
+        keep = (view > 0) & self._axis_mask(self.components, component)
+        labels = [lab for lab, k in zip(self.components, keep) if k and lab is not None]
+        values = [int(v) for lab, v, k in zip(self.components, view, keep) if k and lab is not None]
+        return pd.Series(values, index=pd.Index(labels, name="component"), dtype="int64")
+
+    def by_severity(self, status: str | None = None, component: str | None = None) -> pd.Series:
+        view = self._status_slice(status)[self._axis_mask(self.components, component)].sum(axis=0)
+        labels = [lab for lab, v in zip(self.severities, view) if v > 0 and lab is not None]
+        values = [int(v) for lab, v in zip(self.severities, view) if v > 0 and lab is not None]
+        return pd.Series(values, index=pd.Index(labels, name="severity"), dtype="int64")
+
+    def avg_resolution_days(self, component: str | None = None, severity: str | None = None) -> float | None:
+        cm = self._axis_mask(self.components, component)
+        sm = self._axis_mask(self.severities, severity)
+        n = int(self.resolution_count[cm][:, sm].sum())
+        if n == 0:
+            return None
+        return float(self.resolution_sum[cm][:, sm].sum()) / n
+
+    # -------------------------
+    # Incremental updates (one bug at a time)
+    # -------------------------
+    def add_bug(self, bug: dict, sign: int = 1) -> None:
+        """
+        Adds (sign=1) or removes (sign=-1) one bug's counts; `bug` has the
+        BugStore.record keys. A component / severity not seen yet gets its own
+        slot (alphabetical position, like a rebuild would give it).
+        """
+        c = self._label_slot("components", bug.get("component"))
+        s = self._label_slot("severities", bug.get("severity"))
+        closed = pd.to_datetime(bug.get("closed_date"), errors="coerce")
+        if pd.isna(closed):
+            self.counts[0, c, s] += sign
+            return
+        self.counts[1, c, s] += sign
+        created = pd.to_datetime(bug.get("created_date"), errors="coerce")
+        if not pd.isna(created):
+            self.resolution_sum[c, s] += sign * (closed - created).total_seconds() / 86400
+            self.resolution_count[c, s] += sign
+
+    def _label_slot(self, axis: str, label) -> int:
+        labels = getattr(self, axis)
+        if label in labels:
+            return labels.index(label)
+        # None (missing) stays last; other labels keep sorted order
+        i = len(labels) if label is None else sum(1 for lab in labels if lab is not None and str(lab) < str(label))
+        labels.insert(i, label)
+        if axis == "components":
+            self.counts = np.insert(self.counts, i, 0, axis=1)
+            self.resolution_sum = np.insert(self.resolution_sum, i, 0, axis=0)
+            self.resolution_count = np.insert(self.resolution_count, i, 0, axis=0)
+        else:
+            self.counts = np.insert(self.counts, i, 0, axis=2)
+            self.resolution_sum = np.insert(self.resolution_sum, i, 0, axis=1)
+            self.resolution_count = np.insert(self.resolution_count, i, 0, axis=1)
+        return i
+
+
+def _axis_codes(s: pd.Series) -> tuple[np.ndarray, list]:
+    # Categorical codes when the store already has them, else factorize (sorted, like groupby)
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes = s.cat.codes.to_numpy().astype(np.int64)
+        labels = list(s.cat.categories)
+    else:
+        codes, uniques = pd.factorize(s, sort=True)
+        codes = codes.astype(np.int64)
+        labels = list(uniques)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(labels), codes)
+        labels.append(None)
+    return codes, labels
+
+
+def build_aggregate_cube(df: pd.DataFrame) -> AggregateCube:
+    comp_codes, components = _axis_codes(df["component"])
+    sev_codes, severities = _axis_codes(df["severity"])
+    n_comp, n_sev = len(components), len(severities)
+
+    status = (~df["is_open"].to_numpy(dtype=bool)).astype(np.int64)
+    cell = comp_codes * n_sev + sev_codes
+
+    counts = np.bincount(status * n_comp * n_sev + cell, minlength=2 * n_comp * n_sev)
+
+    res = df["resolution_days"].to_numpy(dtype=float)
+    has_res = (status == 1) & ~np.isnan(res)
+    resolution_sum = np.bincount(cell[has_res], weights=res[has_res], minlength=n_comp * n_sev)
+    resolution_count = np.bincount(cell[has_res], minlength=n_comp * n_sev)
+
+    return AggregateCube(
+        components=components,
+        severities=severities,
+        counts=counts.reshape(2, n_comp, n_sev),
+        resolution_sum=resolution_sum.reshape(n_comp, n_sev),
+        resolution_count=resolution_count.reshape(n_comp, n_sev),
+    )
@@ -1,12 +1,21 @@
+import hashlib
 import os
+import time
 
 from .state import ProjectState
-from .data import load_bugs_from_csv
-from .analytics import bugs_to_df, analytics_reports
-from .chroma_store import build_chroma_collection
-from .llm import build_llm_context, ollama_generate
+from .data import CHUNK_SIZE, iter_bug_chunks, chunk_bugs
+from .analytics import analytics_reports, build_aggregate_cube
+from .bug_store import BugStoreBuilder
+from .components import ComponentMatcher
+from .live_reports import LiveReports, event_record
+from .chroma_store import LazyCollection, digest_bug_chunk
+from .llm import build_llm_context, ollama_generate, ollama_generate_stream
+from .response_cache import get_response_cache
+from .semantic_cache import get_semantic_cache
 from .grounding import retrieval_is_weak, validate_llm_answer, format_safe_refusal
-from .router import rule_route, analytics_dispatch, lookup_dispatch
+from .router import scan_question, analytics_dispatch, lookup_dispatch, rag_where
+from .results import AnswerResult, EvidenceHit, print_result
+from .retrieval import RAG_METADATA_FILTERS, RETRIEVAL_MODE, max_distance, retrieve
 
 
 
@@ -18,44 +27,233 @@ def build_state_from_csv_or_memory(
     OLLAMA_URL: str = "http://localhost:11434/api/generate",
     #MODEL: str = "qwen2.5",
     MODEL: str = "llama-3.1-8b-instant",
+    chunk_size: int = CHUNK_SIZE,
+    lazy_index: bool = True,
 ) -> ProjectState:
+    """
+    Builds the analytics/lookup state in one streaming pass over the bugs.
 
-    bugs = bugs_in_memory
+    With lazy_index (default) the Chroma collection is opened and synced on the
+    first RAG request (state.collection is a LazyCollection), so LOOKUP /
+    ANALYTICS never import chromadb / sentence_transformers or load the model.
+    lazy_index=False syncs it here.
+    """
     if os.path.exists(CSV_PATH):
-        bugs = load_bugs_from_csv(CSV_PATH)
+        source_chunks = iter_bug_chunks(CSV_PATH, chunk_size=chunk_size)
+    else:
+        source_chunks = chunk_bugs(bugs_in_memory or [], chunk_size=chunk_size)
 
-    df = bugs_to_df(bugs)
-    open_by_component, resolution_by_component, open_critical, open_critical_by_component = analytics_reports(df)
+    data_digest = hashlib.sha256()
+    builder = BugStoreBuilder()
+    for chunk in source_chunks:
+        builder.add_chunk(chunk)
+        digest_bug_chunk(data_digest, chunk)
+    store = builder.build()
 
-    collection = build_chroma_collection(bugs, collection_name=collection_name)
+    # Indexed from the store, not by re-reading the source: a CSV edited after
+    # this point can't put the index out of step with the store / data_version
+    collection = LazyCollection(
+        collection_name,
+        lambda: store.iter_chunks(chunk_size),
+        lexical=RETRIEVAL_MODE == "hybrid",
+    )
+    if not lazy_index:
+        collection.open()
+
+    # Changes whenever any bug's text/metadata changes (or bugs are added/removed);
+    # cached LLM responses / answers of other versions are dropped
+    data_version = data_digest.hexdigest()[:16]
+    use_data_version(data_version)
+
+    df = store.frame
+    cube = build_aggregate_cube(df)
+    component_matcher = ComponentMatcher(cube.components)
 
     return ProjectState(
-        bugs=bugs,
-        df=df,
-        open_by_component=open_by_component,
-        resolution_by_component=resolution_by_component,
-        open_critical=open_critical,
-        open_critical_by_component=open_critical_by_component,
+        store=store,
+        reports=analytics_reports(df),
+        cube=cube,
+        component_matcher=component_matcher,
         collection=collection,
         OLLAMA_URL=OLLAMA_URL,
         MODEL=MODEL,
+        data_version=data_version,
     )
 
 
-def answer_question(state: ProjectState, user_question: str, top_k: int = 3, max_dist_threshold: float = 0.55):
-    route = rule_route(user_question)
+def upsert_bugs(state: ProjectState, bugs) -> None:
+    """
+    Inserts new bugs and replaces existing ones (same id, full records with
+    the load_bugs_from_csv keys) and refreshes everything derived from them
+    together: store (rows, texts, id index) and df, the four report frames
+    (live_reports), cube, component matcher, data_version (cached answers of
+    the old data are dropped) and the vector index (see LazyCollection.sync_bugs).
+
+    Per bug this is O(1) amortized (BugStore folds appended rows and changed
+    texts in batches) apart from a component / severity not seen before; the
+    report frames are materialized when next read, not per call.
+    """
+    latest = {str(b["id"]).upper(): b for b in bugs}
+    if not latest:
+        return
+    store = state.store
+    before = [store.record(pos) if pos is not None else None for pos in store.positions(latest)]
+
+    if state.live_reports is None:
+        state.live_reports = LiveReports.from_df(state.df)
+    live = state.live_reports
+
+    store.upsert(latest.values())
+    after = [store.record(pos) for pos in store.positions(latest)]
+
+    components = list(state.cube.components)
+    for old, new in zip(before, after):
+        if old is not None:
+            state.cube.add_bug(old, sign=-1)
+        state.cube.add_bug(new)
+        live.upsert(new)
+    if state.cube.components != components:
+        state.component_matcher = ComponentMatcher(state.cube.components)
+
+    digest = hashlib.sha256(state.data_version.encode("utf-8"))
+    digest_bug_chunk(digest, after)
+    state.data_version = digest.hexdigest()[:16]
+    use_data_version(state.data_version)
+
+    sync = getattr(state.collection, "sync_bugs", None)
+    if sync is not None:
+        sync(after)
+
+
+def apply_bug_events(state: ProjectState, events) -> None:
+    """
+    Applies bug events (see live_reports.EVENT_TYPES: insert / close / reopen /
+    update) through upsert_bugs, so reports, cube, store and lookups all see them.
+    """
+    changed: dict[str, dict] = {}
+    for event in events:
+        bug_id = str(event["bug"]["id"] if "bug" in event else event.get("id", "")).upper()
+        current = changed.get(bug_id)
+        if current is None:
+            pos = state.store.position(bug_id)
+            current = state.store.record(pos) if pos is not None else None
+        bug = event_record(event, current)
+        if bug is not None:
+            changed[bug_id] = bug
+    upsert_bugs(state, changed.values())
+
+
+def use_data_version(data_version: str) -> None:
+    # Cached LLM responses / answers of other versions are dropped
+    for cache in (get_response_cache(), get_semantic_cache()):
+        if cache is not None:
+            cache.use_data_version(data_version)
+
+
+def route_question(user_question: str):
+    intent = scan_question(user_question)
+    route = intent.route
     if route is None:
         # keep your behavior: default to ANALYTICS? (you defaulted to LLM route)
         # We'll default to RAG if unclear — safer.
         route = "RAG"
+    return intent, route
+
+
+def rag_filter(state: ProjectState, user_question: str) -> dict | None:
+    # Metadata filter for the vector search (component / severity / status the question names)
+    return rag_where(user_question, state.component_matcher) if RAG_METADATA_FILTERS else None
+
+
+def answer_question(state: ProjectState, user_question: str, top_k: int = 3, max_dist_threshold: float = 0.55, echo: bool = True, stream: bool = False) -> AnswerResult:
+    """
+    Returns an AnswerResult; with echo=True its text report is also printed
+    (the CLI output).
+
+    stream=True (only without echo): a RAG answer is not generated here;
+    result.tokens yields it piece by piece instead, and the grounding check
+    fills answer / grounded / used_ids once the stream is exhausted.
+    """
+    stream = stream and not echo
+    t0 = time.perf_counter()
+    intent, route = route_question(user_question)
+    result = AnswerResult(question=user_question, route=route)
+    result.timings["route"] = time.perf_counter() - t0
+
+    result.say(f"\n[Router] Route = {route}\n")
+
+    if route != "RAG":
+        dispatch_structured(state, user_question, intent, route, result)
+    else:
+        # --- RAG route ---
+        t = time.perf_counter()
+        retrieval = retrieve(state.collection, [user_question], top_k=top_k, wheres=[rag_filter(state, user_question)])[0]
+        result.timings["retrieve"] = time.perf_counter() - t
+        result.retrieval = retrieval.mode
+        result.where = retrieval.where
+        answer_from_retrieval(
+            state, user_question, retrieval.results, result,
+            max_dist_threshold=max_dist_threshold, stream=stream, query_embedding=retrieval.query_embedding,
+        )
+
+    result.timings["total"] = time.perf_counter() - t0
+    if echo:
+        print_result(result)
+    return result
+
+
+def answer_questions(state: ProjectState, questions: list[str], top_k: int = 3, max_dist_threshold: float = 0.55, echo: bool = True) -> list[AnswerResult]:
+    """
+    Batch version of answer_question (same results / printed output, in question order).
+
+    All questions are routed first; every RAG-bound question is retrieved in
+    one retrieve() call (one batched encode and one multi-query search per
+    metadata filter for the questions that need embeddings). LOOKUP/ANALYTICS questions run against
+    the state's precomputed data.
+    """
+    t0 = time.perf_counter()
+    routed = [route_question(q) for q in questions]
+
+    rag_positions = [i for i, (_, route) in enumerate(routed) if route == "RAG"]
+    retrieval_by_pos = {}
+    if rag_positions:
+        rag_questions = [questions[i] for i in rag_positions]
+        retrievals = retrieve(
+            state.collection, rag_questions, top_k=top_k,
+            wheres=[rag_filter(state, q) for q in rag_questions],
+        )
+        retrieval_by_pos = dict(zip(rag_positions, retrievals))
+    batch_time = time.perf_counter() - t0
+
+    answers = []
+    for i, (user_question, (intent, route)) in enumerate(zip(questions, routed)):
+        t = time.perf_counter()
+        result = AnswerResult(question=user_question, route=route)
+        result.timings["batch"] = batch_time
+        result.say(f"\n[Router] Route = {route}\n")
+        if route == "RAG":
+            retrieval = retrieval_by_pos[i]
+            result.retrieval = retrieval.mode
+            result.where = retrieval.where
+            answer_from_retrieval(
+                state, user_question, retrieval.results, result,
+                max_dist_threshold=max_dist_threshold, query_embedding=retrieval.query_embedding,
+            )
+        else:
+            dispatch_structured(state, user_question, intent, route, result)
+        result.timings["total"] = time.perf_counter() - t
+        if echo:
+            print_result(result)
+        answers.append(result)
+    return answers
 
-    print(f"\n[Router] Route = {route}\n")
-    
+
+def dispatch_structured(state: ProjectState, user_question: str, intent, route: str, result: AnswerResult):
+    t = time.perf_counter()
     if route == "LOOKUP":
-        lookup_dispatch(user_question=user_question, df=state.df)
-        return
-    
-    if route == "ANALYTICS":
+        lookup_dispatch(user_question=user_question, store=state.store, out=result)
+
+    elif route == "ANALYTICS":
         analytics_dispatch(
             user_question=user_question,
             df=state.df,
@@ -63,33 +261,60 @@ def answer_question(state: ProjectState, user_question: str, top_k: int = 3, max
             resolution_by_component=state.resolution_by_component,
             open_critical=state.open_critical,
             open_critical_by_component=state.open_critical_by_component,
+            cube=state.cube,
+            intent=intent,
+            component_matcher=state.component_matcher,
+            out=result,
         )
-        return
+    result.timings[route.lower()] = time.perf_counter() - t
 
 
-    # --- RAG route ---
-    rag_query = user_question
-    rag_results = state.collection.query(
-        query_texts=[rag_query],
-        n_results=top_k,
-        include=["documents", "metadatas", "distances"]
-    )
-
-    print("=== RAG Top Matches ===")
+def evidence_hits(rag_results) -> list[EvidenceHit]:
+    hits = []
     for i in range(len(rag_results["ids"][0])):
-        bug_id = rag_results["ids"][0][i]
-        meta = rag_results["metadatas"][0][i]
-        dist = rag_results["distances"][0][i]
-        doc_preview = rag_results["documents"][0][i][:160].replace("\n", " ")
-        print(f"{i+1}) {bug_id} | {meta.get('severity')} | {meta.get('component')} | {meta.get('closed_date')} | dist={dist:.4f}")
-        print("   ", doc_preview, "...\n")
-
-    # Grounding: weak retrieval → refusal
-    if retrieval_is_weak(rag_results, max_dist_threshold=max_dist_threshold):
-        print("=== Final Answer (Safe Refusal) ===")
-        print(format_safe_refusal(rag_query, rag_results))
+        meta = rag_results["metadatas"][0][i] or {}
+        hits.append(EvidenceHit(
+            id=rag_results["ids"][0][i],
+            distance=float(rag_results["distances"][0][i]),
+            component=meta.get("component"),
+            severity=meta.get("severity"),
+            closed_date=meta.get("closed_date"),
+            document=rag_results["documents"][0][i],
+        ))
+    return hits
+
+
+def answer_from_retrieval(state: ProjectState, rag_query: str, rag_results, result: AnswerResult, max_dist_threshold: float = 0.55, stream: bool = False, query_embedding=None):
+    """
+    RAG post-processing for one question: matches, grounding check, LLM answer
+    (or, with stream=True, result.tokens that generates it).
+
+    With the question's query_embedding, a grounded answer to a near-duplicate
+    question that retrieved the same bugs is reused from the semantic cache.
+    """
+    result.evidence = evidence_hits(rag_results)
+
+    result.say("=== RAG Top Matches ===")
+    for i, hit in enumerate(result.evidence):
+        doc_preview = hit.document[:160].replace("\n", " ")
+        result.say(f"{i+1}) {hit.id} | {hit.severity} | {hit.component} | {hit.closed_date} | dist={hit.distance:.4f}")
+        result.say("   ", doc_preview, "...\n")
+
+    # Grounding: weak retrieval → refusal (lexical fast-path hits have their own bar)
+    if retrieval_is_weak(rag_results, max_dist_threshold=max_distance(result.retrieval, max_dist_threshold)):
+        refuse(result, rag_query, rag_results)
         return
 
+    semantic_cache = get_semantic_cache() if query_embedding is not None else None
+    if semantic_cache is not None:
+        t = time.perf_counter()
+        cached = semantic_cache.lookup(query_embedding, [hit.id for hit in result.evidence], state.data_version)
+        result.timings["semantic_cache"] = time.perf_counter() - t
+        if cached is not None:
+            result.from_cache = True
+            accept_answer(result, cached.answer, cached.used_ids)
+            return
+
     context = build_llm_context(rag_results)
 
     prompt = f"""
@@ -108,15 +333,65 @@ Return:
 2) List the bug IDs you used
 """.strip()
 
-    llm_answer = ollama_generate(prompt, OLLAMA_URL=state.OLLAMA_URL, MODEL=state.MODEL)
+    if stream:
+        result.tokens = stream_answer(state, prompt, rag_query, rag_results, result, query_embedding)
+        return
 
+    t = time.perf_counter()
+    llm_answer = ollama_generate(prompt, OLLAMA_URL=state.OLLAMA_URL, MODEL=state.MODEL, data_version=state.data_version)
+    result.timings["generate"] = time.perf_counter() - t
+
+    finish_answer(result, llm_answer, rag_query, rag_results)
+    remember_answer(state, result, query_embedding)
+
+
+def stream_answer(state: ProjectState, prompt: str, rag_query: str, rag_results, result: AnswerResult, query_embedding=None):
+    t = time.perf_counter()
+    parts = []
+    for piece in ollama_generate_stream(prompt, OLLAMA_URL=state.OLLAMA_URL, MODEL=state.MODEL, data_version=state.data_version):
+        if not parts:
+            result.timings["first_token"] = time.perf_counter() - t
+        parts.append(piece)
+        yield piece
+    result.timings["generate"] = time.perf_counter() - t
+
+    # Grounding check on the accumulated text
+    finish_answer(result, "".join(parts), rag_query, rag_results)
+    remember_answer(state, result, query_embedding)
+
+
+def finish_answer(result: AnswerResult, llm_answer: str, rag_query: str, rag_results):
     ok, reason, used_ids = validate_llm_answer(llm_answer, rag_results, min_ids=1)
     if not ok:
         # (Optional debug) print(f"[Debug] Validation failed: {reason}")
-        print("=== Final Answer (Safe Refusal) ===")
-        print(format_safe_refusal(rag_query, rag_results))
+        refuse(result, rag_query, rag_results)
         return
 
-    print("=== Final Answer (Grounded) ===")
-    print(llm_answer.strip())
-    print("\nEvidence bug IDs:", ", ".join(used_ids))
+    accept_answer(result, llm_answer.strip(), used_ids)
+
+
+def accept_answer(result: AnswerResult, answer: str, used_ids):
+    result.answer = answer
+    result.grounded = True
+    result.used_ids = list(used_ids)
+    result.say("=== Final Answer (Grounded) ===")
+    result.say(result.answer)
+    result.say("\nEvidence bug IDs:", ", ".join(used_ids))
+
+
+def refuse(result: AnswerResult, rag_query: str, rag_results):
+    result.answer = format_safe_refusal(rag_query, rag_results)
+    result.grounded = False
+    result.say("=== Final Answer (Safe Refusal) ===")
+    result.say(result.answer)
+
+
+def remember_answer(state: ProjectState, result: AnswerResult, query_embedding):
+    # Only grounded answers are worth reusing
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is None or query_embedding is None or not result.grounded:
+        return
+    semantic_cache.store(
+        result.question, query_embedding, [hit.id for hit in result.evidence],
+        result.answer, result.used_ids, state.data_version,
+    )
@@ -0,0 +1,353 @@
+from bisect import bisect_right
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .analytics import bugs_to_df
+
+
+# Columns dictionary-encoded as pandas categoricals (few distinct values, many rows)
+CATEGORICAL_COLUMNS = ["component", "severity"]
+
+# Appended rows / changed texts are folded into the store once they reach this
+# share of it (at least COMPACT_MIN_ROWS), so each write is O(1) amortized
+COMPACT_FRACTION = 0.05
+COMPACT_MIN_ROWS = 256
+
+
+class BugStore:
+    """
+    Single columnar copy of the dataset that state, router and UI read from.
+
+    - frame: analytics columns (component/severity are categoricals, dates are
+      int64-backed datetime64, plus is_open / resolution_days). No free text.
+    - text_buffer + text_offsets: every bug's `text` concatenated into one string;
+      bug i is text_buffer[text_offsets[i]:text_offsets[i + 1]].
+    - id_index: upper-cased bug id -> row position (first occurrence wins, like the
+      old full-column scan). Built on load, kept current by extend() / upsert().
+
+    Writes don't rebuild those: appended rows wait in a tail of small stores and
+    changed texts in an overlay, both folded in (one concat, one buffer rebuild)
+    once they reach COMPACT_FRACTION of the store, or when `frame` is read.
+    So an insert / update costs O(1) amortized; record(), text(), position()
+    and len() read through the tail without folding it.
+    """
+
+    def __init__(self, frame: pd.DataFrame, text_buffer: str, text_offsets: np.ndarray, id_index: dict[str, int] | None = None):
+        self._frame = frame
+        self.text_buffer = text_buffer
+        self.text_offsets = text_offsets
+        self.id_index: dict[str, int] = id_index if id_index is not None else {}
+        self._tail: list["BugStore"] = []  # appended rows, not yet in _frame
+        self._tail_starts: list[int] = []  # position of each tail store's first row
+        self._tail_rows = 0
+        self._texts: dict[int, str] = {}  # position -> replaced text, not yet in text_buffer
+        if not self.id_index and "id" in frame.columns:
+            _index_ids(self.id_index, frame["id"], start=0)
+
+    def __repr__(self) -> str:
+        return f"BugStore({len(self)} bugs)"
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        if self._tail:
+            self.compact()
+        return self._frame
+
+    def __len__(self) -> int:
+        return len(self._frame) + self._tail_rows
+
+    def __iter__(self) -> Iterator[dict]:
+        # Lazy bug records (same keys as data.load_bugs_from_csv), one at a time
+        for pos in range(len(self)):
+            yield self.record(pos)
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[list[dict]]:
+        """
+        Bug records (same as record()) in batches of chunk_size, converted a
+        column slice at a time; rows upserted meanwhile are read as they are now.
+        """
+        for start in range(0, len(self), chunk_size):
+            part = self.frame.iloc[start:start + chunk_size]
+            columns = zip(
+                part["id"].tolist(),
+                part["title"].tolist(),
+                part["component"].astype(object).tolist(),
+                part["severity"].astype(object).tolist(),
+                _date_strs(part["created_date"]),
+                _date_strs(part["closed_date"]),
+            )
+            yield [
+                {
+                    "id": bug_id,
+                    "title": title,
+                    "component": component,
+                    "severity": severity,
+                    "created_date": created,
+                    "closed_date": closed,
+                    "text": self.text(pos),
+                }
+                for pos, (bug_id, title, component, severity, created, closed) in enumerate(columns, start)
+            ]
+
+    def text(self, pos: int) -> str:
+        text = self._texts.get(pos)
+        if text is not None:
+            return text
+        if pos >= len(self._frame):
+            part, i = self._tail_row(pos)
+            return part.text(i)
+        return self.text_buffer[self.text_offsets[pos]:self.text_offsets[pos + 1]]
+
+    def record(self, pos: int) -> dict:
+        if pos >= len(self._frame):
+            part, i = self._tail_row(pos)
+            return part.record(i)
+        row = self._frame.iloc[pos]
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "component": row["component"],
+            "severity": row["severity"],
+            "created_date": _date_str(row["created_date"]),
+            "closed_date": _date_str(row["closed_date"]),
+            "text": self.text(pos),
+        }
+
+    # -------------------------
+    # BUG-ID lookup (O(1) per id)
+    # -------------------------
+    def position(self, bug_id) -> int | None:
+        return self.id_index.get(_id_key(bug_id))
+
+    def positions(self, bug_ids) -> list[int | None]:
+        get = self.id_index.get
+        return [get(_id_key(b)) for b in bug_ids]
+
+    def lookup(self, bug_ids) -> tuple[pd.DataFrame, list]:
+        """
+        Batch lookup: (rows for the ids found, in request order; ids not found).
+        The returned frame's index holds the store positions (usable with text()).
+        """
+        bug_ids = list(bug_ids)
+        found, missing = [], []
+        for bug_id, pos in zip(bug_ids, self.positions(bug_ids)):
+            if pos is None:
+                missing.append(bug_id)
+            else:
+                found.append(pos)
+        # rows already in _frame don't need the tail folded in
+        frame = self._frame if all(pos < len(self._frame) for pos in found) else self.frame
+        return frame.iloc[found], missing
+
+    def extend(self, other: "BugStore") -> None:
+        """
+        Appends another store's rows (e.g. a newly ingested chunk) and indexes
+        their ids. The rows join the tail; see compact().
+        """
+        if not len(other):
+            return
+        start = len(self)
+        other.compact()
+        self._tail.append(other)
+        self._tail_starts.append(start)
+        self._tail_rows += len(other)
+        _index_ids(self.id_index, other._frame["id"], start=start)
+        self._maybe_compact()
+
+    def upsert(self, bugs) -> tuple[list[int], int]:
+        """
+        Replaces the rows of bugs whose id is already stored (in place, same
+        position) and appends the others; when an id repeats, its last record wins.
+        Ids match case-insensitively and an updated row keeps its stored id spelling.
+        Records are complete bugs (load_bugs_from_csv keys): a missing `text` is stored as "".
+        Returns (positions updated, number of bugs appended).
+        """
+        latest: dict[str, dict] = {}
+        for b in bugs:
+            latest[_id_key(b["id"])] = b
+        updated, updates, new = [], [], []
+        for key, b in latest.items():
+            pos = self.id_index.get(key)
+            if pos is None:
+                new.append(b)
+            else:
+                updated.append(pos)
+                updates.append(b)
+
+        if updates:
+            self._replace_rows(updated, build_bug_store(updates))
+        if new:
+            self.extend(build_bug_store(new))
+        else:
+            self._maybe_compact()
+        return updated, len(new)
+
+    def compact(self) -> None:
+        """
+        Folds the tail into `frame` (one concat) and the changed texts into
+        text_buffer / text_offsets (one rebuild).
+        """
+        if not self._tail and not self._texts:
+            return
+        lengths = np.diff(self.text_offsets)
+        pieces = []
+        start = 0
+        for pos in sorted(self._texts):
+            pieces.append(self.text_buffer[self.text_offsets[start]:self.text_offsets[pos]])
+            pieces.append(self._texts[pos])
+            lengths[pos] = len(self._texts[pos])
+            start = pos + 1
+        pieces.append(self.text_buffer[self.text_offsets[start]:])
+        # (rows in the tail were replaced in their own store, see _replace_rows)
+        tail_lengths = [np.diff(part.text_offsets) for part in self._tail]
+        pieces.extend(part.text_buffer for part in self._tail)
+
+        if self._tail:
+            self._frame = _concat_frames([self._frame] + [part._frame for part in self._tail])
+        lengths = np.concatenate([lengths] + tail_lengths)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        self.text_buffer = "".join(pieces)
+        self.text_offsets = offsets
+        self._tail, self._tail_starts, self._tail_rows, self._texts = [], [], 0, {}
+
+    def _maybe_compact(self) -> None:
+        pending = len(self._texts) + self._tail_rows
+        if pending >= max(COMPACT_MIN_ROWS, int(len(self) * COMPACT_FRACTION)):
+            self.compact()
+
+    def _tail_row(self, pos: int) -> tuple["BugStore", int]:
+        n = bisect_right(self._tail_starts, pos) - 1
+        if n < 0 or pos >= len(self):
+            raise IndexError(pos)
+        return self._tail[n], pos - self._tail_starts[n]
+
+    def _replace_rows(self, positions: list[int], part: "BugStore") -> None:
+        n_base = len(self._frame)
+        base = [i for i, pos in enumerate(positions) if pos < n_base]
+        if len(base) < len(positions):
+            # rows still in the tail are replaced in their (small) tail store
+            for i, pos in enumerate(positions):
+                if pos >= n_base:
+                    tail_part, row = self._tail_row(pos)
+                    tail_part._replace_rows([row], build_bug_store([part.record(i)]))
+                    tail_part.compact()
+        if not base:
+            return
+
+        rows = np.asarray([positions[i] for i in base], dtype=np.int64)
+        for col in part._frame.columns:
+            # the id stays as stored: id_index is keyed by it
+            if col == "id" or col not in self._frame.columns:
+                continue
+            values = part._frame[col].iloc[base]
+            if isinstance(self._frame[col].dtype, pd.CategoricalDtype):
+                cats = self._frame[col].cat.categories
+                unseen = set(values.astype(str)) - set(cats)
+                if unseen:
+                    # keep categories sorted, like _concat_frames
+                    self._frame[col] = self._frame[col].cat.set_categories(sorted(set(cats) | unseen, key=str))
+                values = values.astype(object)
+            self._frame.iloc[rows, self._frame.columns.get_loc(col)] = values.to_numpy()
+
+        # Changed texts go to the overlay (folded into the buffer by compact())
+        for i in base:
+            pos, text = positions[i], part.text(i)
+            if text != self.text(pos):
+                self._texts[pos] = text
+
+    def preview_frame(self, limit: int | None = None) -> pd.DataFrame:
+        """
+        Bug rows with the `text` column materialized (for display only).
+        """
+        n = len(self) if limit is None else min(limit, len(self))
+        cols = [c for c in ["id", "title", "component", "severity", "created_date", "closed_date"] if c in self.frame.columns]
+        view = self.frame[cols].iloc[:n].copy()
+        view["text"] = [self.text(pos) for pos in range(n)]
+        return view
+
+
+class BugStoreBuilder:
+    """
+    Accumulates record batches (see data.iter_bug_chunks) into a BugStore.
+    Each chunk is encoded right away, so raw dicts never outlive their chunk.
+    """
+
+    def __init__(self):
+        self._frames: list[pd.DataFrame] = []
+        self._texts: list[str] = []
+        self._lengths: list[np.ndarray] = []
+
+    def add_chunk(self, bugs: list[dict]) -> pd.DataFrame:
+        frame = bugs_to_df(bugs)
+
+        texts = frame.pop("text").fillna("").astype(str).tolist() if "text" in frame.columns else [""] * len(frame)
+        self._texts.append("".join(texts))
+        self._lengths.append(np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts)))
+
+        for col in CATEGORICAL_COLUMNS:
+            if col in frame.columns:
+                frame[col] = frame[col].fillna("").astype(str).astype("category")
+
+        self._frames.append(frame)
+        return frame
+
+    def build(self) -> BugStore:
+        if not self._frames:
+            self.add_chunk([])
+
+        frame = _concat_frames(self._frames)
+
+        offsets = np.zeros(len(frame) + 1, dtype=np.int64)
+        if len(frame):
+            np.cumsum(np.concatenate(self._lengths), out=offsets[1:])
+
+        store = BugStore(frame=frame, text_buffer="".join(self._texts), text_offsets=offsets)
+        self._frames, self._texts, self._lengths = [], [], []
+        return store
+
+
+def _concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    if len(frames) == 1:
+        return frames[0]
+
+    # union_categoricals keeps the columns dictionary-encoded across chunks;
+    # sorted categories keep groupby output in the same (alphabetical) order as plain strings
+    cats = {
+        col: union_categoricals([f[col] for f in frames], sort_categories=True, ignore_order=True)
+        for col in CATEGORICAL_COLUMNS
+        if all(col in f.columns for f in frames)
+    }
+    frame = pd.concat([f.drop(columns=list(cats)) for f in frames], ignore_index=True)
+    for col, values in cats.items():
+        frame[col] = pd.Categorical(values)
+    return frame[frames[0].columns]
+
+
+def _id_key(bug_id) -> str:
+    return str(bug_id).upper()
+
+
+def _index_ids(index: dict[str, int], ids, start: int) -> None:
+    for pos, bug_id in enumerate(ids, start):
+        index.setdefault(_id_key(bug_id), pos)
+
+
+def build_bug_store(bugs) -> BugStore:
+    builder = BugStoreBuilder()
+    builder.add_chunk(list(bugs))
+    return builder.build()
+
+
+def _date_str(value) -> str | None:
+    if value is None or pd.isna(value):
+        return None
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _date_strs(values: pd.Series) -> list[str | None]:
+    # Vectorized _date_str
+    return [None if pd.isna(v) else v for v in values.dt.strftime("%Y-%m-%d").tolist()]
@@ -0,0 +1,27 @@
+from chromadb.utils import embedding_functions
+
+from .embeddings import EmbeddingService, get_embedding_service
+
+
+class ServiceEmbeddingFunction(embedding_functions.SentenceTransformerEmbeddingFunction):
+    """
+    Chroma embedding function backed by the shared EmbeddingService, so Chroma
+    never loads a second copy of the model. Keeps the stock
+    "sentence_transformer" name/config: existing collections open unchanged.
+    """
+
+    def __init__(self, service: EmbeddingService | None = None):
+        self.service = service or get_embedding_service()
+        self.model_name = self.service.model_name
+        self.device = "cpu"
+        self.normalize_embeddings = False
+        self.kwargs = {}
+
+    def __call__(self, input):
+        return list(self.service.encode(list(input)))
+
+    @staticmethod
+    def build_from_config(config):
+        # Chroma rebuilds the function from its stored config (also inside
+        # is_legacy()); the inherited version would load a second model
+        return ServiceEmbeddingFunction()
@@ -75,105 +75,431 @@
 
 
 import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from functools import lru_cache
-from typing import Any, cast
+from typing import Any, Callable, Iterable, cast
 
-import chromadb
-from chromadb.config import Settings
-from chromadb.utils import embedding_functions
-from sentence_transformers import SentenceTransformer
+from .embeddings import embed_documents, get_embedding_service
+from .lexical import BM25Builder, BM25Index, bug_lexical_text
+from .vector_store import DISTANCE_SPACE, distance_space, open_vector_store
 
 
 # Community Cloud + local friendly:
 # - default to a repo-local folder (persistent across reruns; may reset on redeploy)
 # - allow override via env var
+# (created on first open, not at import)
 CHROMA_PATH = Path(os.getenv("CHROMA_PATH", "./chroma_db_st"))
-CHROMA_PATH.mkdir(parents=True, exist_ok=True)
 
 # Optional: force rebuild collection (useful if CSV changed)
 FORCE_REBUILD = os.getenv("CHROMA_FORCE_REBUILD", "0") == "1"
 
+# Stored in each vector's metadata; see bug_fingerprint()
+FINGERPRINT_KEY = "fingerprint"
 
-# Chroma can embed internally via its embedding function,
-# but you ALSO want manual embeddings (because you upsert embeddings explicitly).
-chroma_embedding = embedding_functions.SentenceTransformerEmbeddingFunction(
-    model_name="all-MiniLM-L6-v2"
-)
+# Chroma caps the size of a single upsert/delete call
+UPSERT_BATCH_SIZE = 1000
 
+# Bugs whose details run past PASSAGE_WORDS words are stored as overlapping
+# passages (the embedding model truncates its input at 256 word pieces, so
+# the tail of long repro notes / logs would never be indexed). 0 disables.
+PASSAGE_WORDS = int(os.getenv("PASSAGE_WORDS", "150"))
+PASSAGE_OVERLAP = int(os.getenv("PASSAGE_OVERLAP", "30"))
 
-@lru_cache(maxsize=1)
-def get_embed_model() -> SentenceTransformer:
-    # Cached at process-level so it doesn't reload repeatedly
-    return SentenceTransformer("all-MiniLM-L6-v2")
+# Passage n > 0 of a bug is stored as "<bug id>#<n>" (passage 0 keeps the bug id)
+PASSAGE_SEP = "#"
 
+# Query embeddings kept in memory, by normalized question text (0 disables)
+QUERY_EMBED_CACHE_SIZE = int(os.getenv("QUERY_EMBED_CACHE_SIZE", "1024"))
 
-def bug_to_text(bug: dict) -> str:
+# Live updates go to the BM25 index's delta (see BM25Index.update); it is
+# rebuilt from the bugs once the delta holds more than this share of them
+LEXICAL_DELTA_FRACTION = float(os.getenv("LEXICAL_DELTA_FRACTION", "0.1"))
+LEXICAL_DELTA_MIN_DOCS = int(os.getenv("LEXICAL_DELTA_MIN_DOCS", "1000"))
+
+
+def bug_header(bug: dict) -> str:
     bug_id = bug.get("id")
     title = bug.get("title", "")
     component = bug.get("component", "")
     severity = bug.get("severity", "")
     created = bug.get("created_date", "")
     closed = bug.get("closed_date") if bug.get("closed_date") else "open"
-    details = bug.get("text", "")
 
     return (
         f"{bug_id} | {severity} | component : {component} | created : {created} | closed : {closed}\n"
-        f"Title : {title}\n"
-        f"Details : {details}"
+        f"Title : {title}"
     )
 
 
-def build_chroma_collection(bugs: list[dict], collection_name: str = "bugs"):
+def bug_to_text(bug: dict) -> str:
+    return f"{bug_header(bug)}\nDetails : {bug.get('text', '')}"
+
+
+def bug_passages(bug: dict) -> list[str]:
     """
-    Builds (or reuses) a persistent Chroma collection and upserts bugs once.
-    Safe for Streamlit: if collection already has docs, it returns immediately.
+    Documents stored for a bug: bug_to_text(bug) when its details fit in
+    PASSAGE_WORDS words, otherwise windows of PASSAGE_WORDS words (PASSAGE_OVERLAP
+    shared with the previous one), each under the bug's header and title.
+    """
+    words = str(bug.get("text", "") or "").split()
+    if PASSAGE_WORDS <= 0 or len(words) <= PASSAGE_WORDS:
+        return [bug_to_text(bug)]
+
+    step = max(1, PASSAGE_WORDS - PASSAGE_OVERLAP)
+    starts = range(0, max(1, len(words) - PASSAGE_OVERLAP), step)
+    header = bug_header(bug)
+    return [
+        f"{header}\nDetails ({n + 1}/{len(starts)}) : " + " ".join(words[start:start + PASSAGE_WORDS])
+        for n, start in enumerate(starts)
+    ]
 
-    Set env CHROMA_FORCE_REBUILD=1 to rebuild collection from scratch.
+
+def passage_id(bug_id: str, n: int) -> str:
+    return bug_id if n == 0 else f"{bug_id}{PASSAGE_SEP}{n}"
+
+
+def bug_metadata(bug: dict) -> dict:
+    return {
+        "component": bug.get("component", ""),
+        "severity": bug.get("severity", ""),
+        "created_date": bug.get("created_date", ""),
+        "closed_date": bug.get("closed_date") if bug.get("closed_date") is not None else "OPEN",
+        "title": bug.get("title", ""),  # helpful for UI/source display
+    }
+
+
+def bug_fingerprint(text: str, metadata: dict) -> str:
+    """
+    Content hash of what we store for a bug (document text + metadata).
+    If the fingerprint is unchanged, the stored vector is still valid.
+    """
+    h = hashlib.sha256()
+    h.update(text.encode("utf-8"))
+    h.update(b"\0")
+    h.update(json.dumps(metadata, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def existing_fingerprints(collection, page_size: int = UPSERT_BATCH_SIZE) -> dict[str, str]:
+    """
+    Reads {stored id: fingerprint} for everything already stored (paged,
+    metadata only); ids are bug ids, or passage ids for split bugs.
+    Vectors written before fingerprints existed map to "" so they get refreshed once.
+    """
+    out: dict[str, str] = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        metas = page.get("metadatas") or [None] * len(ids)
+        for bug_id, meta in zip(ids, metas):
+            out[bug_id] = (meta or {}).get(FINGERPRINT_KEY, "")
+        offset += len(ids)
+    return out
+
+
+def open_chroma_collection(collection_name: str = "bugs", force_rebuild: bool = False):
     """
+    Opens (or creates) the persistent Chroma collection, in cosine space (what
+    NumpyVectorStore returns and the grounding threshold is calibrated for).
+    force_rebuild (CHROMA_FORCE_REBUILD=1 for the app) drops it first and
+    rebuilds from scratch. So does a collection stored in another space
+    (chromadb < 1.0 defaulted to l2): its vectors come back from the embedding
+    cache on the next sync.
+    """
+    # chromadb is only imported once the RAG path needs it
+    import chromadb
+    from chromadb.config import Settings
+
+    from .chroma_embedding import ServiceEmbeddingFunction
+
+    CHROMA_PATH.mkdir(parents=True, exist_ok=True)
     client = chromadb.PersistentClient(
         path=str(CHROMA_PATH),
         settings=Settings(anonymized_telemetry=False),
     )
 
-    if FORCE_REBUILD:
+    def get_or_create():
+        return client.get_or_create_collection(
+            name=collection_name,
+            embedding_function=ServiceEmbeddingFunction(),
+            metadata={"hnsw:space": DISTANCE_SPACE},
+        )
+
+    if force_rebuild:
         # delete if exists, then recreate
         try:
             client.delete_collection(name=collection_name)
         except Exception:
             pass  # collection might not exist yet
 
-    collection = client.get_or_create_collection(
-        name=collection_name,
-        embedding_function=chroma_embedding,
-    )
+    collection = get_or_create()
+    if distance_space(collection) != DISTANCE_SPACE:
+        # the space is fixed at creation
+        client.delete_collection(name=collection_name)
+        collection = get_or_create()
+    return collection
 
-    # Don't rebuild if already populated
-    if not FORCE_REBUILD and collection.count() > 0:
-        return collection
-
-    # If rebuild was requested, we recreated collection above, so count should be 0.
-    bug_ids = [str(b["id"]) for b in bugs]  # enforce string ids
-    texts = [bug_to_text(b) for b in bugs]
-
-    embed_model = get_embed_model()
-    embeddings = embed_model.encode(texts, convert_to_numpy=True).tolist()
-
-    metadatas = [
-        {
-            "component": b.get("component", ""),
-            "severity": b.get("severity", ""),
-            "created_date": b.get("created_date", ""),
-            "closed_date": b.get("closed_date") if b.get("closed_date") is not None else "OPEN",
-            "title": b.get("title", ""),  # helpful for UI/source display
-        }
-        for b in bugs
-    ]
 
-    collection.upsert(
-        ids=cast(Any, bug_ids),
-        documents=cast(Any, texts),
-        embeddings=cast(Any, embeddings),
-        metadatas=cast(Any, metadatas),
-    )
+def sync_bug_chunk(collection, bugs: list[dict], stored: dict[str, str], seen: set[str], digest=None) -> int:
+    """
+    Embeds + upserts the bugs of one chunk whose fingerprint differs from `stored`
+    (every passage of a split bug, see bug_passages; the passages of all changed
+    bugs are encoded in shared batches).
+    Adds every stored id of the chunk to `seen` (used later by delete_missing_bugs,
+    which also drops passages a shortened bug no longer has) and, when given,
+    feeds id + fingerprint into `digest` (a hashlib object; its final hexdigest
+    is the dataset version).
+    Returns how many bugs were upserted (vectors of texts embedded before come
+    from the persistent embedding cache, see embeddings.embed_documents).
+    """
+    ids, texts, metadatas = [], [], []
+    changed = 0
+    for b in bugs:
+        bug_id = str(b["id"])  # enforce string ids
+        meta = bug_metadata(b)
+        fp = bug_fingerprint(bug_to_text(b), meta)
+        if digest is not None:
+            digest.update(digest_entry(bug_id, fp))
+
+        passages = bug_passages(b)
+        if len(passages) > 1:
+            # the split is part of what is stored: other settings -> re-index
+            fp = f"{fp}:{PASSAGE_WORDS}/{PASSAGE_OVERLAP}"
+        passage_ids = [passage_id(bug_id, n) for n in range(len(passages))]
+        seen.update(passage_ids)
+        if all(stored.get(pid) == fp for pid in passage_ids):
+            continue
+
+        changed += 1
+        for n, (pid, passage) in enumerate(zip(passage_ids, passages)):
+            passage_meta = dict(meta)
+            passage_meta[FINGERPRINT_KEY] = fp
+            if len(passages) > 1:
+                passage_meta["bug_id"] = bug_id
+                passage_meta["passage"] = n
+            ids.append(pid)
+            texts.append(passage)
+            metadatas.append(passage_meta)
+
+    for i in range(0, len(ids), UPSERT_BATCH_SIZE):
+        batch = slice(i, i + UPSERT_BATCH_SIZE)
+        embeddings = embed_documents(texts[batch]).tolist()
+        collection.upsert(
+            ids=cast(Any, ids[batch]),
+            documents=cast(Any, texts[batch]),
+            embeddings=cast(Any, embeddings),
+            metadatas=cast(Any, metadatas[batch]),
+        )
+    return changed
+
+
+def digest_entry(bug_id: str, fingerprint: str) -> bytes:
+    return f"{bug_id}\0{fingerprint}\n".encode("utf-8")
+
+
+def digest_bug_chunk(digest, bugs: list[dict]) -> None:
+    # Same digest sync_bug_chunk(..., digest=) feeds, without touching Chroma
+    for b in bugs:
+        text = bug_to_text(b)
+        digest.update(digest_entry(str(b["id"]), bug_fingerprint(text, bug_metadata(b))))
+
+
+def index_bug_chunks(collection_name: str, chunks: Iterable[list[dict]], lexical: BM25Builder | None = None):
+    """
+    Opens the vector store (VECTOR_BACKEND) and brings it in sync with
+    `chunks` (re-embeds only changed bugs, deletes bugs that are gone).
+    When given, `lexical` is fed the same chunks (BM25 index built alongside).
+    Returns the store.
+    """
+    collection = open_vector_store(collection_name, force_rebuild=FORCE_REBUILD)
+    stored = existing_fingerprints(collection) if collection.count() > 0 else {}
+    seen: set[str] = set()
+    for chunk in chunks:
+        sync_bug_chunk(collection, chunk, stored, seen)
+        if lexical is not None:
+            lexical.add_bugs(chunk, bug_metadata)
+    delete_missing_bugs(collection, stored, seen)
+    return collection
+
+
+class LazyCollection:
+    """
+    Stands in for the vector store until the first RAG request touches it;
+    only then are chromadb (for the Chroma backend) and the embedding model
+    loaded and the store synced from `chunks()` (a fresh iterable of bug chunks).
+    With lexical=True a BM25 index over the same bugs is built in that pass.
+
+    `chunks()` is read again whenever the index is (re)built, so it should
+    serve the data the app answers from (build_state_from_csv_or_memory
+    passes the BugStore, which also carries live updates; see sync_bugs).
+
+    Live updates cost no inference when they arrive: their vectors are
+    embedded in one batch on the next read of the store (see flush).
+    """
+
+    def __init__(self, collection_name: str, chunks: Callable[[], Iterable[list[dict]]], lexical: bool = True):
+        self.collection_name = collection_name
+        self.chunks = chunks
+        self.lexical = lexical
+        self._collection = None
+        self._lexical_index: BM25Index | None = None
+        self._lexical_stale = False
+        self._pending: dict[str, dict] = {}  # bug id -> latest record not yet embedded
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._collection is not None
+
+    def open(self):
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    builder = BM25Builder() if self.lexical else None
+                    collection = index_bug_chunks(self.collection_name, self.chunks(), lexical=builder)
+                    self._lexical_index = builder.build() if builder is not None else None
+                    self._collection = collection
+        if self._pending:
+            self.flush()
+        return self._collection
+
+    @property
+    def lexical_index(self) -> BM25Index | None:
+        if self._collection is None:
+            self.open()  # BM25 search needs no vectors: queued ones stay queued
+        if self._lexical_stale:
+            # delta outgrew LEXICAL_DELTA_FRACTION: one pass over the bugs, amortized over the updates
+            with self._lock:
+                if self._lexical_stale:
+                    builder = BM25Builder()
+                    for chunk in self.chunks():
+                        builder.add_bugs(chunk, bug_metadata)
+                    self._lexical_index = builder.build()
+                    self._lexical_stale = False
+        return self._lexical_index
+
+    def sync_bugs(self, bugs: list[dict]) -> None:
+        """
+        Takes new / changed bugs (already in `chunks()`) into an open index:
+        the BM25 index gets them right away through its delta (see
+        BM25Index.update) and their vectors are queued for the next flush().
+        Before open() there is nothing to do, the first open reads them.
+        """
+        with self._lock:
+            if self._collection is None:
+                return
+            for b in bugs:
+                self._pending[str(b["id"])] = b
+            index = self._lexical_index
+            if index is None or self._lexical_stale:
+                return
+            for b in bugs:
+                index.update(str(b["id"]), bug_lexical_text(b), bug_metadata(b))
+            if index.delta_size > max(LEXICAL_DELTA_MIN_DOCS, LEXICAL_DELTA_FRACTION * len(index)):
+                self._lexical_stale = True
+
+    def flush(self) -> None:
+        """
+        Upserts the vectors of the bugs queued by sync_bugs, embedded in one
+        batch (passages a shortened bug no longer has are deleted). Every read
+        of the store goes through open(), which calls this first.
+        """
+        with self._lock:
+            if self._collection is None or not self._pending:
+                return
+            bugs = list(self._pending.values())
+            self._pending = {}
+            # only bugs stored as passages can leave some behind (passage 0 has the bug id)
+            before = self._collection.get(ids=[str(b["id"]) for b in bugs], include=["metadatas"])
+            was_split = [i for i, meta in zip(before["ids"], before["metadatas"]) if meta and "bug_id" in meta]
+
+            seen: set[str] = set()
+            sync_bug_chunk(self._collection, bugs, {}, seen)
+            split = self._collection.get(where={"bug_id": {"$in": was_split}}, include=[]).get("ids") if was_split else []
+            gone = [pid for pid in split or [] if pid not in seen]
+            if gone:
+                self._collection.delete(ids=cast(Any, gone))
+
+    def __getattr__(self, name):
+        return getattr(self.open(), name)
+
+
+def normalize_query(text: str) -> str:
+    # Whitespace never changes the embedding; collapse it so it doesn't split cache entries
+    return " ".join((text or "").split())
+
+
+_query_embeddings: OrderedDict[str, list[float]] = OrderedDict()
+_query_embeddings_lock = threading.Lock()
+
+
+def embed_queries(texts: list[str]) -> list[list[float]]:
+    """
+    Query embeddings (same model/settings as the collection's embedding
+    function, so results match query_texts=...).
+
+    Served from an LRU cache keyed by normalized text; the misses are encoded
+    in one batch. Returned vectors are shared with the cache: don't mutate them.
+    """
+    if not texts:
+        return []
+    keys = [normalize_query(t) for t in texts]
+    with _query_embeddings_lock:
+        found = {}
+        for key in keys:
+            if key in _query_embeddings:
+                _query_embeddings.move_to_end(key)
+                found[key] = _query_embeddings[key]
+    misses = list(dict.fromkeys(k for k in keys if k not in found))
+
+    if misses:
+        vectors = get_embedding_service().encode(misses).tolist()
+        found.update(zip(misses, vectors))
+        if QUERY_EMBED_CACHE_SIZE > 0:
+            with _query_embeddings_lock:
+                _query_embeddings.update(zip(misses, vectors))
+                while len(_query_embeddings) > QUERY_EMBED_CACHE_SIZE:
+                    _query_embeddings.popitem(last=False)
+    return [found[key] for key in keys]
+
+
+def clear_query_embeddings() -> None:
+    with _query_embeddings_lock:
+        _query_embeddings.clear()
+
+
+def delete_missing_bugs(collection, stored: dict[str, str], seen: set[str]) -> int:
+    # Ids (bugs / passages) that were stored before but are not in the dataset anymore
+    gone = [bug_id for bug_id in stored if bug_id not in seen]
+    for i in range(0, len(gone), UPSERT_BATCH_SIZE):
+        collection.delete(ids=cast(Any, gone[i:i + UPSERT_BATCH_SIZE]))
+    return len(gone)
+
+
+def build_chroma_collection(bugs: list[dict], collection_name: str = "bugs"):
+    """
+    Builds (or reuses) the vector store (persistent Chroma collection by
+    default, see vector_store.VECTOR_BACKEND) and syncs it with `bugs`.
+
+    Each vector carries a content fingerprint (see bug_fingerprint). On every build
+    only new/changed bugs are embedded + upserted, and ids no longer in `bugs` are deleted,
+    so an unchanged dataset costs no model inference at all.
+
+    For streaming ingest use the same steps chunk by chunk:
+    open_vector_store -> existing_fingerprints -> sync_bug_chunk (per chunk) -> delete_missing_bugs.
+
+    Set env CHROMA_FORCE_REBUILD=1 to rebuild collection from scratch.
+    """
+    collection = open_vector_store(collection_name, force_rebuild=FORCE_REBUILD)
+    stored = existing_fingerprints(collection) if collection.count() > 0 else {}
+
+    seen: set[str] = set()
+    sync_bug_chunk(collection, bugs, stored, seen)
+    delete_missing_bugs(collection, stored, seen)
     return collection
@@ -0,0 +1,97 @@
+import re
+
+
+# Extra spellings -> component name. Only used when that component exists in the data.
+COMPONENT_ALIASES = {
+    "authentication": "Auth",
+    "deep link": "DeepLinks",
+    "deep links": "DeepLinks",
+    "deeplink": "DeepLinks",
+    "notification": "Notifications",
+    "push notification": "Notifications",
+}
+
+
+# Names ending in "s" that are not plurals of another word
+NOT_PLURAL = {"news", "series", "species", "canvas", "alias"}
+NOT_PLURAL_ENDINGS = ("ss", "us", "is", "ics")
+
+
+def singular_form(name: str) -> str | None:
+    """
+    Singular spelling of a lower-cased component name that is a regular
+    plural ("payments" -> "payment", "categories" -> "category"); None when
+    the name is not clearly one ("news", "analytics", "status", "address").
+    """
+    if len(name) <= 3 or not name.endswith("s") or name in NOT_PLURAL or name.endswith(NOT_PLURAL_ENDINGS):
+        return None
+    if name.endswith("ies"):
+        return name[:-3] + "y"
+    return name[:-1]
+
+
+class ComponentMatcher:
+    """
+    Component names (plus aliases) compiled once into a single word-bounded
+    regex. find() is one scan over the question, independent of the number of
+    bugs; build it when the dataset is (re)loaded, not per question.
+
+    When several components are mentioned the longest name wins (ties: alphabetical),
+    like the old sorted substring loop.
+    """
+
+    def __init__(self, components, aliases: dict[str, str] | None = None):
+        names = sorted({str(c).strip() for c in components if c is not None and str(c).strip()})
+        self.components = names
+
+        by_lower = {n.lower(): n for n in names}
+        self._lookup: dict[str, str] = dict(by_lower)
+        self._singulars: set[str] = set()
+        for lc, name in by_lower.items():
+            # "payment" -> Payments, "order" -> Orders
+            singular = singular_form(lc)
+            if singular and singular not in self._lookup:
+                self._lookup[singular] = name
+                self._singulars.add(singular)
+        for alias, target in (COMPONENT_ALIASES if aliases is None else aliases).items():
+            name = by_lower.get(str(target).strip().lower())
+            if name:
+                self._lookup.setdefault(alias.strip().lower(), name)
+
+        terms = sorted(self._lookup, key=len, reverse=True)
+        self._regex = re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")\b") if terms else None
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def find(self, q: str) -> str | None:
+        if self._regex is None:
+            return None
+        best = None
+        for m in self._regex.finditer((q or "").lower()):
+            name = self._lookup[m.group(0)]
+            if best is None or (-len(name), name) < (-len(best), best):
+                best = name
+        return best
+
+    def find_all(self, q: str, exact: bool = False) -> list[str]:
+        """
+        Every component mentioned, in order of first mention. exact=True skips
+        the singular spellings ("order" in "order stays pending" is not Orders).
+        """
+        if self._regex is None:
+            return []
+        found = []
+        for m in self._regex.finditer((q or "").lower()):
+            if exact and m.group(0) in self._singulars:
+                continue
+            name = self._lookup[m.group(0)]
+            if name not in found:
+                found.append(name)
+        return found
+
+    def canonical(self, token: str) -> str | None:
+        """
+        Exact (case-insensitive) component name or alias -> component name.
+        """
+        return self._lookup.get((token or "").strip().lower())
@@ -1,17 +1,46 @@
 import csv
+import os
+from itertools import islice
+from typing import Iterable, Iterator
 
-def load_bugs_from_csv(path: str):
-    bugs = []
+# Rows per record batch for streaming ingest (override via env for big exports)
+CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "5000"))
+
+
+def row_to_bug(row: dict) -> dict:
+    return {
+        "id": row.get("id"),
+        "title": row.get("title"),
+        "component": row.get("component"),
+        "severity": row.get("severity"),
+        "created_date": row.get("created_date"),
+        "closed_date": row.get("closed_date") or None,
+        "text": row.get("text"),
+    }
+
+
+def iter_bug_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[list[dict]]:
+    """
+    Streams the CSV as record batches of at most `chunk_size` bugs.
+    Only one batch is alive at a time, so memory is bounded by chunk_size, not file size.
+    """
     with open(path, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
-        for row in reader:
-            bugs.append({
-                "id": row.get("id"),
-                "title": row.get("title"),
-                "component": row.get("component"),
-                "severity": row.get("severity"),
-                "created_date": row.get("created_date"),
-                "closed_date": row.get("closed_date") or None,
-                "text": row.get("text"),
-            })
+        yield from chunk_bugs((row_to_bug(row) for row in reader), chunk_size)
+
+
+def chunk_bugs(bugs: Iterable[dict], chunk_size: int = CHUNK_SIZE) -> Iterator[list[dict]]:
+    # Same batching for in-memory bugs, so callers have one ingest path
+    it = iter(bugs)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_bugs_from_csv(path: str):
+    bugs = []
+    for chunk in iter_bug_chunks(path):
+        bugs.extend(chunk)
     return bugs
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+# Directory of the persistent document-embedding cache ("" disables it)
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "./embedding_cache")
+
+HASH_SIZE = 16
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=HASH_SIZE).digest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embeddings of document texts for one model, keyed by text hash.
+
+    One directory per model key holding:
+    - vectors.f32: float32 matrix, one row per text (read through np.memmap)
+    - hashes.bin:  the HASH_SIZE-byte text hash of each row, in row order
+    - meta.json:   model key and vector size
+
+    Both files are append-only (vectors are written before their hashes, so an
+    interrupted append is trimmed on the next open). One writer process at a time.
+    """
+
+    def __init__(self, path: str | Path, model_key: str):
+        self.model_key = model_key
+        self.dir = Path(path) / hashlib.sha1(model_key.encode("utf-8")).hexdigest()[:16]
+        self.dim: int | None = None
+        self._rows: dict[bytes, int] = {}
+        self._count = 0  # rows in vectors.f32
+        self._matrix: np.ndarray | None = None
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.dir / "vectors.f32"
+
+    @property
+    def hashes_path(self) -> Path:
+        return self.dir / "hashes.bin"
+
+    def _load(self) -> None:
+        meta_path = self.dir / "meta.json"
+        if not meta_path.exists():
+            return
+        self.dim = int(json.loads(meta_path.read_text())["dim"])
+        hashes = self.hashes_path.read_bytes() if self.hashes_path.exists() else b""
+        vector_rows = self.vectors_path.stat().st_size // (4 * self.dim) if self.vectors_path.exists() else 0
+        count = min(len(hashes) // HASH_SIZE, vector_rows)
+
+        # Drop a partially written tail
+        if self.vectors_path.exists() and self.vectors_path.stat().st_size != count * 4 * self.dim:
+            os.truncate(self.vectors_path, count * 4 * self.dim)
+        if len(hashes) != count * HASH_SIZE:
+            os.truncate(self.hashes_path, count * HASH_SIZE)
+
+        for row in range(count):
+            self._rows.setdefault(hashes[row * HASH_SIZE:(row + 1) * HASH_SIZE], row)
+        self._count = count
+
+    def _view(self) -> np.ndarray:
+        # memmap over the rows written so far (re-opened after appends)
+        if self._matrix is None or len(self._matrix) != self._count:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._count, self.dim))
+        return self._matrix
+
+    def get_many(self, hashes: list[bytes]) -> dict[bytes, np.ndarray]:
+        with self._lock:
+            rows = {h: self._rows[h] for h in hashes if h in self._rows}
+            if not rows:
+                return {}
+            found = list(rows)
+            block = np.asarray(self._view()[[rows[h] for h in found]])  # one copy out of the memmap
+            return dict(zip(found, block))
+
+    def put_many(self, hashes: list[bytes], vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            first: dict[bytes, int] = {}
+            for i, h in enumerate(hashes):
+                if h not in self._rows:
+                    first.setdefault(h, i)
+            new = list(first.values())
+            if not new:
+                return
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self.dir.mkdir(parents=True, exist_ok=True)
+                (self.dir / "meta.json").write_text(json.dumps({"model": self.model_key, "dim": self.dim}))
+
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors[new].tobytes())
+            with open(self.hashes_path, "ab") as f:
+                f.write(b"".join(hashes[i] for i in new))
+            for offset, i in enumerate(new):
+                self._rows[hashes[i]] = self._count + offset
+            self._count += len(new)
+
+    def __len__(self) -> int:
+        return len(self._rows)
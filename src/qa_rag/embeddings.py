@@ -0,0 +1,124 @@
+import importlib.util
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from .embedding_cache import EMBED_CACHE_PATH, EmbeddingCache, text_hash
+
+
+# Model and CPU backend used for both indexing and queries:
+# - torch: the plain SentenceTransformer
+# - int8:  torch dynamic quantization of the Linear layers (CPU, ~4x smaller weights)
+# - onnx:  onnxruntime (needs sentence-transformers >= 3.2 and `optimum[onnxruntime]`,
+#          see requirements-onnx.txt); EMBED_ONNX_FILE picks a specific export
+#          from the model repo, e.g. onnx/model_qint8_avx2.onnx
+EMBED_MODEL = os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+EMBED_ONNX_FILE = os.getenv("EMBED_ONNX_FILE", "")
+EMBED_BACKENDS = ("torch", "int8", "onnx")
+
+# Optional packages a backend needs on top of requirements.txt
+BACKEND_PACKAGES = {"onnx": ("optimum", "onnxruntime")}
+ONNX_MIN_SENTENCE_TRANSFORMERS = (3, 2)
+
+
+class EmbeddingService:
+    """
+    One embedding model per process; the model is loaded on first encode().
+    """
+
+    def __init__(self, model_name: str = EMBED_MODEL, backend: str = EMBED_BACKEND, onnx_file: str = EMBED_ONNX_FILE):
+        if backend not in EMBED_BACKENDS:
+            raise ValueError(f"Unknown embedding backend {backend!r} (expected one of {', '.join(EMBED_BACKENDS)})")
+        self.model_name = model_name
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_key(self) -> str:
+        # Identifies the vectors this service produces (cache scope)
+        return f"{self.model_name}|{self.backend}|{self.onnx_file}"
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = load_model(self.model_name, self.backend, self.onnx_file)
+        return self._model
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        # float32 array of shape (len(texts), dim)
+        return np.asarray(self.model.encode(list(texts), convert_to_numpy=True), dtype=np.float32)
+
+
+def missing_backend_packages(backend: str) -> list[str]:
+    # Optional packages of `backend` that are not installed
+    return [name for name in BACKEND_PACKAGES.get(backend, ()) if importlib.util.find_spec(name) is None]
+
+
+def load_model(model_name: str, backend: str = "torch", onnx_file: str = ""):
+    # sentence_transformers (and torch) are only imported once a model is needed
+    import sentence_transformers
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx":
+        missing = missing_backend_packages(backend)
+        version = tuple(int(p) for p in sentence_transformers.__version__.split(".")[:2] if p.isdigit())
+        if missing or version < ONNX_MIN_SENTENCE_TRANSFORMERS:
+            raise ImportError(
+                "EMBED_BACKEND=onnx needs sentence-transformers>=3.2 and optimum[onnxruntime] "
+                f"(pip install -r requirements-onnx.txt); installed sentence-transformers "
+                f"{sentence_transformers.__version__}, missing: {', '.join(missing) or 'none'}"
+            )
+        model_kwargs = {"file_name": onnx_file} if onnx_file else None
+        return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+    if backend == "int8":
+        import torch
+        from torch.ao.quantization import quantize_dynamic
+
+        model = SentenceTransformer(model_name, device="cpu")
+        return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+    return SentenceTransformer(model_name)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_service() -> EmbeddingService:
+    # Process-wide service configured from env
+    return EmbeddingService()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache | None:
+    # Persistent document-embedding cache of the configured model; None when disabled
+    if not EMBED_CACHE_PATH:
+        return None
+    service = get_embedding_service()
+    return EmbeddingCache(EMBED_CACHE_PATH, service.model_key)
+
+
+def embed_documents(texts: list[str]) -> np.ndarray:
+    """
+    Document embeddings for indexing. Vectors are looked up in the persistent
+    embedding cache by text hash first; only texts this model has never
+    embedded are encoded (one batch) and then added to the cache.
+    """
+    service = get_embedding_service()
+    cache = get_embedding_cache()
+    if cache is None or not texts:
+        return service.encode(texts)
+
+    hashes = [text_hash(t) for t in texts]
+    found = cache.get_many(hashes)
+    missing = {h: t for h, t in zip(hashes, texts) if h not in found}
+    if missing:
+        vectors = service.encode(list(missing.values()))
+        cache.put_many(list(missing), vectors)
+        found.update(zip(missing, vectors))
+    return np.stack([found[h] for h in hashes])
@@ -0,0 +1,263 @@
+import json
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Callable
+
+import numpy as np
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Question filler that says nothing about which bug is meant
+STOPWORDS = frozenset("""
+a an the is are was were be been being there any known bug bugs issue issues problem
+where when what which who how why does do did can could should would will
+for of on in at to from by with and or but not no if then than after before
+it its this that these those my our your i we you me us show find tell about
+""".split())
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Metadata fields kept per document (as category codes) for `where` filters
+FILTER_FIELDS = ("component", "severity", "closed_date")
+
+# Filter masks kept per index, by filter
+MASK_CACHE_SIZE = 64
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def bug_lexical_text(bug: dict) -> str:
+    return f"{bug.get('title', '')}\n{bug.get('text', '')}"
+
+
+class BM25Builder:
+    """
+    Collects term counts document by document (compact arrays, so a large
+    corpus can be streamed in); build() turns them into a BM25Index.
+    """
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.vocab: dict[str, int] = {}
+        self._terms = array("i")
+        self._rows = array("i")
+        self._tfs = array("i")
+        self._lengths = array("i")
+        self._values: dict[str, dict] = {f: {} for f in FILTER_FIELDS}  # value -> code
+        self._codes: dict[str, array] = {f: array("i") for f in FILTER_FIELDS}
+
+    def add(self, doc_id: str, text: str, metadata: dict | None = None) -> int:
+        # returns the document's row
+        counts = Counter(tokenize(text))
+        row = len(self.ids)
+        self.ids.append(doc_id)
+        for f in FILTER_FIELDS:
+            values = self._values[f]
+            self._codes[f].append(values.setdefault((metadata or {}).get(f), len(values)))
+        self._lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            self._terms.append(self.vocab.setdefault(term, len(self.vocab)))
+            self._rows.append(row)
+            self._tfs.append(tf)
+        return row
+
+    def add_bugs(self, bugs: list[dict], metadata: Callable[[dict], dict] | None = None) -> None:
+        # metadata: bug -> its stored metadata (filterable fields)
+        for b in bugs:
+            self.add(str(b["id"]), bug_lexical_text(b), metadata(b) if metadata is not None else None)
+
+    def build(self, k1: float = BM25_K1, b: float = BM25_B, reference: "BM25Index | None" = None) -> "BM25Index":
+        """
+        reference: an index these documents are searched alongside (a delta,
+        see BM25Index.update); its average length and idf are used, so scores
+        of both are on one scale.
+        """
+        terms = np.frombuffer(self._terms, dtype=np.int32)
+        order = np.argsort(terms, kind="stable")
+        rows = np.frombuffer(self._rows, dtype=np.int32)[order]
+        tfs = np.frombuffer(self._tfs, dtype=np.int32)[order].astype(np.float32)
+        lengths = np.frombuffer(self._lengths, dtype=np.int32).astype(np.float32)
+
+        df = np.bincount(terms, minlength=len(self.vocab))
+        offsets = np.concatenate([[0], np.cumsum(df)])
+        n = len(self.ids)
+        if reference is not None:
+            n = max(n, len(reference))
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(lengths.mean()) if len(lengths) and lengths.sum() else 1.0
+        if reference is not None:
+            avgdl = reference.avgdl
+            for term, t in self.vocab.items():
+                if term in reference.vocab:
+                    idf[t] = reference.idf[reference.vocab[term]]
+        # tf saturation + length normalisation, precomputed per posting
+        weights = tfs * (k1 + 1) / (tfs + k1 * (1 - b + b * lengths[rows] / avgdl))
+
+        return BM25Index(
+            ids=list(self.ids),
+            vocab=dict(self.vocab),
+            offsets=offsets,
+            rows=rows,
+            weights=weights.astype(np.float32),
+            idf=idf,
+            unseen_idf=math.log1p((n + 0.5) / 0.5),
+            avgdl=avgdl,
+            columns={
+                f: (dict(self._values[f]), np.frombuffer(self._codes[f], dtype=np.int32).copy())
+                for f in FILTER_FIELDS
+            },
+        )
+
+
+class BM25Index:
+    """
+    Inverted index with BM25 weights in CSR form: the postings of term t are
+    rows[offsets[t]:offsets[t+1]] with their weights.
+
+    columns: {field: ({value: code}, code per document)} for `where` filters.
+
+    update() takes new / changed documents without rebuilding: their old rows
+    are masked out and they go to a small delta index, searched alongside with
+    this index's idf and average length. Those statistics are the ones of the
+    last build, so rebuild once delta_size is no longer small.
+    """
+
+    def __init__(self, ids, vocab, offsets, rows, weights, idf, unseen_idf, columns=None, avgdl=1.0):
+        self.ids = ids
+        self.vocab = vocab
+        self.offsets = offsets
+        self.rows = rows
+        self.weights = weights
+        self.idf = idf
+        self.unseen_idf = unseen_idf
+        self.columns = columns or {}
+        self.avgdl = avgdl
+        self._masks: dict[str, np.ndarray] = {}
+
+        # updates: rows of `ids` still current (None: all), delta documents
+        self._live: np.ndarray | None = None
+        self._dead = 0
+        self._row_by_id: dict[str, int] | None = None
+        self._delta_builder = BM25Builder()
+        self._delta_rows: dict[str, int] = {}  # id -> its current row in the delta
+        self._delta: BM25Index | None = None  # built from _delta_builder on next search
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids) - self._dead + len(self._delta_rows)
+
+    @property
+    def delta_size(self) -> int:
+        # documents held by the delta (replaced versions included)
+        return len(self._delta_builder.ids)
+
+    def update(self, doc_id: str, text: str, metadata: dict | None = None) -> None:
+        """
+        Adds a document or replaces the one with the same id. Costs one
+        tokenization; the delta is rebuilt (vectorized) on the next search.
+        """
+        with self._lock:
+            if self._row_by_id is None:
+                self._row_by_id = {d: r for r, d in enumerate(self.ids)}
+            row = self._row_by_id.pop(doc_id, None)
+            if row is not None:
+                if self._live is None:
+                    self._live = np.ones(len(self.ids), dtype=bool)
+                self._live[row] = False
+                self._dead += 1
+            self._delta_rows[doc_id] = self._delta_builder.add(doc_id, text, metadata)
+            self._delta = None
+
+    def search(self, text: str, k: int = 10, where: dict | None = None) -> list[tuple[str, float]]:
+        """
+        Top-k (id, score) by BM25, among the documents matching `where` (a
+        Chroma-style filter on FILTER_FIELDS). Scores are divided by the summed
+        idf of the query terms (terms no bug contains count with the highest
+        idf), so a document that has every query term once, at average length,
+        scores ~1.
+        """
+        terms = set(tokenize(text))
+        if not terms or not len(self):
+            return []
+        delta = self._delta_index()
+        ideal = sum(self._idf(t, delta) for t in terms)
+
+        hits = self._top(terms, k, where, self._live)
+        if delta is not None:
+            hits = sorted(hits + delta._top(terms, k, where, delta._live), key=lambda hit: -hit[1])[:k]
+        return [(doc_id, score / ideal) for doc_id, score in hits]
+
+    def _idf(self, term: str, delta: "BM25Index | None") -> float:
+        if term in self.vocab:
+            return float(self.idf[self.vocab[term]])
+        if delta is not None and term in delta.vocab:
+            return float(delta.idf[delta.vocab[term]])
+        return self.unseen_idf
+
+    def _top(self, terms: set[str], k: int, where: dict | None, live: np.ndarray | None) -> list[tuple[str, float]]:
+        # top-k (id, raw BM25 score) of this index's own rows
+        if not self.ids:
+            return []
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for t in (self.vocab[term] for term in terms if term in self.vocab):
+            start, end = self.offsets[t], self.offsets[t + 1]
+            scores[self.rows[start:end]] += self.idf[t] * self.weights[start:end]
+        if live is not None:
+            scores[~live] = 0.0
+        if where:
+            scores[~self.where_mask(where)] = 0.0
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(self.ids[r], float(scores[r])) for r in matched]
+
+    def _delta_index(self) -> "BM25Index | None":
+        with self._lock:
+            if self._delta is None and self._delta_rows:
+                delta = self._delta_builder.build(reference=self)
+                if len(self._delta_rows) < len(delta.ids):
+                    delta._live = np.zeros(len(delta.ids), dtype=bool)
+                    delta._live[list(self._delta_rows.values())] = True
+                self._delta = delta
+            return self._delta
+
+    def where_mask(self, where: dict) -> np.ndarray:
+        """
+        Boolean mask of the documents matching `where` (computed once per filter).
+        """
+        key = json.dumps(where, sort_keys=True, default=str)
+        mask = self._masks.get(key)
+        if mask is None:
+            if len(self._masks) >= MASK_CACHE_SIZE:
+                self._masks.clear()
+            mask = self._masks[key] = self._column_mask(where)
+        return mask
+
+    def _column_mask(self, where: dict) -> np.ndarray:
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, cond in where.items():
+            if key in ("$and", "$or"):
+                parts = [self._column_mask(sub) for sub in cond]
+                mask &= np.logical_and.reduce(parts) if key == "$and" else np.logical_or.reduce(parts)
+                continue
+            if key not in self.columns:
+                raise ValueError(f"Field {key!r} is not filterable (expected one of {FILTER_FIELDS})")
+            values, codes = self.columns[key]
+            op, value = next(iter(cond.items())) if isinstance(cond, dict) else ("$eq", cond)
+            if op in ("$eq", "$ne"):
+                hit = codes == values.get(value, -1)
+            elif op in ("$in", "$nin"):
+                hit = np.isin(codes, [values[v] for v in value if v in values])
+            else:
+                raise ValueError(f"Unsupported where operator {op!r}")
+            mask &= ~hit if op in ("$ne", "$nin") else hit
+        return mask
@@ -0,0 +1,329 @@
+from collections import Counter
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .analytics import bugs_to_df
+from .bug_store import _id_key
+
+
+# Event types accepted by LiveReports.apply() / event_record()
+EVENT_TYPES = ("insert", "close", "reopen", "update")
+
+
+def event_record(event: dict, current: dict | None) -> dict | None:
+    """
+    The bug record after `event` (same semantics as LiveReports.apply), given
+    the bug's current record (None when the id is unknown).
+    None when the event changes nothing (closing a closed bug, reopening an open one).
+    """
+    kind = (event.get("type") or "").strip().lower()
+    if kind == "insert":
+        if current is not None:
+            raise ValueError(f"Bug already exists: {current['id']}")
+        return dict(event["bug"])
+    if kind not in EVENT_TYPES:
+        raise ValueError(f"Unknown bug event type: {kind!r} (expected one of {EVENT_TYPES})")
+    if current is None:
+        raise KeyError(f"Unknown bug id: {event.get('id')}")
+
+    bug = dict(current)
+    if kind == "close":
+        if bug.get("closed_date"):
+            return None
+        bug["closed_date"] = event["closed_date"]
+    elif kind == "reopen":
+        if not bug.get("closed_date"):
+            return None
+        bug["closed_date"] = None
+    else:
+        for key in ("component", "severity"):
+            if event.get(key) is not None:
+                bug[key] = event[key]
+    return bug
+
+
+@dataclass(slots=True)
+class _Bug:
+    id: str
+    title: str
+    component: str
+    severity: str
+    created: pd.Timestamp | None
+    closed: pd.Timestamp | None
+    seq: int = 0  # insertion order: ties on created_date keep it, like a stable sort of the frame
+
+    @property
+    def is_open(self) -> bool:
+        return self.closed is None
+
+    @property
+    def is_critical(self) -> bool:
+        return str(self.severity or "").strip().lower() == "p0"
+
+    @property
+    def resolution_days(self) -> float | None:
+        if self.closed is None or self.created is None:
+            return None
+        return (self.closed - self.created).total_seconds() / 86400
+
+
+class LiveReports:
+    """
+    Materialized versions of analytics.analytics_reports() kept current by bug events
+    instead of recomputing from the full frame:
+
+    - insert(bug)                              new bug (dict with the load_bugs_from_csv keys)
+    - close(bug_id, closed_date)               open -> closed
+    - reopen(bug_id)                           closed -> open
+    - update(bug_id, component=, severity=)    component / severity change
+
+    Bugs are keyed by the upper-cased id, like BugStore.id_index; the id as first
+    inserted is kept for display.
+
+    Each event is O(1): counters per component, open critical bugs keyed by id,
+    and per component a Counter of resolution days (dates are day-granular, so
+    a component has at most a few hundred distinct values, however many bugs).
+    reports() sorts the open critical bugs and those distinct values and keeps
+    the frames until the next event.
+    """
+
+    def __init__(self):
+        self._bugs: dict[str, _Bug] = {}  # _id_key(id) -> bug
+        self._open_by_component: Counter = Counter()
+        self._open_critical_by_component: Counter = Counter()
+        self._open_critical: dict[str, tuple] = {}  # _id_key(id) -> sort key (no_created, created, seq, key)
+        self._resolution: dict[str, Counter] = {}  # component -> {resolution days: bugs}
+        self._resolution_count: Counter = Counter()
+        self._resolution_sum: Counter = Counter()
+        self._seq = 0
+        self._frames = None
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> "LiveReports":
+        live = cls()
+        for row in df[["id", "title", "component", "severity", "created_date", "closed_date"]].itertuples(index=False):
+            live._add(live._new_bug(row._asdict()))
+        return live
+
+    # -------------------------
+    # Events
+    # -------------------------
+    def apply(self, event: dict) -> None:
+        kind = (event.get("type") or "").strip().lower()
+        if kind == "insert":
+            self.insert(event["bug"])
+        elif kind == "close":
+            self.close(event["id"], event["closed_date"])
+        elif kind == "reopen":
+            self.reopen(event["id"])
+        elif kind == "update":
+            self.update(event["id"], component=event.get("component"), severity=event.get("severity"))
+        else:
+            raise ValueError(f"Unknown bug event type: {kind!r} (expected one of {EVENT_TYPES})")
+
+    def insert(self, bug: dict) -> None:
+        if _id_key(bug["id"]) in self._bugs:
+            raise ValueError(f"Bug already exists: {bug['id']}")
+        self._add(self._new_bug(bug))
+
+    def upsert(self, bug: dict) -> None:
+        # Insert, or replace every field of an existing bug (it keeps its place and id spelling)
+        old = self._bugs.get(_id_key(bug["id"]))
+        if old is None:
+            self._add(self._new_bug(bug))
+            return
+        self._remove(old)
+        new = self._new_bug(bug)
+        new.id, new.seq = old.id, old.seq
+        self._add(new)
+
+    def close(self, bug_id: str, closed_date) -> None:
+        bug = self._get(bug_id)
+        if not bug.is_open:
+            return
+        self._remove(bug)
+        bug.closed = _ts(closed_date)
+        self._add(bug)
+
+    def reopen(self, bug_id: str) -> None:
+        bug = self._get(bug_id)
+        if bug.is_open:
+            return
+        self._remove(bug)
+        bug.closed = None
+        self._add(bug)
+
+    def update(self, bug_id: str, component: str | None = None, severity: str | None = None) -> None:
+        bug = self._get(bug_id)
+        self._remove(bug)
+        if component is not None:
+            bug.component = component
+        if severity is not None:
+            bug.severity = severity
+        self._add(bug)
+
+    # -------------------------
+    # Materialized frames (same shape as analytics_reports)
+    # -------------------------
+    def reports(self):
+        if self._frames is None:
+            self._frames = (
+                _count_frame(self._open_by_component, "open_bugs"),
+                self._resolution_frame(),
+                self._open_critical_frame(),
+                _count_frame(self._open_critical_by_component, "open_critical_bugs"),
+            )
+        return self._frames
+
+    def open_by_component(self) -> pd.DataFrame:
+        return self.reports()[0]
+
+    def resolution_by_component(self) -> pd.DataFrame:
+        return self.reports()[1]
+
+    def open_critical(self) -> pd.DataFrame:
+        return self.reports()[2]
+
+    def open_critical_by_component(self) -> pd.DataFrame:
+        return self.reports()[3]
+
+    def _open_critical_frame(self) -> pd.DataFrame:
+        bugs = [self._bugs[key[-1]] for key in sorted(self._open_critical.values())]
+        return bugs_to_df([
+            {
+                "id": b.id,
+                "title": b.title,
+                "component": b.component,
+                "severity": b.severity,
+                "created_date": b.created,
+                "closed_date": None,
+            }
+            for b in bugs
+        ]) if bugs else bugs_to_df([]).reindex(columns=[
+            "id", "title", "component", "severity", "created_date", "closed_date", "is_open", "resolution_days",
+        ])
+
+    def _resolution_frame(self) -> pd.DataFrame:
+        cols = ["component", "closed_bugs", "median_days", "avg_days", "p75_days", "p90_days"]
+        rows = []
+        for comp in sorted(self._resolution, key=str):
+            n = self._resolution_count[comp]
+            values = sorted(self._resolution[comp].items())
+            rows.append({
+                "component": comp,
+                "closed_bugs": n,
+                "median_days": _quantile(values, n, 0.5),
+                "avg_days": self._resolution_sum[comp] / n,
+                "p75_days": _quantile(values, n, 0.75),
+                "p90_days": _quantile(values, n, 0.90),
+            })
+        if not rows:
+            return pd.DataFrame(columns=cols)
+        return pd.DataFrame(rows, columns=cols).sort_values(by="median_days", ascending=False).reset_index(drop=True)
+
+    # -------------------------
+    # Internal bookkeeping
+    # -------------------------
+    def _new_bug(self, bug: dict) -> _Bug:
+        self._seq += 1
+        return _Bug(
+            id=str(bug["id"]),
+            title=bug.get("title"),
+            component=bug.get("component"),
+            severity=bug.get("severity"),
+            created=_ts(bug.get("created_date")),
+            closed=_ts(bug.get("closed_date")),
+            seq=self._seq,
+        )
+
+    def _get(self, bug_id: str) -> _Bug:
+        try:
+            return self._bugs[_id_key(bug_id)]
+        except KeyError:
+            raise KeyError(f"Unknown bug id: {bug_id}") from None
+
+    def _add(self, bug: _Bug) -> None:
+        self._frames = None
+        self._bugs[_id_key(bug.id)] = bug
+        if bug.is_open:
+            self._open_by_component[bug.component] += 1
+            if bug.is_critical:
+                self._open_critical_by_component[bug.component] += 1
+                self._open_critical[_id_key(bug.id)] = _critical_key(bug)
+            return
+
+        days = bug.resolution_days
+        if days is not None:
+            self._resolution.setdefault(bug.component, Counter())[days] += 1
+            self._resolution_count[bug.component] += 1
+            self._resolution_sum[bug.component] += days
+
+    def _remove(self, bug: _Bug) -> None:
+        self._frames = None
+        if bug.is_open:
+            _decrement(self._open_by_component, bug.component)
+            if bug.is_critical:
+                _decrement(self._open_critical_by_component, bug.component)
+                del self._open_critical[_id_key(bug.id)]
+            return
+
+        days = bug.resolution_days
+        if days is not None:
+            _decrement(self._resolution[bug.component], days)
+            _decrement(self._resolution_count, bug.component)
+            self._resolution_sum[bug.component] -= days
+            if not self._resolution[bug.component]:
+                del self._resolution[bug.component]
+                del self._resolution_sum[bug.component]
+
+
+def _ts(value) -> pd.Timestamp | None:
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value
+    ts = pd.to_datetime(value, errors="coerce")
+    return None if pd.isna(ts) else ts
+
+
+def _critical_key(bug: _Bug) -> tuple:
+    # Missing created_date sorts last (like sort_values na_position="last")
+    created = bug.created
+    return (created is None, created if created is not None else pd.Timestamp.min, bug.seq, _id_key(bug.id))
+
+
+def _decrement(counter: Counter, key) -> None:
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+
+def _quantile(values: list[tuple[float, int]], n: int, q: float) -> float:
+    # Linear interpolation (same as pandas Series.quantile default) over sorted (value, count) pairs
+    pos = (n - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, n - 1)
+    return _nth(values, lo) + (_nth(values, hi) - _nth(values, lo)) * (pos - lo)
+
+
+def _nth(values: list[tuple[float, int]], rank: int) -> float:
+    # Value at 0-based rank in the expanded multiset
+    seen = 0
+    for value, count in values:
+        seen += count
+        if rank < seen:
+            return value
+    return values[-1][0]
+
+
+def _count_frame(counter: Counter, count_col_name: str) -> pd.DataFrame:
+    if not counter:
+        return pd.DataFrame(columns=["component", count_col_name])
+    keys = sorted(counter, key=str)
+    return (
+        pd.Series([counter[k] for k in keys], index=pd.Index(keys, name="component"), dtype="int64")
+        .sort_values(ascending=False)
+        .rename(count_col_name)
+        .reset_index()
+    )
@@ -1,5 +1,28 @@
 import os
-from openai import OpenAI
+import threading
+from typing import TYPE_CHECKING, Iterator
+
+from .response_cache import get_response_cache, response_key
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+# Groq OpenAI-compatible endpoint
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+
+# Connection pool / timeouts of the shared LLM clients
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))
+LLM_POOL_KEEPALIVE = int(os.getenv("LLM_POOL_KEEPALIVE", str(LLM_POOL_SIZE)))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+LLM_TEMPERATURE = 0.2
+
+_clients: dict[tuple[str, str, str], "OpenAI"] = {}
+_clients_lock = threading.Lock()
 
 
 def build_llm_context(results, max_chars=4000):
@@ -30,10 +53,57 @@ def build_llm_context(results, max_chars=4000):
     return "\n---\n".join(parts)
 
 
+# -------------------------
+# Client registry
+# -------------------------
+def get_llm_client(base_url: str, api_key: str, model: str) -> "OpenAI":
+    """
+    Process-wide client per (base_url, api_key, model), created once and reused
+    by every thread. Each client keeps a keep-alive httpx connection pool, so
+    repeated calls skip client construction and TCP/TLS setup.
+    """
+    key = (base_url, api_key, model)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # openai (and its httpx) are only imported once the first LLM call needs them
+            import httpx
+            from openai import OpenAI, DefaultHttpxClient, Timeout
+
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=LLM_MAX_RETRIES,
+                http_client=DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=LLM_POOL_SIZE,
+                        max_keepalive_connections=LLM_POOL_KEEPALIVE,
+                        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                    ),
+                    timeout=Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+                ),
+            )
+            _clients[key] = client
+    return client
+
+
+def close_llm_clients() -> None:
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
 def ollama_generate(
     prompt: str,
     OLLAMA_URL: str | None = None,
     MODEL: str = "llama-3.1-8b-instant",
+    data_version: str = "",
 ) -> str:
     """
     Backward-compatible function name.
@@ -41,6 +111,8 @@ def ollama_generate(
 
     - OLLAMA_URL is ignored (kept only to avoid refactors).
     - MODEL is a Groq model id, e.g. 'llama-3.1-8b-instant'.
+    - data_version identifies the bug data behind the prompt; responses are
+      cached per (model, temperature, prompt, data_version), see response_cache.
     """
     api_key = os.environ.get("GROQ_API_KEY")
     if not api_key:
@@ -48,18 +120,73 @@ def ollama_generate(
 
     model = os.environ.get("GROQ_MODEL", MODEL)
 
-    client = OpenAI(
-        api_key=api_key,
-        base_url="https://api.groq.com/openai/v1",
-    )
+    cache = get_response_cache()
+    key = response_key(model, LLM_TEMPERATURE, prompt, data_version)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    client = get_llm_client(GROQ_BASE_URL, api_key, model)
 
     resp = client.chat.completions.create(
         model=model,
         messages=[{"role": "user", "content": prompt}],
-        temperature=0.2,
+        temperature=LLM_TEMPERATURE,
     )
 
-    return resp.choices[0].message.content or ""
+    answer = resp.choices[0].message.content or ""
+    if cache is not None and answer:
+        cache.put(key, answer, data_version=data_version)
+    return answer
+
+
+def ollama_generate_stream(
+    prompt: str,
+    OLLAMA_URL: str | None = None,
+    MODEL: str = "llama-3.1-8b-instant",
+    data_version: str = "",
+) -> Iterator[str]:
+    """
+    Streaming version of ollama_generate: yields text pieces as the model
+    produces them. A cached response is yielded in one piece; a completed
+    stream is stored in the same cache.
+    """
+    api_key = os.environ.get("GROQ_API_KEY")
+    if not api_key:
+        raise RuntimeError("Missing GROQ_API_KEY env var")
+
+    model = os.environ.get("GROQ_MODEL", MODEL)
+
+    cache = get_response_cache()
+    key = response_key(model, LLM_TEMPERATURE, prompt, data_version)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    client = get_llm_client(GROQ_BASE_URL, api_key, model)
+
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=LLM_TEMPERATURE,
+        stream=True,
+    )
+
+    parts = []
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        piece = chunk.choices[0].delta.content
+        if piece:
+            parts.append(piece)
+            yield piece
+
+    answer = "".join(parts)
+    if cache is not None and answer:
+        cache.put(key, answer, data_version=data_version)
 
 
 
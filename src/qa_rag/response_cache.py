@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+
+# In-memory entries (0 disables the cache), seconds an entry stays valid,
+# and optional sqlite file for the on-disk tier ("" = memory only)
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+# Rows kept in the sqlite tier; the oldest are evicted first (0 = unbounded)
+LLM_CACHE_DISK_SIZE = int(os.getenv("LLM_CACHE_DISK_SIZE", "10000"))
+
+
+def response_key(model: str, temperature: float, prompt: str, data_version: str = "") -> str:
+    payload = json.dumps([model, temperature, hashlib.sha256(prompt.encode("utf-8")).hexdigest(), data_version])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of LLM responses.
+
+    - memory tier: OrderedDict of key -> (response, expires_at), at most max_entries
+    - disk tier (optional): sqlite table, survives restarts; a disk hit is
+      promoted to memory; at most max_disk_entries rows (oldest written evicted first)
+    Entries carry the data_version they were generated for; use_data_version()
+    drops everything generated for another version.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_SIZE,
+        ttl: float = LLM_CACHE_TTL,
+        path: str | None = None,
+        max_disk_entries: int = LLM_CACHE_DISK_SIZE,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict[str, tuple[str, float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL, data_version TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)")
+            self._db.commit()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    return entry[0]
+                del self._memory[key]
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT response, expires_at, data_version FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._remember(key, row[0], row[1], row[2])
+            return row[0]
+
+    def put(self, key: str, response: str, data_version: str = "") -> None:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, response, expires_at, data_version)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, expires_at, data_version) VALUES (?, ?, ?, ?)",
+                    (key, response, expires_at, data_version),
+                )
+                self._evict_disk()
+                self._db.commit()
+
+    def use_data_version(self, data_version: str) -> None:
+        """
+        Drops entries generated for any other data version (and expired ones on disk).
+        """
+        with self._lock:
+            for key in [k for k, entry in self._memory.items() if entry[2] != data_version]:
+                del self._memory[key]
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM responses WHERE data_version != ? OR expires_at <= ?", (data_version, time.time())
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _evict_disk(self) -> None:
+        # Same ttl for every row, so the earliest expires_at is the oldest write
+        if self.max_disk_entries <= 0:
+            return
+        (rows,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if rows > self.max_disk_entries:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY expires_at, rowid LIMIT ?)",
+                (rows - self.max_disk_entries,),
+            )
+
+    def _remember(self, key: str, response: str, expires_at: float, data_version: str) -> None:
+        self._memory[key] = (response, expires_at, data_version)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache | None:
+    # Process-wide cache configured from env; None when disabled
+    if LLM_CACHE_SIZE <= 0:
+        return None
+    return ResponseCache(path=LLM_CACHE_PATH or None)
@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import pandas as pd
+
+
+@dataclass
+class EvidenceHit:
+    id: str
+    distance: float
+    component: str | None = None
+    severity: str | None = None
+    closed_date: str | None = None
+    document: str = ""
+
+
+@dataclass
+class AnswerResult:
+    """
+    Everything answer_question() produces for one question.
+
+    - route: LOOKUP / ANALYTICS / RAG
+    - tables: frames shown to the user, by name (e.g. "open_by_component")
+    - evidence: RAG matches with their distances
+    - retrieval: how they were found: dense / hybrid / lexical (BM25 fast path)
+    - where: metadata filter the search was restricted to (None: all bugs)
+    - answer / grounded / used_ids: final RAG answer (or safe refusal text)
+    - from_cache: the RAG answer was reused from the semantic answer cache
+    - timings: seconds per stage
+    - tokens: with answer_question(stream=True), the RAG answer as it is generated;
+      answer / grounded / used_ids are filled when it is exhausted
+    - blocks: the text report in output order (text lines and tables);
+      render() turns it into the same text the CLI used to print.
+    """
+    question: str
+    route: str | None = None
+    tables: dict[str, pd.DataFrame] = field(default_factory=dict)
+    evidence: list[EvidenceHit] = field(default_factory=list)
+    retrieval: str | None = None
+    where: dict | None = None
+    answer: str = ""
+    grounded: bool | None = None
+    used_ids: list[str] = field(default_factory=list)
+    from_cache: bool = False
+    timings: dict[str, float] = field(default_factory=dict)
+    tokens: Iterator[str] | None = field(default=None, repr=False)
+    blocks: list[tuple[str, str]] = field(default_factory=list, repr=False)
+
+    # -------------------------
+    # Builders (used by the handlers instead of print)
+    # -------------------------
+    def say(self, *parts) -> None:
+        # same text print(*parts) would write
+        self.blocks.append(("text", " ".join(str(p) for p in parts) + "\n"))
+
+    def table(self, name: str, frame: pd.DataFrame) -> None:
+        self.tables[name] = frame
+        self.blocks.append(("table", name))
+
+    # -------------------------
+    # Text renderer
+    # -------------------------
+    def render(self) -> str:
+        parts = []
+        for kind, value in self.blocks:
+            if kind == "table":
+                parts.append(self.tables[value].to_string(index=False) + "\n")
+            else:
+                parts.append(value)
+        return "".join(parts)
+
+
+def print_result(result: AnswerResult) -> None:
+    print(result.render(), end="")
@@ -0,0 +1,265 @@
+import json
+import os
+from dataclasses import dataclass
+
+from .chroma_store import embed_queries
+from .vector_store import distance_space, vector_distances
+
+
+# - hybrid: dense + BM25 hits fused by reciprocal rank, with a lexical fast path
+# - dense:  embedding search only
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+
+# Candidates taken from each retriever before fusion
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Passages fetched per wanted bug (long bugs are stored as several passages,
+# see chroma_store.bug_passages; hits are collapsed to their bugs)
+PASSAGE_OVERSAMPLE = int(os.getenv("PASSAGE_OVERSAMPLE", "3"))
+
+# Passages of a bug within this distance of its best one count as matched
+# (and go to the LLM context with it)
+PASSAGE_MATCH_MARGIN = float(os.getenv("PASSAGE_MATCH_MARGIN", "0.05"))
+
+# Restrict RAG search to the component / severity / status a question names
+# (router.rag_where); "0" searches every bug
+RAG_METADATA_FILTERS = os.getenv("RAG_METADATA_FILTERS", "1") == "1"
+
+# The BM25 top hit is decisive (no query embedding at all) when its normalized
+# score (see BM25Index.search) reaches LEXICAL_FAST_PATH_SCORE and is at least
+# LEXICAL_FAST_PATH_MARGIN times the runner-up's
+LEXICAL_FAST_PATH_SCORE = float(os.getenv("LEXICAL_FAST_PATH_SCORE", "0.8"))
+LEXICAL_FAST_PATH_MARGIN = float(os.getenv("LEXICAL_FAST_PATH_MARGIN", "2.0"))
+
+# Fast-path distances are 1 - normalized BM25 score, not cosine distances, so
+# grounding does not hold them to the dense threshold: the top hit must score at
+# least LEXICAL_GROUNDING_SCORE (~1: it has every question term, see
+# BM25Index.search), i.e. lie within LEXICAL_MAX_DISTANCE (see max_distance()).
+# A hit below that bar is not decisive either: the question goes the dense /
+# hybrid way and is graded on cosine distance there
+LEXICAL_GROUNDING_SCORE = float(os.getenv("LEXICAL_GROUNDING_SCORE", "1.0"))
+LEXICAL_MAX_DISTANCE = max(0.0, 1.0 - LEXICAL_GROUNDING_SCORE)
+
+INCLUDE = ["documents", "metadatas", "distances"]
+
+# Per-query keys of a chroma query() result (everything else, e.g. "included", is shared)
+QUERY_RESULT_KEYS = ("ids", "documents", "metadatas", "distances", "embeddings", "uris", "data")
+
+
+@dataclass
+class Retrieval:
+    results: dict  # chroma query() shape, one query
+    query_embedding: list[float] | None  # None when the lexical fast path answered
+    mode: str  # "dense" / "hybrid" / "lexical"
+    where: dict | None = None  # metadata filter the search used
+
+
+def retrieve(collection, questions: list[str], top_k: int = 3, wheres: list[dict | None] | None = None) -> list[Retrieval]:
+    """
+    Top-k bugs for each question, in question order.
+
+    wheres: per question, a Chroma `where` filter the search is restricted to
+    (None: all bugs). A question whose filter matches nothing is searched again
+    without it.
+    """
+    wheres = list(wheres) if wheres is not None else [None] * len(questions)
+    out = search(collection, questions, wheres, top_k)
+
+    retry = [i for i, r in enumerate(out) if r.where and not r.results["ids"][0]]
+    if retry:
+        unfiltered = search(collection, [questions[i] for i in retry], [None] * len(retry), top_k)
+        for i, r in zip(retry, unfiltered):
+            out[i] = r
+    return out
+
+
+def search(collection, questions: list[str], wheres: list[dict | None], top_k: int) -> list[Retrieval]:
+    """
+    Questions the BM25 index answers decisively skip embedding; all others are
+    embedded in one batch and searched with one multi-query call per distinct
+    filter, then fused with their BM25 hits (when the collection has a lexical
+    index).
+    """
+    lexical = getattr(collection, "lexical_index", None) if RETRIEVAL_MODE == "hybrid" else None
+    lexical_hits = [
+        lexical.search(q, max(top_k, HYBRID_CANDIDATES), where=where) if lexical else []
+        for q, where in zip(questions, wheres)
+    ]
+
+    out: list[Retrieval | None] = [None] * len(questions)
+    dense_positions = []
+    for i, hits in enumerate(lexical_hits):
+        if lexical_is_decisive(hits):
+            out[i] = Retrieval(lexical_results(collection, hits[:top_k]), None, "lexical", wheres[i])
+        else:
+            dense_positions.append(i)
+    if not dense_positions:
+        return out
+
+    embeddings = embed_queries([questions[i] for i in dense_positions])
+    embedding_by_pos = dict(zip(dense_positions, embeddings))
+    groups: dict[str, list[int]] = {}
+    for i in dense_positions:
+        groups.setdefault(json.dumps(wheres[i], sort_keys=True, default=str), []).append(i)
+
+    n_bugs = max(top_k, HYBRID_CANDIDATES) if lexical else top_k
+    for positions in groups.values():
+        where = wheres[positions[0]]
+        results = collection.query(
+            query_embeddings=[embedding_by_pos[i] for i in positions],
+            n_results=n_bugs * max(1, PASSAGE_OVERSAMPLE),
+            include=INCLUDE,
+            where=where,
+        )
+        for n, i in enumerate(positions):
+            one = collapse_passages(split_query_results(results, n), n_bugs)
+            embedding = embedding_by_pos[i]
+            if lexical_hits[i]:
+                out[i] = Retrieval(fuse(collection, one, lexical_hits[i], embedding, top_k), embedding, "hybrid", where)
+            else:
+                out[i] = Retrieval(truncate(one, top_k), embedding, "dense", where)
+    return out
+
+
+def max_distance(mode: str | None, dense_threshold: float) -> float:
+    # Grounding threshold for a retrieval's distances (dense / hybrid: cosine)
+    return LEXICAL_MAX_DISTANCE if mode == "lexical" else dense_threshold
+
+
+def lexical_is_decisive(hits: list[tuple[str, float]]) -> bool:
+    if not hits or hits[0][1] < LEXICAL_FAST_PATH_SCORE:
+        return False
+    # same distance lexical_results reports and grounding grades
+    if max(0.0, 1.0 - hits[0][1]) > LEXICAL_MAX_DISTANCE:
+        return False
+    return len(hits) == 1 or hits[0][1] >= LEXICAL_FAST_PATH_MARGIN * hits[1][1]
+
+
+def split_query_results(results, n: int) -> dict:
+    """
+    The n-th query of a multi-query result, shaped like a single-query result.
+    """
+    return {
+        key: ([value[n]] if key in QUERY_RESULT_KEYS and value is not None else value)
+        for key, value in results.items()
+    }
+
+
+def truncate(results: dict, k: int) -> dict:
+    return {
+        key: ([value[0][:k]] if key in QUERY_RESULT_KEYS and value is not None else value)
+        for key, value in results.items()
+    }
+
+
+def collapse_passages(results: dict, k: int) -> dict:
+    """
+    Passage hits -> the best k bugs. A bug scores as its best passage (max-sim:
+    its smallest distance); its document is that passage plus any other within
+    PASSAGE_MATCH_MARGIN of it, in text order, so the LLM context holds only those.
+    """
+    metadatas = results["metadatas"][0]
+    if not any(meta and "bug_id" in meta for meta in metadatas):
+        return truncate(results, k)  # no split bugs among the hits
+
+    best: dict[str, tuple] = {}  # bug id -> (metadata, distance), in rank order
+    passages: dict[str, list] = {}
+    for stored_id, doc, meta, distance in zip(results["ids"][0], results["documents"][0], metadatas, results["distances"][0]):
+        bug_id = (meta or {}).get("bug_id", stored_id)
+        if bug_id not in best:
+            best[bug_id] = (meta, distance)
+            passages[bug_id] = []
+        if distance <= best[bug_id][1] + PASSAGE_MATCH_MARGIN:
+            passages[bug_id].append(((meta or {}).get("passage", 0), doc))
+    ids = list(best)[:k]
+
+    return single_result(
+        ids,
+        [join_passages(passages[bug_id]) for bug_id in ids],
+        [best[bug_id][0] for bug_id in ids],
+        [best[bug_id][1] for bug_id in ids],
+    )
+
+
+def join_passages(passages: list[tuple[int, str]]) -> str:
+    # (passage number, document) -> one document; header and title lines only once
+    passages = sorted(passages, key=lambda p: p[0])
+    first = passages[0][1]
+    rest = [doc.split("\n", 2)[-1] for _, doc in passages[1:]]
+    return "\n".join([first] + rest)
+
+
+def single_result(ids, documents, metadatas, distances) -> dict:
+    return {
+        "ids": [ids],
+        "embeddings": None,
+        "documents": [documents],
+        "uris": None,
+        "included": INCLUDE,
+        "data": None,
+        "metadatas": [metadatas],
+        "distances": [distances],
+    }
+
+
+def fetch(collection, ids: list[str], include: list[str]) -> dict[str, tuple]:
+    # {id: (document, metadata, embedding or None)}
+    got = collection.get(ids=ids, include=include)
+    embeddings = got.get("embeddings")
+    return {
+        bug_id: (
+            got["documents"][i],
+            got["metadatas"][i],
+            embeddings[i] if embeddings is not None else None,
+        )
+        for i, bug_id in enumerate(got["ids"])
+    }
+
+
+def lexical_results(collection, hits: list[tuple[str, float]]) -> dict:
+    # Fast path: distance is 1 - normalized BM25 score (no vectors involved,
+    # graded against LEXICAL_MAX_DISTANCE); a split bug is shown with its first passage
+    found = fetch(collection, [bug_id for bug_id, _ in hits], ["documents", "metadatas"])
+    hits = [(bug_id, score) for bug_id, score in hits if bug_id in found]
+    return single_result(
+        [bug_id for bug_id, _ in hits],
+        [found[bug_id][0] for bug_id, _ in hits],
+        [found[bug_id][1] for bug_id, _ in hits],
+        [max(0.0, 1.0 - score) for _, score in hits],
+    )
+
+
+def fuse(collection, dense: dict, lexical_hits: list[tuple[str, float]], query_embedding, top_k: int) -> dict:
+    """
+    Reciprocal-rank fusion of dense and BM25 rankings. Bugs only BM25 found get
+    their distance to the query from the stored vectors (the first passage's,
+    for a split bug), in the collection's own space (see distance_space), so
+    every hit is graded on the same scale as the dense ones.
+    """
+    dense_ids = dense["ids"][0]
+    scores: dict[str, float] = {}
+    for ranking in (dense_ids, [bug_id for bug_id, _ in lexical_hits]):
+        for rank, bug_id in enumerate(ranking):
+            scores[bug_id] = scores.get(bug_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+    fused = sorted(scores, key=lambda bug_id: -scores[bug_id])[:top_k]
+
+    rows = {
+        bug_id: (dense["documents"][0][i], dense["metadatas"][0][i], dense["distances"][0][i])
+        for i, bug_id in enumerate(dense_ids)
+    }
+    missing = [bug_id for bug_id in fused if bug_id not in rows]
+    if missing:
+        found = fetch(collection, missing, ["documents", "metadatas", "embeddings"])
+        if found:
+            distances = vector_distances(distance_space(collection), query_embedding, [v for _, _, v in found.values()])
+            for (bug_id, (doc, meta, _)), distance in zip(found.items(), distances):
+                rows[bug_id] = (doc, meta, float(distance))
+    fused = [bug_id for bug_id in fused if bug_id in rows]
+
+    return single_result(
+        fused,
+        [rows[bug_id][0] for bug_id in fused],
+        [rows[bug_id][1] for bug_id in fused],
+        [rows[bug_id][2] for bug_id in fused],
+    )
@@ -225,43 +225,232 @@
 
 #     return None
 import re
+from dataclasses import dataclass
+
+from .analytics import _norm_series, build_aggregate_cube
+from .components import ComponentMatcher
+from .results import AnswerResult, print_result
 
 CLOSED_SYNONYMS   = ["closed", "resolved", "solved", "fixed", "done"]
 OPEN_SYNONYMS     = ["open", "pending", "active"]
 CRITICAL_SYNONYMS = ["critical", "p0", "blocker", "sev0"]
 LIST_WORDS        = ["list", "show", "display"]
-COUNT_WORDS       = ["how many", "count", "number", "total"]
+
+
+RESOLUTION_WORDS  = ["median", "average", "avg", "mean", "p75", "p90", "percentile", "resolution", "time to close", "sla"]
+
+
+# -----------------------------
+# Single-pass question scanner
+# -----------------------------
+# Substring keywords (same semantics as `word in ql`) -> intent flag
+KEYWORD_FLAGS = {
+    "list": LIST_WORDS,
+    "open": OPEN_SYNONYMS,
+    "closed": CLOSED_SYNONYMS,
+    "critical": CRITICAL_SYNONYMS,
+    "resolution": RESOLUTION_WORDS,
+    "release": ["release"],
+    "readiness": ["readiness"],
+    "median_days": ["median"],
+    "avg_days": ["average", "avg", "mean"],
+    "p75_days": ["p75", "75th"],
+    "p90_days": ["p90", "90th"],
+}
+
+# Whole-word route terms (same semantics as r"\bterm\b")
+LOOKUP_PATTERNS = [r"bug-\d+"]
+ANALYTICS_TERMS = [
+    "median", "average", "avg", "mean",
+    "percentile",
+    "how many", "count", "number of", "total",
+    "by component", "breakdown",
+    "resolution time", "time to close", "sla",
+    "release readiness",
+    "trend", "per week", "per month",
+]
+# Status / severity words: ANALYTICS on their own or with a list word, but in other
+# RAG phrasing they are search filters (rag_where), so RAG wins
+# ("is there a known checkout bug still open?" vs "list open bugs related to login")
+ANALYTICS_FILTER_TERMS = [
+    "open", "closed", "resolved", "fixed", "solved",
+    "critical", "p0", "blocker", "sev0",
+]
+ANALYTICS_PATTERNS = [r"p\d{2}", r"over (last|past)"]
+RAG_TERMS = ["known issue", "similar bug", "related to", "why does", "what causes", "which bug"]
+RAG_PATTERNS = [r"is there (a|any) (known )?(\w+ ){0,2}bug"]
+
+# Route precedence: (markers that must all be found, route). FILTER is
+# ANALYTICS_FILTER_TERMS, LIST is LIST_WORDS as whole words
+ROUTE_PRIORITY = [
+    (("LOOKUP",), "LOOKUP"),
+    (("ANALYTICS",), "ANALYTICS"),
+    (("FILTER", "LIST"), "ANALYTICS"),
+    (("RAG",), "RAG"),
+    (("FILTER",), "ANALYTICS"),
+]
+
+METRIC_PRIORITY = ["median_days", "avg_days", "p75_days", "p90_days"]
+
+
+@dataclass(frozen=True)
+class QuestionIntent:
+    route: str | None
+    wants_list: bool = False
+    mentions_open: bool = False
+    mentions_closed: bool = False
+    mentions_critical: bool = False
+    release_readiness: bool = False
+    resolution: bool = False
+    metric: str | None = None
+
+
+def _build_question_matcher():
+    """
+    One compiled alternation over every keyword / route term, plus a
+    first-character index of the literal terms.
+
+    Regex patterns come first in the alternation (named groups, word-bounded);
+    at every match position all literal terms starting there are checked
+    from the index, so overlapping terms ("release" / "release readiness",
+    "p0" / "p05") give the same flags as separate searches would.
+    """
+    literals: dict[str, tuple[set, set]] = {}
+    for flag, words in KEYWORD_FLAGS.items():
+        for w in words:
+            literals.setdefault(w, (set(), set()))[0].add(flag)
+    for route, words in (("ANALYTICS", ANALYTICS_TERMS), ("FILTER", ANALYTICS_FILTER_TERMS), ("LIST", LIST_WORDS), ("RAG", RAG_TERMS)):
+        for w in words:
+            literals.setdefault(w, (set(), set()))[1].add(route)
+
+    pattern_routes = {}
+    alternatives = []
+    for route, patterns in (("LOOKUP", LOOKUP_PATTERNS), ("ANALYTICS", ANALYTICS_PATTERNS), ("RAG", RAG_PATTERNS)):
+        for p in patterns:
+            name = f"p{len(pattern_routes)}"
+            pattern_routes[name] = route
+            alternatives.append(rf"(?P<{name}>\b(?:{p})\b)")
+    words = sorted(literals, key=len, reverse=True)
+    alternatives.append("(?:" + "|".join(re.escape(w) for w in words) + ")")
+
+    by_first_char: dict[str, list] = {}
+    for w in words:
+        keywords, routes = literals[w]
+        by_first_char.setdefault(w[0], []).append((w, frozenset(keywords), frozenset(routes)))
+
+    return re.compile("|".join(alternatives)), pattern_routes, by_first_char
+
+
+_QUESTION_RE, _PATTERN_ROUTES, _TERMS_BY_FIRST_CHAR = _build_question_matcher()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def scan_question(q: str) -> QuestionIntent:
+    """
+    Route + analytics intent of a question in one left-to-right pass.
+    """
+    ql = (q or "").strip().lower()
+    keywords: set[str] = set()
+    routes: set[str] = set()
+
+    pos = 0
+    while True:
+        m = _QUESTION_RE.search(ql, pos)
+        if m is None:
+            break
+        start = m.start()
+        if m.lastgroup:
+            routes.add(_PATTERN_ROUTES[m.lastgroup])
+        for word, word_keywords, word_routes in _TERMS_BY_FIRST_CHAR.get(ql[start], ()):
+            if not ql.startswith(word, start):
+                continue
+            keywords |= word_keywords
+            end = start + len(word)
+            if word_routes and (start == 0 or not _is_word_char(ql[start - 1])) and (end == len(ql) or not _is_word_char(ql[end])):
+                routes |= word_routes
+        # next search starts one char later so overlapping terms are not skipped
+        pos = start + 1
+
+    route = next((r for needed, r in ROUTE_PRIORITY if routes.issuperset(needed)), None)
+
+    return QuestionIntent(
+        route=route,
+        wants_list="list" in keywords,
+        mentions_open="open" in keywords,
+        mentions_closed="closed" in keywords,
+        mentions_critical="critical" in keywords,
+        release_readiness="release" in keywords and "readiness" in keywords,
+        resolution="resolution" in keywords,
+        metric=next((m for m in METRIC_PRIORITY if m in keywords), None),
+    )
 
 
 def extract_metric(q: str) -> str | None:
-    ql = (q or "").lower()
-    if "median" in ql:
-        return "median_days"
-    if any(x in ql for x in ["average", "avg", "mean"]):
-        return "avg_days"
-    if "p75" in ql or "75th" in ql:
-        return "p75_days"
-    if "p90" in ql or "90th" in ql:
-        return "p90_days"
-    return None
+    return scan_question(q).metric
+
+
+BUG_ID_RE = re.compile(r"\bBUG-\d+\b")
 
 
 def extract_bug_id(q: str) -> str | None:
-    m = re.search(r"\bBUG-\d+\b", (q or "").upper())
+    m = BUG_ID_RE.search((q or "").upper())
     return m.group(0) if m else None
 
 
+def extract_bug_ids(q: str) -> list[str]:
+    # Every BUG-#### mention (question or pasted id list), in order, without repeats
+    return list(dict.fromkeys(BUG_ID_RE.findall((q or "").upper())))
+
+
 def extract_component(q: str, known_components: list[str]) -> str | None:
+    # One-off helper; handlers use the ComponentMatcher built with the state
+    return ComponentMatcher(known_components).find(q)
+
+
+# -----------------------------
+# RAG metadata filter
+# -----------------------------
+# Status words only count in phrases that are about the bug's state
+# ("crashes when I open the cart" / "after the session is closed" are not)
+OPEN_STATUS_RE = re.compile(
+    r"\b(?:still open|currently open|open (?:bugs?|issues?)|unresolved)\b"
+    r"|(?:\bnot|n't) (?:yet )?(?:been )?(?:fixed|resolved|closed)\b"
+)
+CLOSED_STATUS_RE = re.compile(
+    r"\b(?:(?:closed|resolved|fixed) (?:bugs?|issues?)"
+    r"|already (?:been )?(?:closed|resolved|fixed)"
+    r"|(?:was|were|been|got) (?:closed|resolved|fixed))\b"
+)
+SEVERITY_RE = re.compile(r"\b(?:p|sev)([0-4])\b|\b(critical|blocker)\b")
+
+
+def rag_where(q: str, matcher: ComponentMatcher | None) -> dict | None:
+    """
+    Chroma `where` filter on the bug metadata (component / severity /
+    closed_date) for the entities a RAG question names; None when it names none.
+    """
     ql = (q or "").lower()
+    conditions = []
 
-    norm = [(c, str(c).strip().lower()) for c in known_components if str(c).strip()]
-    norm.sort(key=lambda x: len(x[1]), reverse=True)
+    components = matcher.find_all(ql, exact=True) if matcher is not None else []
+    if components:
+        conditions.append({"component": components[0] if len(components) == 1 else {"$in": components}})
 
-    for original, lc in norm:
-        if lc and lc in ql:
-            return str(original).strip()
-    return None
+    severities = sorted({f"P{m.group(1)}" if m.group(1) else "P0" for m in SEVERITY_RE.finditer(ql)})
+    if severities:
+        conditions.append({"severity": severities[0] if len(severities) == 1 else {"$in": severities}})
 
+    if OPEN_STATUS_RE.search(ql):
+        conditions.append({"closed_date": "OPEN"})
+    elif CLOSED_STATUS_RE.search(ql):
+        conditions.append({"closed_date": {"$ne": "OPEN"}})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
 
 def filter_df_by_component(view_df, component: str | None):
     if not component:
@@ -269,77 +458,101 @@ def filter_df_by_component(view_df, component: str | None):
     return view_df[view_df["component"].astype(str).str.strip().str.lower() == component.strip().lower()]
 
 
-def known_components_from_df(df):
-    return sorted(df["component"].dropna().astype(str).unique().tolist())
-
-
-def has_any(ql: str, words: list[str]) -> bool:
-    return any(w in ql for w in words)
-
-
 def severity_is_p0(df):
-    sev = df["severity"].fillna("").astype(str).str.strip().str.lower()
-    return sev == "p0"
+    return _norm_series(df["severity"]) == "p0"
 
 
 # -----------------------------
 # LOOKUP handlers (BUG-ID)
 # -----------------------------
-def lookup_dispatch(user_question: str, df):
-    bug_id = extract_bug_id(user_question)
-    if not bug_id:
-        print("No BUG-#### id found in the question.")
+# Multi-id lookups print full details up to this many bugs, then a table
+LOOKUP_DETAIL_LIMIT = 5
+
+
+def lookup_dispatch(user_question: str, store, bug_ids: list[str] | None = None, out: AnswerResult | None = None) -> AnswerResult:
+    """
+    Looks up every BUG id in the question (or the given `bug_ids`) through the
+    store's id index. Fills `out` (tables["bugs"] = rows found); without `out`
+    a new result is created and printed.
+    """
+    echo = out is None
+    if echo:
+        out = AnswerResult(question=user_question, route="LOOKUP")
+    _lookup(user_question, store, bug_ids, out)
+    if echo:
+        print_result(out)
+    return out
+
+
+def _lookup(user_question: str, store, bug_ids: list[str] | None, out: AnswerResult):
+    if bug_ids is None:
+        bug_ids = extract_bug_ids(user_question)
+    if not bug_ids:
+        out.say("No BUG-#### id found in the question.")
         return
 
-    view = df[df["id"].astype(str).str.upper() == bug_id.upper()].copy()
+    rows, missing = store.lookup(bug_ids)
 
-    print("=== Lookup (exact BUG id, computed by Python) ===")
-    if view.empty:
-        print(f"No bug found with id: {bug_id}")
+    out.say("=== Lookup (exact BUG id, computed by Python) ===")
+    if len(bug_ids) == 1 and rows.empty:
+        out.say(f"No bug found with id: {bug_ids[0]}")
         return
 
-    row = view.iloc[0]
+    out.tables["bugs"] = rows
+    if len(rows) <= LOOKUP_DETAIL_LIMIT:
+        for pos, row in rows.iterrows():
+            print_bug_details(row, store.text(pos), out)
+    else:
+        view = rows[["id", "title", "component", "severity", "created_date", "closed_date"]].copy()
+        view.insert(4, "status", rows["is_open"].map({True: "OPEN", False: "CLOSED"}))
+        out.say(f"\nFound {len(rows)} of {len(bug_ids)} bugs:")
+        out.table("bugs", view)
+
+    if missing:
+        shown = ", ".join(missing[:50]) + (" ..." if len(missing) > 50 else "")
+        out.say(f"\nNo bug found with id ({len(missing)}): {shown}")
+
 
+def print_bug_details(row, details, out: AnswerResult):
     # Print core fields
     created = row.get("created_date", None)
     closed = row.get("closed_date", None)
     res_days = row.get("resolution_days", None)
 
-    print(f"\nBUG: {row.get('id')}")
-    print(f"Title: {row.get('title')}")
-    print(f"Component: {row.get('component')}")
-    print(f"Severity: {row.get('severity')}")
-    print(f"Status: {'OPEN' if row.get('is_open') else 'CLOSED'}")
-    print(f"Created: {created}")
-    print(f"Closed:  {closed}")
+    out.say(f"\nBUG: {row.get('id')}")
+    out.say(f"Title: {row.get('title')}")
+    out.say(f"Component: {row.get('component')}")
+    out.say(f"Severity: {row.get('severity')}")
+    out.say(f"Status: {'OPEN' if row.get('is_open') else 'CLOSED'}")
+    out.say(f"Created: {created}")
+    out.say(f"Closed:  {closed}")
     if row.get("is_open"):
-        print("Resolution time: (still open)")
+        out.say("Resolution time: (still open)")
     else:
         try:
             if res_days is not None:
-                print(f"Resolution time (days): {float(res_days):.2f}")
+                out.say(f"Resolution time (days): {float(res_days):.2f}")
         except Exception:
-            print(f"Resolution time (days): {res_days}")
+            out.say(f"Resolution time (days): {res_days}")
 
-    details = row.get("text") or ""
     details = str(details).strip()
     if details:
         preview = details[:600]
         if len(details) > 600:
             preview += "..."
-        print("\nDetails:")
-        print(preview)
+        out.say("\nDetails:")
+        out.say(preview)
 
 
 # -----------------------------
 # Analytics handlers
 # -----------------------------
-def show_release_readiness(df, open_by_component, user_question: str):
-    component = extract_component(user_question, known_components_from_df(df))
+def show_release_readiness(cube, matcher, open_by_component, open_critical, user_question: str, out: AnswerResult):
+    component = matcher.find(user_question)
 
-    # totals
-    total_open = int(df[df["is_open"]].shape[0])
-    total_p0_open = int(df[df["is_open"] & severity_is_p0(df)].shape[0])
+    # totals (cube slices, no row scan)
+    total_open = cube.count(status="open")
+    total_p0_open = cube.count(status="open", severity="p0")
 
     # top risky components by open count
     view_open = open_by_component.copy()
@@ -347,47 +560,46 @@ def show_release_readiness(df, open_by_component, user_question: str):
     view_open_sorted = view_open.sort_values(by="open_bugs", ascending=False) if not view_open.empty else view_open
 
     # top risky components by open P0 count
-    open_p0 = df[df["is_open"] & severity_is_p0(df)].copy()
-    if component:
-        open_p0 = filter_df_by_component(open_p0, component)
-
     open_p0_by_component = (
-        open_p0.groupby("component")["id"]
-        .count()
+        cube.by_component(status="open", severity="p0", component=component)
         .sort_values(ascending=False)
         .rename("open_critical_bugs")
         .reset_index()
     )
 
-    print("\n--- Release readiness summary" + (f" | Component: {component}" if component else "") + " ---")
-    print(f"Total open bugs: {total_open}")
-    print(f"Total open P0 (critical) bugs: {total_p0_open}")
+    # open P0 rows come from the precomputed open_critical report (already sorted by created_date)
+    open_p0 = filter_df_by_component(open_critical, component)
 
-    print("\nTop components by open bugs:")
+    out.say("\n--- Release readiness summary" + (f" | Component: {component}" if component else "") + " ---")
+    out.say(f"Total open bugs: {total_open}")
+    out.say(f"Total open P0 (critical) bugs: {total_p0_open}")
+
+    out.say("\nTop components by open bugs:")
     if view_open_sorted.empty:
-        print("No open bugs found.")
+        out.say("No open bugs found.")
     else:
-        print(view_open_sorted.to_string(index=False))
+        out.table("open_by_component", view_open_sorted)
 
-    print("\nTop components by open P0 (critical) bugs:")
+    out.say("\nTop components by open P0 (critical) bugs:")
     if open_p0_by_component.empty:
-        print("No open P0 bugs found.")
+        out.say("No open P0 bugs found.")
     else:
-        print(open_p0_by_component.to_string(index=False))
+        out.table("open_critical_by_component", open_p0_by_component)
 
     # Show oldest open P0 list (high value)
     cols = ["id", "title", "component", "severity", "created_date"]
     cols = [c for c in cols if c in open_p0.columns]
-    print("\nOldest open P0 (critical) bugs:")
+    out.say("\nOldest open P0 (critical) bugs:")
     if open_p0.empty:
-        print("No open P0 bugs found.")
+        out.say("No open P0 bugs found.")
     else:
-        print(open_p0[cols].sort_values(by="created_date", ascending=True).to_string(index=False))
+        out.table("open_critical", open_p0[cols])
 
 
-def show_resolution_metric(question: str, resolution_by_component, df):
-    metric = extract_metric(question) or "median_days"
-    component = extract_component(question, known_components_from_df(df))
+def show_resolution_metric(question: str, resolution_by_component, cube, matcher, out: AnswerResult, intent: QuestionIntent | None = None):
+    intent = intent or scan_question(question)
+    metric = intent.metric or "median_days"
+    component = matcher.find(question)
 
     view = resolution_by_component[["component", metric]].copy()
     view = filter_df_by_component(view, component)
@@ -395,98 +607,122 @@ def show_resolution_metric(question: str, resolution_by_component, df):
     if not component:
         view = view.sort_values(by=metric, ascending=False)
 
-    print(f"\n--- Resolution metric: {metric}" + (f" | Component: {component}" if component else "") + " ---")
+    out.say(f"\n--- Resolution metric: {metric}" + (f" | Component: {component}" if component else "") + " ---")
     if view.empty:
-        print("No data found for that component/metric (maybe no closed bugs for it yet).")
+        out.say("No data found for that component/metric (maybe no closed bugs for it yet).")
     else:
-        print(view.to_string(index=False))
+        out.table("resolution_by_component", view)
 
 
-def show_open_bugs_list(df, question: str):
-    component = extract_component(question, known_components_from_df(df))
+def add_breakdown_tables(cube, status: str, component: str | None, out: AnswerResult, by_component: bool = False):
+    """
+    Per-severity (and, with by_component, per-component) counts for the same
+    status / component filter, sliced from the cube. Stored in out.tables for
+    the UI's charts only: the text report is unchanged.
+    """
+    by_severity = cube.by_severity(status=status, component=component)
+    if not by_severity.empty:
+        by_severity.index = by_severity.index.map(lambda sev: str(sev).strip() or "unknown")
+        out.tables[f"{status}_by_severity"] = by_severity.sort_values(ascending=False).rename(f"{status}_bugs").reset_index()
+    if by_component and not component:
+        counts = cube.by_component(status=status)
+        if not counts.empty:
+            out.tables[f"{status}_by_component"] = counts.sort_values(ascending=False).rename(f"{status}_bugs").reset_index()
+
+
+def show_open_bugs_list(df, cube, matcher, question: str, out: AnswerResult):
+    component = matcher.find(question)
     view = df[df["is_open"]].copy()
     view = filter_df_by_component(view, component)
 
     cols = ["id", "title", "component", "severity", "created_date"]
     cols = [c for c in cols if c in view.columns]
 
-    print("\n--- Open bugs (detailed)" + (f" | Component: {component}" if component else "") + " ---")
+    out.say("\n--- Open bugs (detailed)" + (f" | Component: {component}" if component else "") + " ---")
     if view.empty:
-        print("No open bugs found." if not component else "No open bugs found for that component.")
+        out.say("No open bugs found." if not component else "No open bugs found for that component.")
     else:
-        print(view[cols].sort_values(by="created_date", ascending=True).to_string(index=False))
+        out.table("open_bugs", view[cols].sort_values(by="created_date", ascending=True))
+        add_breakdown_tables(cube, "open", component, out)
 
 
-def show_closed_bugs_list(df, question: str):
-    component = extract_component(question, known_components_from_df(df))
+def show_closed_bugs_list(df, cube, matcher, question: str, out: AnswerResult):
+    component = matcher.find(question)
     view = df[~df["is_open"]].copy()
     view = filter_df_by_component(view, component)
 
     cols = ["id", "title", "component", "severity", "created_date", "closed_date", "resolution_days"]
     cols = [c for c in cols if c in view.columns]
 
-    print("\n--- Closed bugs (detailed)" + (f" | Component: {component}" if component else "") + " ---")
+    out.say("\n--- Closed bugs (detailed)" + (f" | Component: {component}" if component else "") + " ---")
     if view.empty:
-        print("No closed bugs found." if not component else "No closed bugs found for that component.")
+        out.say("No closed bugs found." if not component else "No closed bugs found for that component.")
     else:
         sort_col = "closed_date" if "closed_date" in view.columns else "created_date"
-        print(view[cols].sort_values(by=sort_col, ascending=True).to_string(index=False))
+        out.table("closed_bugs", view[cols].sort_values(by=sort_col, ascending=True))
+        add_breakdown_tables(cube, "closed", component, out)
 
 
-def show_open_bugs_count(open_by_component, df, question: str):
-    component = extract_component(question, known_components_from_df(df))
+def show_open_bugs_count(open_by_component, cube, matcher, question: str, out: AnswerResult):
+    component = matcher.find(question)
     view = open_by_component.copy()
     view = filter_df_by_component(view, component)
 
-    print("\n--- Open bugs count" + (f" | Component: {component}" if component else "") + " ---")
+    out.say("\n--- Open bugs count" + (f" | Component: {component}" if component else "") + " ---")
     if component and view.empty:
-        print(f"{component}  0")
+        out.say(f"{component}  0")
     else:
-        print(view.to_string(index=False))
+        out.table("open_by_component", view)
+        add_breakdown_tables(cube, "open", component, out)
 
 
-def show_closed_bugs_count(df, question: str):
-    component = extract_component(question, known_components_from_df(df))
-    view = df[~df["is_open"]].copy()
-    view = filter_df_by_component(view, component)
-
-    n = int(view.shape[0])
+def show_closed_bugs_count(cube, matcher, question: str, out: AnswerResult):
+    component = matcher.find(question)
+    n = cube.count(status="closed", component=component)
     if component:
-        print(f"\nClosed bugs for {component}: {n}")
+        out.say(f"\nClosed bugs for {component}: {n}")
     else:
-        print(f"\nClosed bugs (total): {n}")
+        out.say(f"\nClosed bugs (total): {n}")
+    add_breakdown_tables(cube, "closed", component, out, by_component=True)
 
 
-def show_critical_bugs(df, question: str):
+def show_critical_bugs(df, cube, matcher, open_critical, question: str, out: AnswerResult, intent: QuestionIntent | None = None):
     """
     If question mentions open -> open P0 only
     If mentions closed -> closed P0 only
     Else -> all P0 (open + closed)
     """
-    ql = (question or "").lower()
-    component = extract_component(question, known_components_from_df(df))
+    intent = intent or scan_question(question)
+    component = matcher.find(question)
 
-    view = df[severity_is_p0(df)].copy()
-    view = filter_df_by_component(view, component)
-
-    mentions_open = has_any(ql, OPEN_SYNONYMS) or "open" in ql
-    mentions_closed = has_any(ql, CLOSED_SYNONYMS) or "closed" in ql
+    mentions_open = intent.mentions_open
+    mentions_closed = intent.mentions_closed
 
+    presorted = False
     if mentions_open and not mentions_closed:
-        view = view[view["is_open"]]
+        # precomputed report (already sorted by created_date), no row scan
+        view = filter_df_by_component(open_critical, component)
         title = "Open P0 (critical) bugs"
+        presorted = True
     elif mentions_closed and not mentions_open:
-        view = view[~view["is_open"]]
+        view = df[severity_is_p0(df) & ~df["is_open"]]
+        view = filter_df_by_component(view, component)
         title = "Closed P0 (critical) bugs"
     else:
+        view = df[severity_is_p0(df)]
+        view = filter_df_by_component(view, component)
         title = "P0 (critical) bugs (all)"
 
     cols = ["id", "title", "component", "severity", "created_date", "closed_date", "resolution_days"]
     cols = [c for c in cols if c in view.columns]
 
-    print(f"\n--- {title}" + (f" | Component: {component}" if component else "") + " ---")
+    out.say(f"\n--- {title}" + (f" | Component: {component}" if component else "") + " ---")
     if view.empty:
-        print("No P0 (critical) bugs found." if not component else "No P0 (critical) bugs found for that component.")
+        out.say("No P0 (critical) bugs found." if not component else "No P0 (critical) bugs found for that component.")
+        return
+
+    if presorted:
+        out.table("critical_bugs", view[cols])
         return
 
     # Sort: open by created_date, closed by closed_date when available
@@ -494,92 +730,86 @@ def show_critical_bugs(df, question: str):
     if not view["is_open"].any() and "closed_date" in view.columns:
         sort_col = "closed_date"
 
-    print(view[cols].sort_values(by=sort_col, ascending=True).to_string(index=False))
+    out.table("critical_bugs", view[cols].sort_values(by=sort_col, ascending=True))
 
 
-def analytics_dispatch(user_question: str, df, open_by_component, resolution_by_component, open_critical, open_critical_by_component):
-    ql = user_question.lower()
-    print("=== Analytics (computed by Python, not guessed) ===")
+def analytics_dispatch(user_question: str, df, open_by_component, resolution_by_component, open_critical, open_critical_by_component, cube=None, intent=None, component_matcher=None, out: AnswerResult | None = None) -> AnswerResult:
+    """
+    `cube` is the AggregateCube and `component_matcher` the ComponentMatcher built
+    once per dataset (see build_aggregate_cube); both are built on the fly when not
+    passed. `intent` is the QuestionIntent from scan_question() when the caller
+    already routed the question. Fills `out`; without `out` a new result is
+    created and printed.
+    """
+    if cube is None:
+        cube = build_aggregate_cube(df)
+    if component_matcher is None:
+        component_matcher = ComponentMatcher(cube.components)
+    if intent is None:
+        intent = scan_question(user_question)
+
+    echo = out is None
+    if echo:
+        out = AnswerResult(question=user_question, route="ANALYTICS")
+    _analytics(user_question, df, open_by_component, resolution_by_component, open_critical, cube, intent, component_matcher, out)
+    if echo:
+        print_result(out)
+    return out
+
+
+def _analytics(user_question: str, df, open_by_component, resolution_by_component, open_critical, cube, intent, component_matcher, out: AnswerResult):
+    out.say("=== Analytics (computed by Python, not guessed) ===")
 
-    wants_list  = has_any(ql, LIST_WORDS)
-    wants_count = has_any(ql, COUNT_WORDS)
+    wants_list  = intent.wants_list
 
-    mentions_open     = has_any(ql, OPEN_SYNONYMS) or "open bugs" in ql
-    mentions_closed   = has_any(ql, CLOSED_SYNONYMS) or "closed bugs" in ql
-    mentions_critical = has_any(ql, CRITICAL_SYNONYMS)
+    mentions_open     = intent.mentions_open
+    mentions_closed   = intent.mentions_closed
+    mentions_critical = intent.mentions_critical
 
     # Release readiness
-    if "release readiness" in ql or ("release" in ql and "readiness" in ql):
-        show_release_readiness(df, open_by_component, user_question)
+    if intent.release_readiness:
+        show_release_readiness(cube, component_matcher, open_by_component, open_critical, user_question, out)
         return
 
     # Resolution metrics (by component)
-    if has_any(ql, ["median", "average", "avg", "mean", "p75", "p90", "percentile", "resolution", "time to close", "sla"]):
-        show_resolution_metric(user_question, resolution_by_component, df)
+    if intent.resolution:
+        show_resolution_metric(user_question, resolution_by_component, cube, component_matcher, out, intent)
         return
 
     # Critical bugs (P0) list (all/open/closed based on question)
     if mentions_critical:
-        show_critical_bugs(df, user_question)
+        show_critical_bugs(df, cube, component_matcher, open_critical, user_question, out, intent)
         return
 
     # Closed bugs
     if mentions_closed:
         if wants_list:
-            show_closed_bugs_list(df, user_question)
+            show_closed_bugs_list(df, cube, component_matcher, user_question, out)
         else:
-            show_closed_bugs_count(df, user_question)
+            show_closed_bugs_count(cube, component_matcher, user_question, out)
         return
 
     # Open bugs
     if mentions_open:
         if wants_list:
-            show_open_bugs_list(df, user_question)
+            show_open_bugs_list(df, cube, component_matcher, user_question, out)
         else:
-            show_open_bugs_count(open_by_component, df, user_question)
+            show_open_bugs_count(open_by_component, cube, component_matcher, user_question, out)
         return
 
     # Default: open bugs count by component
-    show_open_bugs_count(open_by_component, df, user_question)
+    show_open_bugs_count(open_by_component, cube, component_matcher, user_question, out)
 
 
 # -----------------------------
 # Routing (Hybrid)
 # -----------------------------
 def rule_route(q: str) -> str | None:
-    ql = (q or "").strip().lower()
-
-    # 1) BUG-ID lookup always wins
-    if re.search(r"\bbug-\d+\b", ql):
-        return "LOOKUP"
-
-    # 2) Analytics patterns (include critical synonyms!)
-    analytics_patterns = [
-        r"\bmedian\b", r"\baverage\b", r"\bavg\b", r"\bmean\b",
-        r"\bp\d{2}\b",
-        r"\bpercentile\b",
-        r"\bhow many\b", r"\bcount\b", r"\bnumber of\b", r"\btotal\b",
-        r"\bby component\b", r"\bbreakdown\b",
-        r"\bresolution time\b", r"\btime to close\b", r"\bsla\b",
-        r"\brelease readiness\b",
-        r"\btrend\b", r"\bover (last|past)\b", r"\bper week\b", r"\bper month\b",
-        r"\bopen\b", r"\bclosed\b", r"\bresolved\b", r"\bfixed\b", r"\bsolved\b",
-        r"\bcritical\b", r"\bp0\b", r"\bblocker\b", r"\bsev0\b",
-    ]
-    if any(re.search(p, ql) for p in analytics_patterns):
-        return "ANALYTICS"
-
-    # 3) RAG patterns
-    rag_patterns = [
-        r"\bis there (a|any) (known )?bug\b",
-        r"\bknown issue\b",
-        r"\bsimilar bug\b",
-        r"\brelated to\b",
-        r"\bwhy does\b",
-        r"\bwhat causes\b",
-        r"\bwhich bug\b",
-    ]
-    if any(re.search(p, ql) for p in rag_patterns):
-        return "RAG"
-
-    return None
+    """
+    1) BUG-ID lookup always wins
+    2) Analytics patterns
+    3) Status / severity words with a list word (include critical synonyms!)
+    4) RAG patterns
+    5) Status / severity words on their own
+    """
+    return scan_question(q).route
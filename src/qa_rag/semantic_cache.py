@@ -0,0 +1,98 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+
+# Entries kept (0 disables the cache) and minimum cosine similarity between
+# a new question and a cached one
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "256"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    evidence_ids: frozenset
+    answer: str
+    used_ids: list[str]
+    data_version: str
+
+
+class SemanticAnswerCache:
+    """
+    Grounded RAG answers reused for near-duplicate questions.
+
+    A cached answer is returned when the new question's embedding is within
+    `threshold` cosine similarity of a cached question AND retrieval returned
+    the same bug ids AND the data version is the same. LRU-bounded.
+    """
+
+    def __init__(self, max_entries: int = SEMANTIC_CACHE_SIZE, threshold: float = SEMANTIC_CACHE_THRESHOLD):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries: OrderedDict[int, tuple[np.ndarray, CachedAnswer]] = OrderedDict()
+        self._matrix: np.ndarray | None = None  # unit vectors of _entries, in order
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, embedding, evidence_ids, data_version: str = "") -> CachedAnswer | None:
+        vec = _unit(embedding)
+        evidence_ids = frozenset(evidence_ids)
+        with self._lock:
+            if not self._entries:
+                return None
+            keys = list(self._entries)
+            if self._matrix is None:
+                self._matrix = np.stack([self._entries[k][0] for k in keys])
+            sims = self._matrix @ vec
+            for i in np.argsort(-sims):
+                if sims[i] < self.threshold:
+                    break
+                entry = self._entries[keys[i]][1]
+                if entry.evidence_ids == evidence_ids and entry.data_version == data_version:
+                    self._entries.move_to_end(keys[i])
+                    self._matrix = None
+                    return entry
+            return None
+
+    def store(self, question: str, embedding, evidence_ids, answer: str, used_ids, data_version: str = "") -> None:
+        entry = CachedAnswer(
+            question=question,
+            evidence_ids=frozenset(evidence_ids),
+            answer=answer,
+            used_ids=list(used_ids),
+            data_version=data_version,
+        )
+        with self._lock:
+            self._entries[self._next_key] = (_unit(embedding), entry)
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def use_data_version(self, data_version: str) -> None:
+        with self._lock:
+            for key in [k for k, (_, e) in self._entries.items() if e.data_version != data_version]:
+                del self._entries[key]
+            self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _unit(embedding) -> np.ndarray:
+    vec = np.asarray(embedding, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticAnswerCache | None:
+    # Process-wide cache configured from env; None when disabled
+    if SEMANTIC_CACHE_SIZE <= 0:
+        return None
+    return SemanticAnswerCache()
@@ -0,0 +1,142 @@
+import math
+import random
+
+import numpy as np
+
+
+# Default accuracy knob: rank error is roughly 1.7 / k (k=200 -> <1% of n)
+DEFAULT_K = 200
+
+
+class QuantileSketch:
+    """
+    Small mergeable quantile summary (KLL-style compactor hierarchy).
+
+    - update()/update_many() add values, merge() combines two summaries
+      (e.g. two time windows or two datasets) without the raw values.
+    - quantile(q) has bounded rank error; while nothing was compacted yet
+      (n small) it is exact and matches pandas' linear interpolation.
+    - count/mean are exact.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed: int = 0):
+        self.k = k
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self.n = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._rng = random.Random(seed)
+
+    # -------------------------
+    # Build
+    # -------------------------
+    def update(self, value: float) -> None:
+        self.update_many([value])
+
+    def update_many(self, values) -> None:
+        arr = np.asarray(values, dtype=float)
+        arr = arr[~np.isnan(arr)]
+        if not arr.size:
+            return
+        self.n += int(arr.size)
+        self.total += float(arr.sum())
+        self.min = min(self.min, float(arr.min()))
+        self.max = max(self.max, float(arr.max()))
+        self.levels[0] = np.concatenate([self.levels[0], arr])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Folds `other` into this sketch (in place) and returns self.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.n += other.n
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    # -------------------------
+    # Query
+    # -------------------------
+    @property
+    def count(self) -> int:
+        return self.n
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else math.nan
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        if len(self.levels) == 1:
+            # Exact: same linear interpolation as pandas Series.quantile
+            values = np.sort(self.levels[0])
+            pos = (len(values) - 1) * q
+            lo = int(pos)
+            hi = min(lo + 1, len(values) - 1)
+            return float(values[lo] + (values[hi] - values[lo]) * (pos - lo))
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        cum = np.cumsum(weights[order])
+        idx = int(np.searchsorted(cum, q * cum[-1], side="left"))
+        return float(values[order][min(idx, len(values) - 1)])
+
+    # -------------------------
+    # (De)serialization, e.g. to keep per-window summaries on disk
+    # -------------------------
+    def to_dict(self) -> dict:
+        return {
+            "k": self.k,
+            "n": self.n,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "levels": [level.tolist() for level in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(k=int(data["k"]))
+        sketch.n = int(data["n"])
+        sketch.total = float(data["total"])
+        sketch.min = float(data["min"])
+        sketch.max = float(data["max"])
+        sketch.levels = [np.asarray(level, dtype=float) for level in data["levels"]] or [np.empty(0)]
+        return sketch
+
+    # -------------------------
+    # Compaction
+    # -------------------------
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        while sum(len(level) for level in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            for h, level in enumerate(self.levels):
+                if len(level) < self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                # odd leftover stays at this level; the rest is halved and promoted (weight x2)
+                keep = level[-1:] if len(level) % 2 else level[:0]
+                body = level[:-1] if len(level) % 2 else level
+                offset = self._rng.randint(0, 1)
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], body[offset::2]])
+                self.levels[h] = keep
+                break
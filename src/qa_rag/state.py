@@ -1,21 +1,61 @@
 from dataclasses import dataclass
-from typing import Any, List, Dict
+from typing import Any
+
+from .bug_store import BugStore
 
 @dataclass
 class ProjectState:
-    # dataset
-    bugs: List[Dict]
+    # dataset (single columnar copy; df below is store.frame, not a second copy)
+    store: BugStore
 
-    # analytics
-    df: Any
-    open_by_component: Any
-    resolution_by_component: Any
-    open_critical: Any
-    open_critical_by_component: Any
+    # analytics: the four analytics.analytics_reports() frames of the loaded data
+    # (open_by_component, resolution_by_component, open_critical,
+    # open_critical_by_component; read them through the properties below)
+    reports: tuple
+    cube: Any  # AggregateCube: status x component x severity counts
+    component_matcher: Any  # ComponentMatcher over the dataset's component names
 
-    # rag
+    # rag (a chroma_store.LazyCollection until the first RAG request opens it)
     collection: Any
 
     # llm config
     OLLAMA_URL: str
     MODEL: str
+
+    # hash of every bug's fingerprint; scopes cached LLM responses
+    data_version: str = ""
+
+    # live_reports.LiveReports kept current by bug events, created by the first
+    # app.upsert_bugs() call (None until then); from then on the report
+    # properties are served from it, materialized only when read
+    live_reports: Any = None
+
+    @property
+    def bugs(self) -> BugStore:
+        # Backward-compatible name: len() and iteration (lazy bug records) still work
+        return self.store
+
+    @property
+    def df(self):
+        return self.store.frame
+
+    def _report(self, i: int):
+        if self.live_reports is not None:
+            return self.live_reports.reports()[i]
+        return self.reports[i]
+
+    @property
+    def open_by_component(self):
+        return self._report(0)
+
+    @property
+    def resolution_by_component(self):
+        return self._report(1)
+
+    @property
+    def open_critical(self):
+        return self._report(2)
+
+    @property
+    def open_critical_by_component(self):
+        return self._report(3)
@@ -0,0 +1,210 @@
+"""
+Synthetic bug corpus for scale and load testing.
+
+    python -m qa_rag.synthetic --rows 1000000 --seed 7 --out bugs_1m.csv
+
+Writes the CSV schema load_bugs_from_csv / iter_bug_chunks read, one row at a
+time (constant memory). Same rows + seed -> byte-identical file.
+"""
+
+import argparse
+import csv
+import math
+import random
+import sys
+from collections import deque
+from datetime import date, timedelta
+from typing import Iterator
+
+CSV_COLUMNS = ["id", "title", "component", "severity", "created_date", "closed_date", "text"]
+
+# Component popularity falls off like a Zipf law (rank ** -COMPONENT_SKEW)
+COMPONENTS = [
+    "Checkout", "Payments", "Auth", "Orders", "Cart", "Search", "Home", "Tracking",
+    "Notifications", "Address", "Menu", "DeepLinks", "Profile", "Settings", "Onboarding",
+    "Reviews", "Loyalty", "Delivery", "Chat", "Maps", "Media", "Accessibility",
+    "Localization", "Analytics",
+]
+COMPONENT_SKEW = 1.1
+
+SEVERITIES = ["P0", "P1", "P2", "P3", "P4"]
+SEVERITY_WEIGHTS = [3, 12, 40, 35, 10]
+
+# Median days to close per severity (log-normal around it)
+RESOLUTION_MEDIAN_DAYS = {"P0": 2, "P1": 5, "P2": 12, "P3": 25, "P4": 45}
+RESOLUTION_SIGMA = 0.9
+# Share of bugs nobody ever closes (won't fix / forgotten), on top of the ones still in progress
+NEVER_CLOSED = 0.15
+
+# Near-duplicates are re-reports of one of the last DUPLICATE_POOL bugs
+DUPLICATE_RATE = 0.15
+DUPLICATE_POOL = 500
+
+# Text length: extra note sentences (geometric) and, for some bugs, a log excerpt
+NOTE_CONTINUE = 0.55
+LOG_RATE = 0.08
+LOG_LINES_MEDIAN = 25
+LOG_LINES_MAX = 400
+
+PLATFORMS = ["iOS 17", "iOS 16", "Android 14", "Android 13", "Android 12", "web (Chrome)", "web (Safari)"]
+SYMPTOMS = [
+    "button stays disabled", "screen freezes", "app crashes", "list becomes empty",
+    "duplicates appear", "wrong total is shown", "spinner never stops", "request times out",
+    "user is logged out", "notification never arrives", "order remains pending",
+    "text is cut off", "map does not load", "image is blurry", "layout overlaps the keyboard",
+]
+ACTIONS = [
+    "tap Checkout", "apply a promo code", "pay with Apple Pay", "pay with a saved card",
+    "open a deep link", "add a new address", "search and apply a filter", "relaunch the app",
+    "open order tracking", "switch language", "rotate the device", "go back from the payment sheet",
+    "enable dark mode", "log in with Google", "reorder a past order",
+]
+NOTES = [
+    "Workaround: restart the app.",
+    "Happens on slow network only.",
+    "Started after the last release.",
+    "Backend returns 500 intermittently.",
+    "Reproduced by QA on two devices.",
+    "Not reproducible on staging.",
+    "Customer support received several tickets.",
+    "Crashlytics shows a spike for this screen.",
+    "Only for users with more than one saved address.",
+    "Token refresh endpoint returns 401.",
+]
+LOG_LEVELS = ["DEBUG", "INFO", "INFO", "WARN", "ERROR"]
+LOG_SOURCES = ["net.http", "ui.render", "payments.sdk", "auth.session", "db.cache", "push.fcm"]
+# Words a re-report may say differently
+REWORDINGS = {
+    "stays": "remains", "remains": "stays", "crashes": "closes unexpectedly", "freezes": "hangs",
+    "never": "does not", "wrong": "incorrect", "empty": "blank", "tap": "press", "open": "go to",
+}
+
+
+def component_weights(components: list[str] = COMPONENTS, skew: float = COMPONENT_SKEW) -> list[float]:
+    return [1.0 / (rank + 1) ** skew for rank in range(len(components))]
+
+
+def resolution_days(rng: random.Random, severity: str) -> int:
+    median = RESOLUTION_MEDIAN_DAYS.get(severity, 15)
+    return max(1, int(round(rng.lognormvariate(math.log(median), RESOLUTION_SIGMA))))
+
+
+def bug_text(rng: random.Random, component: str, action: str, symptom: str, where: str) -> str:
+    parts = [
+        f"Steps: open {component.lower()} -> {action}.",
+        f"Actual: {symptom}.",
+        "Expected: flow completes.",
+        f"Observed on {where}, build {rng.randrange(3, 6)}.{rng.randrange(0, 30)}.{rng.randrange(0, 10)}.",
+    ]
+    while rng.random() < NOTE_CONTINUE:
+        parts.append(rng.choice(NOTES))
+    text = " ".join(parts)
+
+    if rng.random() < LOG_RATE:
+        lines = min(LOG_LINES_MAX, max(1, int(rng.lognormvariate(math.log(LOG_LINES_MEDIAN), 1.0))))
+        log = [
+            f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d} "
+            f"{rng.choice(LOG_LEVELS)} {rng.choice(LOG_SOURCES)} {rng.choice(SYMPTOMS)} (code {rng.randrange(100, 600)})"
+            for _ in range(lines)
+        ]
+        text += "\nLogs:\n" + "\n".join(log)
+    return text
+
+
+def reword(rng: random.Random, text: str, rate: float = 0.3) -> str:
+    # Near-duplicate wording: some words swapped for synonyms
+    return " ".join(
+        REWORDINGS[w] if w in REWORDINGS and rng.random() < rate else w
+        for w in text.split(" ")
+    )
+
+
+def iter_synthetic_bugs(
+    n: int,
+    seed: int = 0,
+    start_id: int = 100000,
+    start_date: date = date(2024, 1, 1),
+    days: int = 730,
+    duplicate_rate: float = DUPLICATE_RATE,
+) -> Iterator[dict]:
+    """
+    n bugs shaped like data.row_to_bug output, generated one at a time.
+
+    - component: Zipf-skewed; severity: mostly P2/P3, few P0
+    - created_date: uniform over `days` days from start_date; closed_date after a
+      log-normal, severity-dependent resolution time, left open when that falls
+      after the end of the range (or for the NEVER_CLOSED share)
+    - duplicate_rate of the bugs re-report a recent one (same component and
+      symptom, reworded title/text, other platform)
+    - text: steps / actual / expected plus a variable number of notes; a few
+      bugs carry a long log excerpt
+    """
+    rng = random.Random(seed)
+    weights = component_weights()
+    as_of = start_date + timedelta(days=days)
+    recent: deque = deque(maxlen=DUPLICATE_POOL)
+
+    for i in range(n):
+        where = rng.choice(PLATFORMS)
+        if recent and rng.random() < duplicate_rate:
+            component, severity, action, symptom, title, text = recent[rng.randrange(len(recent))]
+            title = reword(rng, title.rsplit(" on ", 1)[0]) + f" on {where}"
+            text = reword(rng, text.split("\nLogs:", 1)[0]) + f" Seen again on {where}."
+        else:
+            component = rng.choices(COMPONENTS, weights)[0]
+            severity = rng.choices(SEVERITIES, SEVERITY_WEIGHTS)[0]
+            action = rng.choice(ACTIONS)
+            symptom = rng.choice(SYMPTOMS)
+            title = f"{symptom.capitalize()} when trying to {action} on {where}"
+            text = bug_text(rng, component, action, symptom, where)
+            recent.append((component, severity, action, symptom, title, text))
+
+        created = start_date + timedelta(days=rng.randrange(days))
+        closed = created + timedelta(days=resolution_days(rng, severity))
+        is_open = closed > as_of or rng.random() < NEVER_CLOSED
+
+        yield {
+            "id": f"BUG-{start_id + i}",
+            "title": title,
+            "component": component,
+            "severity": severity,
+            "created_date": created.isoformat(),
+            "closed_date": None if is_open else closed.isoformat(),
+            "text": text,
+        }
+
+
+def write_bugs_csv(path: str, bugs: Iterator[dict]) -> int:
+    # Streams bugs to a CSV in the ingest schema; returns the row count
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for bug in bugs:
+            writer.writerow({**bug, "closed_date": bug["closed_date"] or ""})
+            rows += 1
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic bug CSV (same schema as bugs_sample_20.csv).")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--out", required=True, help="CSV path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-id", type=int, default=100000)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(2024, 1, 1))
+    parser.add_argument("--days", type=int, default=730, help="created dates span this many days")
+    parser.add_argument("--duplicate-rate", type=float, default=DUPLICATE_RATE)
+    args = parser.parse_args(argv)
+
+    bugs = iter_synthetic_bugs(
+        args.rows, seed=args.seed, start_id=args.start_id,
+        start_date=args.start_date, days=args.days, duplicate_rate=args.duplicate_rate,
+    )
+    rows = write_bugs_csv(args.out, bugs)
+    print(f"Wrote {rows} bugs to {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+import json
+import os
+import threading
+from typing import Protocol
+
+import numpy as np
+
+
+# Which vector store backs the RAG collection:
+# - chroma: persistent Chroma collection (default)
+# - numpy:  in-process exact search over a normalized float32 matrix; filled
+#           from the persistent embedding cache, so a restart costs no inference
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+
+QUERY_INCLUDE_DEFAULT = ["metadatas", "documents", "distances"]
+
+# Distance every backend returns: 1 - cosine similarity (Chroma collections are
+# created in this space, see open_chroma_collection)
+DISTANCE_SPACE = "cosine"
+
+# Candidate masks kept per NumpyVectorStore, by `where` filter
+MASK_CACHE_SIZE = 64
+
+
+class VectorStore(Protocol):
+    """
+    The part of the Chroma collection API the app uses. Chroma collections
+    satisfy it as-is; NumpyVectorStore implements it in process.
+    """
+
+    def count(self) -> int: ...
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None) -> dict: ...
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None) -> None: ...
+
+    def delete(self, ids=None) -> None: ...
+
+    def query(self, query_embeddings=None, n_results: int = 10, where=None, include=None) -> dict: ...
+
+
+def distance_space(store) -> str:
+    """
+    Metric of a store's query distances: "cosine", "l2" (squared) or "ip".
+    Read from the collection configuration (chromadb >= 1.0) or the
+    "hnsw:space" metadata; Chroma's default is l2.
+    """
+    config = getattr(store, "configuration", None)
+    if isinstance(config, dict) and isinstance(config.get("hnsw"), dict) and config["hnsw"].get("space"):
+        return config["hnsw"]["space"]
+    metadata = getattr(store, "metadata", None) or {}
+    return metadata.get("hnsw:space", "l2")
+
+
+def vector_distances(space: str, query, vectors) -> np.ndarray:
+    """
+    Distances from `query` to each row of `vectors` as a store in `space` reports
+    them (Chroma's formulas: l2 is squared, ip is 1 - dot product).
+    """
+    query = np.asarray(query, dtype=np.float32)
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if space == "cosine":
+        return 1.0 - _normalize(vectors) @ (query / (np.linalg.norm(query) or 1.0))
+    if space == "l2":
+        return ((vectors - query) ** 2).sum(axis=1)
+    if space == "ip":
+        return 1.0 - vectors @ query
+    raise ValueError(f"Unknown distance space {space!r} (expected cosine, l2 or ip)")
+
+
+_numpy_stores: dict[str, "NumpyVectorStore"] = {}
+_numpy_stores_lock = threading.Lock()
+
+
+def open_vector_store(collection_name: str = "bugs", backend: str | None = None, force_rebuild: bool = False) -> VectorStore:
+    backend = backend or VECTOR_BACKEND
+    if backend == "chroma":
+        from .chroma_store import open_chroma_collection
+        return open_chroma_collection(collection_name, force_rebuild=force_rebuild)
+    if backend != "numpy":
+        raise ValueError(f"Unknown vector backend {backend!r} (expected chroma or numpy)")
+
+    # one store per collection name and process (later syncs are incremental)
+    with _numpy_stores_lock:
+        if force_rebuild or collection_name not in _numpy_stores:
+            _numpy_stores[collection_name] = NumpyVectorStore()
+        return _numpy_stores[collection_name]
+
+
+class NumpyVectorStore:
+    """
+    Exact cosine search: vectors are L2-normalized into one float32 matrix and
+    a batch of queries is a single matrix product plus argpartition top-k.
+    Distances are 1 - cosine similarity (DISTANCE_SPACE, what the Chroma
+    collection returns). Results have Chroma's shape.
+
+    A `where` filter becomes a row mask, computed once per filter and reused
+    until the next write.
+    """
+
+    metadata = {"hnsw:space": DISTANCE_SPACE}
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.documents: list[str | None] = []
+        self.metadatas: list[dict | None] = []
+        self._rows: dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)  # capacity >= len(ids)
+        self._masks: dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None) -> None:
+        if embeddings is None:
+            raise ValueError("NumpyVectorStore needs embeddings (it has no embedding function)")
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            self._masks.clear()
+            self._reserve(len(self.ids) + len(ids), vectors.shape[1])
+            for i, bug_id in enumerate(ids):
+                row = self._rows.get(bug_id)
+                if row is None:
+                    row = len(self.ids)
+                    self._rows[bug_id] = row
+                    self.ids.append(bug_id)
+                    self.documents.append(None)
+                    self.metadatas.append(None)
+                self._matrix[row] = vectors[i]
+                self.documents[row] = documents[i] if documents is not None else None
+                self.metadatas[row] = metadatas[i] if metadatas is not None else None
+
+    def delete(self, ids=None) -> None:
+        with self._lock:
+            self._masks.clear()
+            for bug_id in ids or []:
+                row = self._rows.pop(bug_id, None)
+                if row is None:
+                    continue
+                # move the last row into the hole
+                last = len(self.ids) - 1
+                if row != last:
+                    self._matrix[row] = self._matrix[last]
+                    self.ids[row] = self.ids[last]
+                    self.documents[row] = self.documents[last]
+                    self.metadatas[row] = self.metadatas[last]
+                    self._rows[self.ids[row]] = row
+                self.ids.pop()
+                self.documents.pop()
+                self.metadatas.pop()
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        if self._matrix.shape[1] not in (0, dim):
+            raise ValueError(f"Embedding size {dim} does not match the store ({self._matrix.shape[1]})")
+        if rows <= len(self._matrix) and self._matrix.shape[1] == dim:
+            return
+        grown = np.zeros((max(rows, 2 * len(self._matrix), 1024), dim), dtype=np.float32)
+        if self.ids:
+            grown[:len(self.ids)] = self._matrix[:len(self.ids)]
+        self._matrix = grown
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None) -> dict:
+        include = ["metadatas", "documents"] if include is None else list(include)
+        with self._lock:
+            if ids is not None:
+                rows = [self._rows[i] for i in ids if i in self._rows]
+            else:
+                rows = list(range(len(self.ids)))
+            if where:
+                mask = self._where_mask(where)
+                rows = [r for r in rows if mask[r]]
+            start = offset or 0
+            rows = rows[start:start + limit] if limit is not None else rows[start:]
+            return {
+                "ids": [self.ids[r] for r in rows],
+                "embeddings": self._matrix[rows].copy() if "embeddings" in include else None,
+                "documents": [self.documents[r] for r in rows] if "documents" in include else None,
+                "metadatas": [self.metadatas[r] for r in rows] if "metadatas" in include else None,
+                "uris": None,
+                "data": None,
+                "included": include,
+            }
+
+    def query(self, query_embeddings=None, n_results: int = 10, where=None, include=None) -> dict:
+        include = QUERY_INCLUDE_DEFAULT if include is None else list(include)
+        queries = _normalize(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+
+        with self._lock:
+            n = len(self.ids)
+            sims = queries @ self._matrix[:n].T if n else np.zeros((len(queries), 0), dtype=np.float32)
+            if where:
+                sims[:, ~self._where_mask(where)] = -np.inf
+            k = min(n_results, int(np.isfinite(sims[0]).sum())) if n and len(queries) else 0
+
+            ids, documents, metadatas, distances, embeddings = [], [], [], [], []
+            for row_sims in sims:
+                top = np.argpartition(-row_sims, k - 1)[:k] if 0 < k < n else np.arange(n)[:k]
+                top = top[np.argsort(-row_sims[top], kind="stable")]
+                ids.append([self.ids[r] for r in top])
+                documents.append([self.documents[r] for r in top])
+                metadatas.append([self.metadatas[r] for r in top])
+                distances.append([float(1.0 - row_sims[r]) for r in top])
+                if "embeddings" in include:
+                    embeddings.append(self._matrix[top].copy())
+
+        return {
+            "ids": ids,
+            "embeddings": embeddings if "embeddings" in include else None,
+            "documents": documents if "documents" in include else None,
+            "uris": None,
+            "included": include,
+            "data": None,
+            "metadatas": metadatas if "metadatas" in include else None,
+            "distances": distances if "distances" in include else None,
+        }
+
+    def _where_mask(self, where: dict) -> np.ndarray:
+        # caller holds the lock
+        key = json.dumps(where, sort_keys=True, default=str)
+        mask = self._masks.get(key)
+        if mask is None:
+            if len(self._masks) >= MASK_CACHE_SIZE:
+                self._masks.clear()
+            mask = self._masks[key] = where_mask(self.metadatas, where)
+        return mask
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# -------------------------
+# Chroma-style metadata filters
+# -------------------------
+_COMPARISONS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+def where_mask(metadatas: list[dict | None], where: dict) -> np.ndarray:
+    """
+    Boolean mask of the rows matching a Chroma `where` filter
+    ({"field": value}, {"field": {"$in": [...]}}, {"$and": [...]}, {"$or": [...]}).
+    """
+    mask = np.ones(len(metadatas), dtype=bool)
+    for key, cond in where.items():
+        if key == "$and":
+            for sub in cond:
+                mask &= where_mask(metadatas, sub)
+        elif key == "$or":
+            any_mask = np.zeros(len(metadatas), dtype=bool)
+            for sub in cond:
+                any_mask |= where_mask(metadatas, sub)
+            mask &= any_mask
+        else:
+            op, value = next(iter(cond.items())) if isinstance(cond, dict) else ("$eq", cond)
+            if op not in _COMPARISONS:
+                raise ValueError(f"Unsupported where operator {op!r}")
+            compare = _COMPARISONS[op]
+            mask &= np.fromiter(
+                (compare((meta or {}).get(key), value) for meta in metadatas),
+                dtype=bool,
+                count=len(metadatas),
+            )
+    return mask
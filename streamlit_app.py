@@ -280,8 +280,6 @@
 import os
 import sys
 import textwrap
-import io
-from contextlib import redirect_stdout
 
 import pandas as pd
 import streamlit as st
@@ -301,7 +299,6 @@ if SRC_PATH not in sys.path:
     sys.path.insert(0, SRC_PATH)
 
 from qa_rag.app import build_state_from_csv_or_memory, answer_question
-from qa_rag.analytics import bugs_to_df, analytics_reports
 
 
 # -------------------------
@@ -316,6 +313,10 @@ DEMO_QUESTIONS = {
 }
 
 
+# Max rows materialized for the dataset preview
+PREVIEW_ROWS = 1000
+
+
 # -------------------------
 # Helpers
 # -------------------------
@@ -336,67 +337,6 @@ def clear_question() -> None:
     st.session_state["question"] = ""
 
 
-def extract_route(out: str) -> str | None:
-    # Example: "[Router] Route = ANALYTICS"
-    for ln in (out or "").splitlines():
-        if "Route" in ln and "Router" in ln and "=" in ln:
-            return ln.strip()
-    return None
-
-
-def parse_output(out: str):
-    """
-    Parse printed output into:
-    - final_answer: the main answer block (grounded answer)
-    - top_matches: the RAG top matches section
-    - route_line: router line
-    - other: everything else (logs/details)
-    """
-    lines = (out or "").splitlines()
-    route_line = extract_route(out)
-
-    final_answer_lines = []
-    top_matches_lines = []
-    other_lines = []
-
-    in_final = False
-    in_matches = False
-
-    for ln in lines:
-        s = ln.strip()
-
-        if s.startswith("=== Final Answer"):
-            in_final = True
-            in_matches = False
-            continue
-        if s.startswith("=== RAG Top Matches"):
-            in_matches = True
-            in_final = False
-            continue
-
-        if s.startswith("===") and not s.startswith("=== Final Answer") and not s.startswith("=== RAG Top Matches"):
-            in_final = False
-            in_matches = False
-            other_lines.append(ln)
-            continue
-
-        if route_line and ln.strip() == route_line.strip():
-            continue
-
-        if in_final:
-            final_answer_lines.append(ln)
-        elif in_matches:
-            top_matches_lines.append(ln)
-        else:
-            other_lines.append(ln)
-
-    final_answer = "\n".join(final_answer_lines).strip()
-    top_matches = "\n".join(top_matches_lines).strip()
-    other = "\n".join(other_lines).strip()
-
-    return final_answer, top_matches, route_line, other
-
-
 def show_preserved_block(text: str):
     text = (text or "").strip()
     if not text:
@@ -420,203 +360,53 @@ def show_preserved_block(text: str):
 
 
 # -------------------------
-# Local analytics helpers (keep existing functionality; no extra analytics.py deps)
+# Result renderers (tables + chart, evidence)
 # -------------------------
-def count_by_component(df: pd.DataFrame, count_col_name: str) -> pd.DataFrame:
-    if df.empty:
-        return pd.DataFrame(columns=["component", count_col_name])
-    return (
-        df.groupby("component")["id"]
-        .count()
-        .sort_values(ascending=False)
-        .rename(count_col_name)
-        .reset_index()
-    )
-
+TABLE_TITLES = {
+    "open_by_component": "Open bugs by component",
+    "closed_by_component": "Closed bugs by component",
+    "open_by_severity": "Open bugs by severity",
+    "closed_by_severity": "Closed bugs by severity",
+    "open_critical_by_component": "Open critical bugs by component",
+    "open_critical": "Oldest open critical bugs",
+    "resolution_by_component": "Resolution time by component",
+    "open_bugs": "Open bugs",
+    "closed_bugs": "Closed bugs",
+    "critical_bugs": "Critical bugs",
+    "bugs": "Bugs",
+}
 
-def count_by_severity(df: pd.DataFrame, count_col_name: str) -> pd.DataFrame:
-    if df.empty:
-        return pd.DataFrame(columns=["severity", count_col_name])
-    sev = df["severity"].fillna("").astype(str).str.strip()
-    tmp = df.copy()
-    tmp["severity"] = sev.replace("", "unknown")
-    return (
-        tmp.groupby("severity")["id"]
-        .count()
-        .sort_values(ascending=False)
-        .rename(count_col_name)
-        .reset_index()
+# Bar charts only for small per-component / per-severity tables
+CHART_MAX_ROWS = 50
+
+
+def render_result_tables(result):
+    for name, df_show in result.tables.items():
+        st.markdown(f"### {TABLE_TITLES.get(name, name)}")
+        st.dataframe(df_show, use_container_width=True)
+
+        index_col = next((c for c in ["component", "severity"] if c in df_show.columns), None)
+        value_cols = [c for c in df_show.columns if c != index_col and pd.api.types.is_numeric_dtype(df_show[c])]
+        if index_col and value_cols and not df_show.empty and len(df_show) <= CHART_MAX_ROWS and "id" not in df_show.columns:
+            st.bar_chart(df_show.set_index(index_col)[[value_cols[0]]])
+
+
+def evidence_frame(result) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "id": hit.id,
+                "component": hit.component,
+                "severity": hit.severity,
+                "closed_date": hit.closed_date,
+                "distance": round(hit.distance, 4),
+                "preview": hit.document[:160].replace("\n", " "),
+            }
+            for hit in result.evidence
+        ]
     )
 
 
-def apply_filters(df: pd.DataFrame, status: str | None = None, component: str | None = None) -> pd.DataFrame:
-    out = df
-    if status == "open":
-        out = out[out["is_open"]]
-    elif status == "closed":
-        out = out[~out["is_open"]]
-    if component:
-        out = out[out["component"].fillna("").astype(str).str.strip() == component]
-    return out
-
-
-def bugs_list_view(df: pd.DataFrame) -> pd.DataFrame:
-    cols = [c for c in ["id", "component", "severity", "created_date", "closed_date", "title"] if c in df.columns]
-    if not cols:
-        return df
-    return df[cols].sort_values(by="created_date", ascending=False, na_position="last")
-
-
-# -------------------------
-# Analytics cache
-# -------------------------
-@st.cache_data(show_spinner=False)
-def compute_analytics_tables(bugs_list: list[dict]) -> dict:
-    df = bugs_to_df(bugs_list)
-
-    # Your existing reports
-    open_by_component, resolution_by_component, open_critical, open_critical_by_component = analytics_reports(df)
-
-    # Add closed/open by severity and closed by component (computed here)
-    closed_by_component = count_by_component(df[~df["is_open"]], "closed_bugs")
-    open_by_severity = count_by_severity(df[df["is_open"]], "open_bugs")
-    closed_by_severity = count_by_severity(df[~df["is_open"]], "closed_bugs")
-
-    return {
-        "df": df,
-        "open_by_component": open_by_component,
-        "closed_by_component": closed_by_component,
-        "open_by_severity": open_by_severity,
-        "closed_by_severity": closed_by_severity,
-        "resolution_by_component": resolution_by_component,
-        "open_critical": open_critical,
-        "open_critical_by_component": open_critical_by_component,
-    }
-
-
-# -------------------------
-# Question inference
-# -------------------------
-CLOSED_WORDS = ["closed", "resolved", "fixed", "done", "completed"]
-OPEN_WORDS = ["open", "pending", "active"]
-
-
-def infer_status(q: str) -> str | None:
-    ql = (q or "").lower()
-    if any(w in ql for w in CLOSED_WORDS):
-        return "closed"
-    if any(w in ql for w in OPEN_WORDS):
-        return "open"
-    return None
-
-
-def infer_component(q: str, df: pd.DataFrame) -> str | None:
-    if df is None or df.empty or "component" not in df.columns:
-        return None
-
-    ql = (q or "").lower()
-    components = (
-        df["component"]
-        .fillna("")
-        .astype(str)
-        .str.strip()
-        .unique()
-        .tolist()
-    )
-
-    comps_sorted = sorted([c for c in components if c.strip()], key=lambda x: len(x), reverse=True)
-    for comp in comps_sorted:
-        if comp.lower() in ql:
-            return comp
-
-    if "component" in ql:
-        tokens = ql.split()
-        for i, t in enumerate(tokens):
-            if t == "component" and i + 1 < len(tokens):
-                guess = tokens[i + 1].strip().lower()
-                for comp in comps_sorted:
-                    if comp.lower() == guess:
-                        return comp
-
-    return None
-
-
-# -------------------------
-# Analytics renderer (table + chart)
-# -------------------------
-def render_inline_chart_and_table(q: str, tables: dict):
-    ql = (q or "").lower()
-    df_all: pd.DataFrame = tables["df"]
-
-    status = infer_status(q)
-    component = infer_component(q, df_all)
-
-    # Component-specific list query
-    if component and status in ("open", "closed") and ("bug" in ql or "bugs" in ql):
-        filtered = apply_filters(df_all, status=status, component=component)
-        title = f"{status.title()} bugs for {component}"
-
-        st.markdown(f"### {title}")
-        st.caption(f"Count: {len(filtered)}")
-        st.dataframe(bugs_list_view(filtered), use_container_width=True)
-
-        sev_tbl = count_by_severity(filtered, "bugs")
-        if not sev_tbl.empty:
-            st.markdown("#### Breakdown by severity")
-            st.dataframe(sev_tbl, use_container_width=True)
-            st.bar_chart(sev_tbl.set_index("severity")[["bugs"]])
-        return
-
-    # Global analytics selection
-    if "severity" in ql:
-        if status == "closed":
-            df_show = tables["closed_by_severity"]
-            title = "Closed bugs by severity"
-            index_col, value_col = "severity", "closed_bugs"
-        else:
-            df_show = tables["open_by_severity"]
-            title = "Open bugs by severity"
-            index_col, value_col = "severity", "open_bugs"
-
-    elif "resolution" in ql or "avg" in ql or "average" in ql or "median" in ql or "p75" in ql or "p90" in ql:
-        df_show = tables["resolution_by_component"]
-        title = "Resolution time by component"
-        index_col = "component"
-
-        if "avg_days" in df_show.columns and ("avg" in ql or "average" in ql):
-            value_col = "avg_days"
-        elif "median_days" in df_show.columns and "median" in ql:
-            value_col = "median_days"
-        elif "p75_days" in df_show.columns and "p75" in ql:
-            value_col = "p75_days"
-        elif "p90_days" in df_show.columns and "p90" in ql:
-            value_col = "p90_days"
-        else:
-            value_col = "median_days" if "median_days" in df_show.columns else df_show.columns[-1]
-
-    elif "critical" in ql or "p0" in ql or "blocker" in ql or "sev0" in ql:
-        df_show = tables["open_critical_by_component"]
-        title = "Open critical bugs by component"
-        index_col = "component"
-        value_col = "open_critical_bugs" if "open_critical_bugs" in df_show.columns else df_show.columns[-1]
-
-    else:
-        if status == "closed":
-            df_show = tables["closed_by_component"]
-            title = "Closed bugs by component"
-            index_col, value_col = "component", "closed_bugs"
-        else:
-            df_show = tables["open_by_component"]
-            title = "Open bugs by component"
-            index_col, value_col = "component", "open_bugs"
-
-    st.markdown(f"### {title}")
-    st.dataframe(df_show, use_container_width=True)
-
-    if not df_show.empty and index_col in df_show.columns and value_col in df_show.columns:
-        st.bar_chart(df_show.set_index(index_col)[[value_col]])
-
-
 # -------------------------
 # UI
 # -------------------------
@@ -666,7 +456,7 @@ st.caption("Created by Ahmad Harrim")
 # Minimal info row
 info1, info2, info3 = st.columns([1, 2, 2])
 with info1:
-    st.metric("Bugs loaded", len(state.bugs))
+    st.metric("Bugs loaded", len(state.store))
 with info2:
     st.caption("Dataset: demo")
 with info3:
@@ -693,71 +483,86 @@ if run:
     if not q_norm:
         st.warning("Type a question.")
     else:
-        buf = io.StringIO()
+        result = None
         err = None
 
         try:
             with st.spinner("Working..."):
-                with redirect_stdout(buf):
-                    answer_question(state, q_norm)
+                result = answer_question(state, q_norm, echo=False, stream=True)
         except Exception as e:
             err = e
 
-        out = buf.getvalue().strip()
-
         if err:
             st.error(f"Error: {err}")
 
-        final_answer, top_matches, route_line, other = parse_output(out)
+        if result is not None:
+            st.subheader("Result")
 
-        st.subheader("Result")
-
-        with st.container(border=True):
-            # User-friendly label (no “RAG/Analytics” jargon)
-            if route_line:
-                if "ANALYTICS" in route_line.upper():
+            with st.container(border=True):
+                # User-friendly label (no “RAG/Analytics” jargon)
+                if result.route == "ANALYTICS":
                     st.caption("Result type: metrics")
-                elif "RAG" in route_line.upper():
+                elif result.route == "RAG":
                     st.caption("Result type: explanation (with evidence)")
                 else:
                     st.caption("Result type: response")
 
-            st.markdown("#### Answer")
-
-            if final_answer:
-                show_preserved_block(final_answer)
-            else:
-                show_preserved_block(out if out else "")
-
-        # If analytics route, render table + chart inline
-        is_analytics = bool(route_line) and ("ANALYTICS" in route_line.upper())
-        if is_analytics:
-            tables = compute_analytics_tables(state.bugs)
-            render_inline_chart_and_table(q_norm, tables)
-
-        col_a, col_b = st.columns(2)
-
-        with col_a:
-            with st.container(border=True):
-                st.markdown("#### Evidence")
-                if top_matches:
-                    st.code(top_matches, language="text")
+                st.markdown("#### Answer")
+
+                if result.tokens is not None:
+                    # Render the RAG answer as it is generated; the grounding check runs at the end
+                    live = st.empty()
+                    try:
+                        with live.container():
+                            st.write_stream(result.tokens)
+                    except Exception as e:
+                        st.error(f"Error: {e}")
+
+                    if result.grounded:
+                        st.caption("Evidence bug IDs: " + ", ".join(result.used_ids))
+                    else:
+                        # Failed grounding check: replace the streamed text with the safe refusal
+                        live.empty()
+                        show_preserved_block(result.answer or result.render())
+                elif result.answer:
+                    answer_text = result.answer
+                    if result.used_ids:
+                        answer_text += "\n\nEvidence bug IDs: " + ", ".join(result.used_ids)
+                    show_preserved_block(answer_text)
                 else:
-                    st.caption("No evidence available for this query.")
-
-        with col_b:
-            with st.container(border=True):
-                st.markdown("#### Details")
-                if other.strip():
-                    st.code(other.strip(), language="text")
-                else:
-                    st.caption("No extra details.")
-
-        with st.expander("Raw output"):
-            st.code(out if out else "(no output)", language="text")
-
-# Preview dataset (use parsed bugs; avoids CSV parsing issues)
+                    show_preserved_block(result.render())
+
+            # If analytics route, render the handler's tables + chart inline (no recompute)
+            if result.route == "ANALYTICS":
+                render_result_tables(result)
+
+            col_a, col_b = st.columns(2)
+
+            with col_a:
+                with st.container(border=True):
+                    st.markdown("#### Evidence")
+                    if result.evidence:
+                        st.dataframe(evidence_frame(result), use_container_width=True, hide_index=True)
+                    else:
+                        st.caption("No evidence available for this query.")
+
+            with col_b:
+                with st.container(border=True):
+                    st.markdown("#### Details")
+                    if result.retrieval:
+                        st.caption(f"Retrieval: {result.retrieval}" + (" (cached answer)" if result.from_cache else ""))
+                    if result.where:
+                        st.caption(f"Filter: {result.where}")
+                    st.code(
+                        "\n".join(f"{stage}: {seconds * 1000:.1f} ms" for stage, seconds in result.timings.items()),
+                        language="text",
+                    )
+
+            with st.expander("Raw output"):
+                st.code(result.render() or "(no output)", language="text")
+
+# Preview dataset (read from the columnar bug store; avoids CSV parsing issues)
 with st.expander("View demo dataset"):
-    df_preview = pd.DataFrame(state.bugs)
+    df_preview = state.store.preview_frame(limit=PREVIEW_ROWS)
     st.dataframe(df_preview, use_container_width=True)
-    st.caption(f"Rows: {len(df_preview)} | Columns: {', '.join(df_preview.columns)}")
+    st.caption(f"Rows: {len(state.store)} | Columns: {', '.join(df_preview.columns)}")
@@ -0,0 +1,30 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import pytest
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def chroma_path(tmp_path_factory):
+    """
+    Persists the Chroma collection of every test session under tmp_path, not in
+    ./chroma_db_st of the working directory.
+    """
+    from qa_rag import chroma_store
+
+    path = tmp_path_factory.mktemp("chroma")
+    patch = pytest.MonkeyPatch()
+    patch.setattr(chroma_store, "CHROMA_PATH", path)
+    yield path
+    patch.undo()
@@ -0,0 +1,53 @@
+# tests/test_analytics_cube.py
+
+import os
+import sys
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.data import load_bugs_from_csv
+from qa_rag.analytics import bugs_to_df, bugs_count_by_component, build_aggregate_cube
+from qa_rag.bug_store import build_bug_store
+
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "bugs_sample_20.csv")
+
+
+def test_cube_counts_match_row_filters():
+    df = bugs_to_df(load_bugs_from_csv(CSV_PATH))
+    cube = build_aggregate_cube(df)
+    p0 = df["severity"].str.lower() == "p0"
+
+    assert cube.count() == len(df)
+    assert cube.count(status="open") == int(df["is_open"].sum())
+    assert cube.count(status="open", severity="p0") == int((df["is_open"] & p0).sum())
+    for comp in df["component"].unique():
+        closed = (~df["is_open"]) & (df["component"] == comp)
+        assert cube.count(status="closed", component=comp.lower()) == int(closed.sum())
+
+
+def test_cube_breakdown_matches_groupby_on_store():
+    store = build_bug_store(load_bugs_from_csv(CSV_PATH))
+    df = store.frame
+    cube = build_aggregate_cube(df)
+
+    expected = bugs_count_by_component(df[df["is_open"]], count_col_name="open_bugs")
+    got = cube.by_component(status="open").sort_values(ascending=False).rename("open_bugs").reset_index()
+
+    assert got["open_bugs"].tolist() == expected["open_bugs"].tolist()
+    assert got["component"].astype(str).tolist() == expected["component"].astype(str).tolist()
+
+
+def test_cube_average_resolution():
+    df = bugs_to_df(load_bugs_from_csv(CSV_PATH))
+    cube = build_aggregate_cube(df)
+    closed = df[~df["is_open"]].dropna(subset=["resolution_days"])
+
+    assert abs(cube.avg_resolution_days() - closed["resolution_days"].mean()) < 1e-9
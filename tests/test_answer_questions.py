@@ -0,0 +1,178 @@
+# tests/test_answer_questions.py
+
+import os
+import sys
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag import app, retrieval  # noqa: E402
+from qa_rag.analytics import analytics_reports, build_aggregate_cube  # noqa: E402
+from qa_rag.bug_store import build_bug_store  # noqa: E402
+from qa_rag.components import ComponentMatcher  # noqa: E402
+from qa_rag.data import load_bugs_from_csv  # noqa: E402
+from qa_rag.semantic_cache import SemanticAnswerCache  # noqa: E402
+from qa_rag.state import ProjectState  # noqa: E402
+
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "bugs_sample_20.csv")
+
+QUESTIONS = [
+    "Is there a known bug where Apple Pay succeeds but order stays pending?",
+    "how many open bugs for payments?",
+    "Show details for BUG-1005.",
+    "App is slow sometimes and feels buggy?",
+]
+
+
+class FakeCollection:
+    """
+    Returns one match; the default distance (0.9) is far enough for the RAG path
+    to end in a safe refusal without calling the LLM.
+    """
+
+    def __init__(self, distance: float = 0.9):
+        self.calls = []
+        self.distance = distance
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=3, include=None, where=None):
+        queries = query_texts if query_texts is not None else query_embeddings
+        self.calls.append(len(queries))
+        n = len(queries)
+        meta = {"severity": "P1", "component": "Payments", "closed_date": "OPEN"}
+        return {
+            "ids": [["BUG-1001"]] * n,
+            "documents": [["BUG_ID: BUG-1001 | Title: Apple Pay"]] * n,
+            "metadatas": [[meta]] * n,
+            "distances": [[self.distance]] * n,
+            "embeddings": None,
+            "included": include,
+        }
+
+
+def make_state(collection) -> ProjectState:
+    store = build_bug_store(load_bugs_from_csv(CSV_PATH))
+    df = store.frame
+    cube = build_aggregate_cube(df)
+    return ProjectState(
+        store=store,
+        reports=analytics_reports(df),
+        cube=cube,
+        component_matcher=ComponentMatcher(cube.components),
+        collection=collection,
+        OLLAMA_URL="",
+        MODEL="",
+    )
+
+
+def test_answer_questions_batches_retrieval(monkeypatch, capsys):
+    encoded = []
+
+    def fake_embed(texts):
+        encoded.append(list(texts))
+        return [[0.0, 1.0] for _ in texts]
+
+    monkeypatch.setattr(retrieval, "embed_queries", fake_embed)
+
+    state = make_state(FakeCollection())
+    for q in QUESTIONS:
+        app.answer_question(state, q)
+    one_by_one = capsys.readouterr().out
+    assert encoded == [[QUESTIONS[0]], [QUESTIONS[3]]]
+
+    encoded.clear()
+    collection = FakeCollection()
+    state.collection = collection
+    app.answer_questions(state, QUESTIONS)
+    batched = capsys.readouterr().out
+
+    assert batched == one_by_one
+    assert encoded == [[QUESTIONS[0], QUESTIONS[3]]]
+    assert collection.calls == [2]
+
+
+def test_split_query_results():
+    results = FakeCollection().query(query_embeddings=[[0.0], [1.0]], include=["distances"])
+    one = retrieval.split_query_results(results, 1)
+    assert one["ids"] == [["BUG-1001"]]
+    assert one["embeddings"] is None
+    assert one["included"] == ["distances"]
+
+
+def test_streamed_answer_is_validated_at_the_end(monkeypatch):
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: [[0.0, 1.0] for _ in texts])
+    monkeypatch.setattr(app, "get_semantic_cache", lambda: None)
+    pieces = ["Apple Pay ", "orders stay pending: ", "see BUG-1001."]
+    monkeypatch.setattr(app, "ollama_generate_stream", lambda prompt, **kwargs: iter(pieces))
+
+    state = make_state(FakeCollection(distance=0.1))
+    result = app.answer_question(state, QUESTIONS[0], echo=False, stream=True)
+    assert result.answer == "" and result.grounded is None
+
+    assert list(result.tokens) == pieces
+    assert result.grounded is True
+    assert result.answer == "".join(pieces)
+    assert result.used_ids == ["BUG-1001"]
+    assert "first_token" in result.timings
+    assert "=== Final Answer (Grounded) ===" in result.render()
+
+    # citing an id that was not retrieved -> safe refusal after the stream
+    pieces[:] = ["it is BUG-4242"]
+    result = app.answer_question(state, QUESTIONS[0], echo=False, stream=True)
+    assert "".join(result.tokens) == "it is BUG-4242"
+    assert result.grounded is False
+    assert result.answer.startswith("Not enough evidence")
+
+
+def test_near_duplicate_question_reuses_grounded_answer(monkeypatch):
+    vectors = {
+        QUESTIONS[0]: [1.0, 0.0, 0.0],
+        "Apple Pay charged but the order is still pending?": [0.98, 0.1, 0.0],
+        "Why does checkout crash on Android?": [0.0, 1.0, 0.0],
+    }
+    calls = []
+
+    def fake_generate(prompt, **kwargs):
+        calls.append(prompt)
+        return "Known issue, see BUG-1001."
+
+    cache = SemanticAnswerCache(max_entries=8, threshold=0.9)
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: [vectors[t] for t in texts])
+    monkeypatch.setattr(app, "ollama_generate", fake_generate)
+    monkeypatch.setattr(app, "get_semantic_cache", lambda: cache)
+
+    collection = FakeCollection(distance=0.1)
+    state = make_state(collection)
+    first = app.answer_question(state, QUESTIONS[0], echo=False)
+    again = app.answer_question(state, "Apple Pay charged but the order is still pending?", echo=False)
+    assert len(calls) == 1
+    assert not first.from_cache and again.from_cache
+    assert again.answer == first.answer and again.used_ids == ["BUG-1001"]
+    assert again.render().endswith(first.render().split("=== Final Answer (Grounded) ===")[1])
+
+    # not similar enough -> LLM
+    app.answer_question(state, "Why does checkout crash on Android?", echo=False)
+    assert len(calls) == 2
+
+    # similar question, but retrieval found other bugs -> LLM
+    monkeypatch.setattr(collection, "query", lambda **kwargs: {
+        **FakeCollection(distance=0.1).query(**kwargs), "ids": [["BUG-1002"]],
+    })
+    calls_before = len(calls)
+    app.answer_questions(state, [QUESTIONS[0]], echo=False)
+    assert len(calls) == calls_before + 1
+
+
+def test_status_words_in_rag_phrasing_become_filters(monkeypatch):
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: [[0.0, 1.0] for _ in texts])
+    monkeypatch.setattr(app, "RAG_METADATA_FILTERS", True)
+
+    result = app.answer_question(make_state(FakeCollection()), "is there a known checkout bug still open on Payments", echo=False)
+    assert result.route == "RAG"
+    assert result.where == {"$and": [{"component": {"$in": ["Checkout", "Payments"]}}, {"closed_date": "OPEN"}]}
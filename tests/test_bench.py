@@ -0,0 +1,46 @@
+# tests/test_bench.py
+
+import json
+import os
+import subprocess
+import sys
+
+# -------------------------
+# Make benchmarks/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BENCH_PATH = os.path.join(PROJECT_ROOT, "benchmarks")
+
+if BENCH_PATH not in sys.path:
+    sys.path.insert(0, BENCH_PATH)
+
+import bench  # noqa: E402
+
+
+def test_small_run_writes_every_scenario(tmp_path):
+    out = tmp_path / "bench.json"
+    tmpdir = tmp_path / "tmp"
+    tmpdir.mkdir()
+    env = {**os.environ, "CHROMA_PATH": str(tmp_path / "chroma"), "TMPDIR": str(tmpdir)}
+    subprocess.run(
+        [sys.executable, os.path.join(BENCH_PATH, "bench.py"), "--sizes", "300", "--repeat", "1",
+         "--vector-backend", "numpy", "--out", str(out)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(out.read_text())
+
+    assert report["meta"]["embedder"] == "hashing" and report["meta"]["vector_backend"] == "numpy"
+    assert [(r["scenario"], r["size"]) for r in report["results"]] == [(s, 300) for s in bench.SCENARIOS]
+    metrics = {r["scenario"]: r["metrics"] for r in report["results"]}
+    assert metrics["index"]["vectors"] >= 300  # long bugs are stored as several passages
+    assert metrics["answer"]["calls"] == len(bench.RAG_QUESTIONS)
+    assert not any(tmpdir.iterdir())  # generated CSVs removed at exit
+
+
+def test_compare_flags_slower_and_lower_throughput():
+    def run(p50, rate):
+        return {"results": [{"scenario": "query", "size": 1000, "metrics": {"p50_ms": p50, "bugs_per_s": rate, "calls": 5}}]}
+
+    lines = bench.compare(run(2.0, 500.0), run(1.0, 1000.0))
+    assert len(lines) == 2 and all(line.endswith("REGRESSION") for line in lines)
+    assert not any("REGRESSION" in line for line in bench.compare(run(1.1, 950.0), run(1.0, 1000.0)))
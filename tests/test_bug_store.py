@@ -0,0 +1,188 @@
+# tests/test_bug_store.py
+
+import os
+import sys
+
+import pandas as pd
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.app import answer_question, build_state_from_csv_or_memory, upsert_bugs
+from qa_rag.data import iter_bug_chunks, load_bugs_from_csv
+from qa_rag.analytics import bugs_to_df, analytics_reports, build_aggregate_cube
+from qa_rag import bug_store
+from qa_rag.bug_store import BugStoreBuilder, build_bug_store
+
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "bugs_sample_20.csv")
+
+
+def build_chunked(chunk_size: int = 6):
+    builder = BugStoreBuilder()
+    for chunk in iter_bug_chunks(CSV_PATH, chunk_size=chunk_size):
+        builder.add_chunk(chunk)
+    return builder.build()
+
+
+def test_store_roundtrips_bug_records():
+    bugs = load_bugs_from_csv(CSV_PATH)
+    store = build_chunked()
+
+    assert len(store) == len(bugs)
+    assert list(store) == bugs
+
+
+def test_chunked_frames_match_full_frame():
+    full = build_bug_store(load_bugs_from_csv(CSV_PATH)).frame
+    chunked = build_chunked(chunk_size=7).frame
+
+    assert chunked.equals(full)
+    for a, b in zip(analytics_reports(chunked), analytics_reports(full)):
+        assert a.equals(b)
+
+
+def test_store_is_dictionary_encoded_and_has_no_text_column():
+    store = build_chunked()
+
+    assert isinstance(store.frame["component"].dtype, pd.CategoricalDtype)
+    assert isinstance(store.frame["severity"].dtype, pd.CategoricalDtype)
+    assert "text" not in store.frame.columns
+    assert store.frame["created_date"].dtype.kind == "M"
+
+
+def test_store_reports_match_list_of_dicts_frame():
+    bugs = load_bugs_from_csv(CSV_PATH)
+    legacy = bugs_to_df(bugs)
+    store = build_bug_store(bugs)
+
+    for a, b in zip(analytics_reports(store.frame), analytics_reports(legacy)):
+        a = a.astype({c: str for c in ["component", "severity"] if c in a.columns})
+        b = b.astype({c: str for c in ["component", "severity"] if c in b.columns})
+        pd.testing.assert_frame_equal(a.drop(columns=["text"], errors="ignore"), b.drop(columns=["text"], errors="ignore"))
+
+
+def test_id_index_lookup():
+    bugs = load_bugs_from_csv(CSV_PATH)
+    store = build_chunked()
+
+    assert store.position(bugs[3]["id"]) == 3
+    assert store.position(bugs[3]["id"].lower()) == 3
+    assert store.position("BUG-0") is None
+
+    ids = [bugs[5]["id"], "BUG-0", bugs[1]["id"]]
+    rows, missing = store.lookup(ids)
+    assert rows["id"].tolist() == [bugs[5]["id"], bugs[1]["id"]]
+    assert list(rows.index) == [5, 1]
+    assert missing == ["BUG-0"]
+
+
+def test_extend_keeps_index_and_text_current():
+    bugs = load_bugs_from_csv(CSV_PATH)
+    store = build_bug_store(bugs[:10])
+    store.extend(build_bug_store(bugs[10:]))
+
+    assert list(store) == bugs
+    assert store.position(bugs[-1]["id"]) == len(bugs) - 1
+    assert store.text(store.position(bugs[12]["id"])) == bugs[12]["text"]
+    assert isinstance(store.frame["component"].dtype, pd.CategoricalDtype)
+
+
+def test_upsert_updates_in_place_and_appends():
+    bugs = load_bugs_from_csv(CSV_PATH)
+    store = build_bug_store(bugs)
+    changed = dict(bugs[2], closed_date=None, component="Wallet", text="Rewritten repro steps")
+    new = dict(bugs[0], id="BUG-3001", text="Brand new bug")
+
+    assert store.upsert([changed, new]) == ([2], 1)
+
+    expected = bugs[:2] + [changed] + bugs[3:] + [new]
+    assert list(store) == expected
+    assert store.position("bug-3001") == len(bugs)
+    assert store.text(1) == bugs[1]["text"] and store.text(3) == bugs[3]["text"]
+    assert list(store.frame["component"].cat.categories) == sorted(store.frame["component"].cat.categories)
+
+
+def test_case_variant_upsert_keeps_stored_id():
+    bugs = load_bugs_from_csv(CSV_PATH)
+    store = build_bug_store(bugs)
+    changed = dict(bugs[4], id=bugs[4]["id"].lower(), severity="P3")
+
+    assert store.upsert([changed]) == ([4], 0)
+    assert len(store) == len(bugs)
+    assert store.record(4) == dict(changed, id=bugs[4]["id"])
+    assert store.position(bugs[4]["id"]) == 4
+
+
+def test_single_inserts_are_folded_in_batches(monkeypatch):
+    bugs = load_bugs_from_csv(CSV_PATH)
+    concats = []
+    concat = bug_store._concat_frames
+    monkeypatch.setattr(bug_store, "_concat_frames", lambda frames: (len(frames) > 1 and concats.append(len(frames))) or concat(frames))
+    monkeypatch.setattr(bug_store, "COMPACT_MIN_ROWS", 8)
+
+    store = build_bug_store(bugs[:4])
+    concats.clear()
+    for b in bugs[4:]:
+        store.upsert([b])
+        # the tail is read through without folding it in
+        assert store.record(store.position(b["id"])) == b
+    assert concats == [9, 9]  # 16 single inserts: two folds of frame + 8 tail stores
+
+    # rows still in the tail are updated there; texts change through the overlay
+    changed = [dict(bugs[1], text="Rewritten"), dict(bugs[-1], severity="P3", text="Tail rewrite")]
+    assert store.upsert(changed) == ([1, len(bugs) - 1], 0)
+    expected = [changed[0]] + bugs[2:-1]
+    assert list(store) == bugs[:1] + expected + [changed[1]]
+    assert store.lookup([bugs[-1]["id"]])[0]["severity"].tolist() == ["P3"]
+
+    assert store.frame["id"].tolist() == [b["id"] for b in bugs]  # reading frame folds the rest
+    assert store.text(1) == "Rewritten" and store.text(len(bugs) - 1) == "Tail rewrite"
+    assert list(store) == bugs[:1] + expected + [changed[1]]
+
+
+def test_state_upsert_refreshes_store_reports_cube_and_matcher():
+    state = build_state_from_csv_or_memory(bugs_in_memory=[], CSV_PATH=CSV_PATH)
+    version = state.data_version
+    bug = state.store.record(state.store.position("BUG-1001"))
+    assert bug["closed_date"] is None
+
+    upsert_bugs(state, [
+        dict(bug, closed_date="2025-12-30"),
+        dict(bug, id="BUG-3002", component="Wallet", severity="P1", text="Wallet screen blank"),
+    ])
+
+    result = answer_question(state, "Show details for BUG-1001", echo=False)
+    assert not result.tables["bugs"]["is_open"].iloc[0]
+    assert answer_question(state, "Show details for BUG-3002", echo=False).tables["bugs"]["component"].iloc[0] == "Wallet"
+
+    fresh = build_aggregate_cube(state.df)
+    assert state.cube.components == fresh.components
+    assert (state.cube.counts == fresh.counts).all()
+    assert state.cube.count(status="open", component="Wallet") == 1
+    assert state.component_matcher.find("open bugs in wallet") == "Wallet"
+
+    expected = analytics_reports(state.df)
+    assert state.open_by_component.set_index("component")["open_bugs"].to_dict() == \
+        expected[0].set_index("component")["open_bugs"].astype(int).to_dict()
+    assert "BUG-1001" not in state.open_critical["id"].tolist()
+    assert state.data_version != version
+
+
+def test_critical_listings_run_on_categorical_severity():
+    state = build_state_from_csv_or_memory(bugs_in_memory=[], CSV_PATH=CSV_PATH)
+    bug = state.store.record(state.store.position("BUG-1005"))
+    upsert_bugs(state, [dict(bug, closed_date="2025-12-29")])
+    assert isinstance(state.df["severity"].dtype, pd.CategoricalDtype)
+
+    closed = answer_question(state, "List closed critical bugs for Payments", echo=False)
+    assert closed.tables["critical_bugs"]["id"].tolist() == ["BUG-1005"]
+
+    everything = answer_question(state, "List all critical bugs", echo=False)
+    assert sorted(everything.tables["critical_bugs"]["id"]) == ["BUG-1001", "BUG-1005"]
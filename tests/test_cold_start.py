@@ -0,0 +1,186 @@
+# tests/test_cold_start.py
+
+import json
+import os
+import subprocess
+import sys
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag import chroma_store  # noqa: E402
+from qa_rag.chroma_store import LazyCollection  # noqa: E402
+
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "bugs_sample_20.csv")
+
+# Seconds a fresh interpreter may spend importing the app, building the state
+# and answering LOOKUP / ANALYTICS questions
+COLD_START_BUDGET = float(os.getenv("COLD_START_BUDGET", "5"))
+
+HEAVY_MODULES = ["chromadb", "sentence_transformers", "torch", "openai"]
+
+COLD_START_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {src!r})
+from qa_rag.app import build_state_from_csv_or_memory, answer_question
+
+state = build_state_from_csv_or_memory([], CSV_PATH={csv!r}, collection_name="cold_start")
+routes = [
+    answer_question(state, q, echo=False).route
+    for q in ["Show details for BUG-1005.", "how many open bugs for payments?", "release readiness for payments"]
+]
+print(json.dumps({{
+    "seconds": time.perf_counter() - t0,
+    "routes": routes,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def test_lookup_and_analytics_cold_start(tmp_path):
+    script = COLD_START_SCRIPT.format(src=SRC_PATH, csv=CSV_PATH, heavy=HEAVY_MODULES)
+    env = {**os.environ, "CHROMA_PATH": str(tmp_path / "chroma")}
+    out = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+    report = json.loads(out.stdout.strip().splitlines()[-1])
+
+    assert report["routes"] == ["LOOKUP", "ANALYTICS", "ANALYTICS"]
+    assert report["loaded"] == []
+    assert not (tmp_path / "chroma").exists()
+    assert report["seconds"] < COLD_START_BUDGET
+
+
+def test_lazy_collection_syncs_once_on_first_use(monkeypatch):
+    opened = []
+
+    class Collection:
+        def count(self):
+            return 20
+
+    def fake_index(name, chunks, lexical=None):
+        opened.append((name, list(chunks)))
+        return Collection()
+
+    monkeypatch.setattr(chroma_store, "index_bug_chunks", fake_index)
+    lazy = LazyCollection("bugs", lambda: iter([[{"id": "BUG-1"}]]))
+    assert not lazy.is_open and opened == []
+
+    assert lazy.count() == 20
+    assert lazy.count() == 20
+    assert opened == [("bugs", [[{"id": "BUG-1"}]])]
+
+
+def test_lazy_collection_takes_upserted_bugs(monkeypatch):
+    import numpy as np
+    from qa_rag.vector_store import NumpyVectorStore
+
+    monkeypatch.setattr(chroma_store, "open_vector_store", lambda name, force_rebuild=False: NumpyVectorStore())
+    monkeypatch.setattr(chroma_store, "embed_documents", lambda texts: np.ones((len(texts), 2), dtype=np.float32))
+
+    def bug(bug_id, text):
+        return {"id": bug_id, "title": text, "component": "Cart", "severity": "P2",
+                "created_date": "2025-01-01", "closed_date": None, "text": text}
+
+    source = [bug("BUG-1", "cart total wrong"), bug("BUG-2", "cart empty")]
+    lazy = LazyCollection("bugs", lambda: iter([list(source)]))
+
+    # before open: nothing to sync, the first open reads the current source
+    source[1] = bug("BUG-2", "cart empties after login")
+    lazy.sync_bugs([source[1]])
+    assert lazy.get(ids=["BUG-2"])["documents"][0].endswith("cart empties after login")
+
+    # after open: vectors upserted on the next read, BM25 updated through its delta
+    source.append(dict(bug("BUG-3", "promo banner overlaps"), closed_date="2025-02-01"))
+    lazy.sync_bugs([source[-1]])
+    assert lazy.count() == 3
+    assert lazy.get(ids=["BUG-3"])["metadatas"][0]["closed_date"] == "2025-02-01"
+    assert [doc for doc, _ in lazy.lexical_index.search("promo banner")] == ["BUG-3"]
+
+
+def test_live_updates_are_embedded_in_one_batch_on_next_read(monkeypatch):
+    import numpy as np
+    from qa_rag.vector_store import NumpyVectorStore
+
+    batches = []
+    monkeypatch.setattr(chroma_store, "open_vector_store", lambda name, force_rebuild=False: NumpyVectorStore())
+    monkeypatch.setattr(chroma_store, "embed_documents", lambda texts: batches.append(len(texts)) or np.ones((len(texts), 2), dtype=np.float32))
+
+    def bug(bug_id, text):
+        return {"id": bug_id, "title": text, "component": "Cart", "severity": "P2",
+                "created_date": "2025-01-01", "closed_date": None, "text": text}
+
+    source = [bug(f"BUG-{i}", f"cart issue {i}") for i in range(5)]
+    reads = []
+    lazy = LazyCollection("bugs", lambda: reads.append(1) or iter([list(source)]))
+    lazy.open()
+    assert batches == [5] and reads == [1]
+
+    # three events, two bugs: no inference and no pass over the bugs yet
+    source[1] = bug("BUG-1", "wishlist heart icon missing")
+    source.append(bug("BUG-5", "promo banner overlaps"))
+    for changed in (source[1], source[-1], dict(source[-1], closed_date="2025-02-01")):
+        lazy.sync_bugs([changed])
+    assert batches == [5]
+
+    # BM25 sees them right away, from its delta
+    assert [doc for doc, _ in lazy.lexical_index.search("wishlist heart")] == ["BUG-1"]
+    assert [doc for doc, _ in lazy.lexical_index.search("issue 1")] == []
+    assert [doc for doc, _ in lazy.lexical_index.search("promo banner", where={"closed_date": "2025-02-01"})] == ["BUG-5"]
+    assert len(lazy.lexical_index) == 6
+
+    # the read flushes the queue: one batch, latest record of each bug
+    assert lazy.get(ids=["BUG-5"])["metadatas"][0]["closed_date"] == "2025-02-01"
+    assert batches == [5, 2] and reads == [1]
+    assert lazy.count() == 6 and batches == [5, 2]
+
+
+def test_lexical_delta_is_folded_once_it_outgrows_its_share(monkeypatch):
+    import numpy as np
+    from qa_rag.vector_store import NumpyVectorStore
+
+    monkeypatch.setattr(chroma_store, "open_vector_store", lambda name, force_rebuild=False: NumpyVectorStore())
+    monkeypatch.setattr(chroma_store, "embed_documents", lambda texts: np.ones((len(texts), 2), dtype=np.float32))
+    monkeypatch.setattr(chroma_store, "LEXICAL_DELTA_MIN_DOCS", 2)
+
+    def bug(bug_id, text):
+        return {"id": bug_id, "title": text, "component": "Cart", "severity": "P2",
+                "created_date": "2025-01-01", "closed_date": None, "text": text}
+
+    source = [bug(f"BUG-{i}", f"cart issue {i}") for i in range(5)]
+    reads = []
+    lazy = LazyCollection("bugs", lambda: reads.append(1) or iter([list(source)]))
+    lazy.open()
+
+    for i in range(3):
+        source.append(bug(f"BUG-{5 + i}", f"promo banner {i}"))
+        lazy.sync_bugs([source[-1]])
+        lazy.lexical_index.search("promo banner")
+    # rebuilt once, when the third update pushed the delta past 2 documents
+    assert reads == [1, 1]
+    assert lazy.lexical_index.delta_size == 0 and len(lazy.lexical_index) == 8
+
+
+def test_index_reads_the_state_snapshot_not_the_csv(tmp_path, monkeypatch):
+    import shutil
+    import numpy as np
+    from qa_rag.app import build_state_from_csv_or_memory
+    from qa_rag.vector_store import NumpyVectorStore
+
+    monkeypatch.setattr(chroma_store, "open_vector_store", lambda name, force_rebuild=False: NumpyVectorStore())
+    monkeypatch.setattr(chroma_store, "embed_documents", lambda texts: np.ones((len(texts), 2), dtype=np.float32))
+    csv_path = tmp_path / "bugs.csv"
+    shutil.copy(CSV_PATH, csv_path)
+    state = build_state_from_csv_or_memory([], CSV_PATH=str(csv_path), collection_name="snapshot")
+
+    # CSV rewritten between the state build and the first RAG request
+    lines = csv_path.read_text(encoding="utf-8").splitlines()
+    csv_path.write_text("\n".join(lines[:5]) + "\n", encoding="utf-8")
+
+    assert state.collection.count() == len(state.store) == 20
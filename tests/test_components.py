@@ -0,0 +1,72 @@
+# tests/test_components.py
+
+import os
+import sys
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.components import ComponentMatcher  # noqa: E402
+
+
+COMPONENTS = ["Auth", "Cart", "Checkout", "DeepLinks", "Notifications", "Payments", None, ""]
+
+
+def test_finds_component_case_insensitive():
+    m = ComponentMatcher(COMPONENTS)
+    assert m.find("How many open bugs for PAYMENTS?") == "Payments"
+    assert m.find("open bugs") is None
+    assert len(m) == 6
+
+
+def test_word_boundaries():
+    m = ComponentMatcher(["UI", "Cart"])
+    assert m.find("build failures") is None
+    assert m.find("cartography bugs") is None
+    assert m.find("ui bugs") == "UI"
+
+
+def test_longest_component_wins():
+    m = ComponentMatcher(COMPONENTS)
+    assert m.find("cart and checkout bugs") == "Checkout"
+    assert m.find("auth and cart bugs") == "Auth"
+
+
+def test_aliases_and_singular_forms():
+    m = ComponentMatcher(COMPONENTS)
+    assert m.find("payment failures") == "Payments"
+    assert m.find("deep link not opening") == "DeepLinks"
+    assert m.find("authentication errors") == "Auth"
+    assert m.canonical("notification") == "Notifications"
+
+    # alias targets missing from the data are ignored
+    assert ComponentMatcher(["Cart"]).find("deep link not opening") is None
+    assert ComponentMatcher(["Cart"], aliases={"basket": "cart"}).find("basket total") == "Cart"
+
+
+def test_no_singular_for_names_that_are_not_plurals():
+    m = ComponentMatcher(["News", "Analytics", "Status", "Address", "Categories"])
+    assert m.find("new login screen freezes") is None
+    assert m.find("analytic event missing") is None
+    assert m.find("statu") is None
+    assert m.find("new address not saved") == "Address"
+    assert m.find("category filter is empty") == "Categories"
+
+
+def test_empty_matcher():
+    m = ComponentMatcher([])
+    assert m.find("payments") is None
+    assert m.canonical("payments") is None
+
+
+def test_find_all_in_order_and_exact():
+    m = ComponentMatcher(["Orders", "Payments", "Checkout"])
+    assert m.find_all("payments and checkout, then payments again") == ["Payments", "Checkout"]
+    assert m.find_all("order stays pending after payment") == ["Orders", "Payments"]
+    assert m.find_all("order stays pending after payment", exact=True) == []
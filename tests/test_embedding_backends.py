@@ -0,0 +1,86 @@
+# tests/test_embedding_backends.py
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.chroma_store import bug_to_text  # noqa: E402
+from qa_rag.data import load_bugs_from_csv  # noqa: E402
+from qa_rag import embeddings  # noqa: E402
+from qa_rag.embeddings import EmbeddingService, missing_backend_packages  # noqa: E402
+
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "bugs_sample_20.csv")
+
+QUERIES = [
+    "Is there a known bug where Apple Pay succeeds but order stays pending?",
+    "App is slow sometimes and feels buggy?",
+    "login fails after password reset",
+    "checkout crashes on android",
+    "push notifications arrive late",
+]
+
+
+def load_or_skip(backend: str) -> EmbeddingService:
+    # Skips only for what this environment lacks (the backend's optional packages,
+    # a model that can't be downloaded); a backend that is installed but broken fails
+    missing = missing_backend_packages(backend)
+    if missing:
+        pytest.skip(f"{backend} embedding backend needs {', '.join(missing)}")
+    service = EmbeddingService(backend=backend)
+    if backend == "torch":
+        try:
+            service.encode(["warm up"])
+        except OSError as exc:
+            pytest.skip(f"embedding model not available here: {exc}")
+    else:
+        service.encode(["warm up"])
+    return service
+
+
+def nearest(service: EmbeddingService, docs: list[str], k: int = 3) -> np.ndarray:
+    d = service.encode(docs)
+    q = service.encode(QUERIES)
+    d /= np.linalg.norm(d, axis=1, keepdims=True)
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    return np.argsort(-(q @ d.T), axis=1)[:, :k]
+
+
+@pytest.mark.parametrize("backend", ["int8", "onnx"])
+def test_backend_keeps_nearest_neighbours(backend):
+    reference = load_or_skip("torch")
+    candidate = load_or_skip(backend)
+    docs = [bug_to_text(b) for b in load_bugs_from_csv(CSV_PATH)]
+
+    expected = nearest(reference, docs)
+    got = nearest(candidate, docs)
+
+    assert (got[:, 0] == expected[:, 0]).all()
+    for a, b in zip(got, expected):
+        assert len(set(a) & set(b)) >= 2
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        EmbeddingService(backend="fp4")
+
+
+def test_onnx_backend_names_its_missing_packages(monkeypatch):
+    pytest.importorskip("sentence_transformers")
+    monkeypatch.setattr(embeddings, "BACKEND_PACKAGES", {"onnx": ("qa_rag_no_such_package",)})
+    assert missing_backend_packages("onnx") == ["qa_rag_no_such_package"]
+    assert missing_backend_packages("int8") == []
+
+    with pytest.raises(ImportError, match="qa_rag_no_such_package"):
+        embeddings.load_model("all-MiniLM-L6-v2", backend="onnx")
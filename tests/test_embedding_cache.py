@@ -0,0 +1,70 @@
+# tests/test_embedding_cache.py
+
+import os
+import sys
+
+import numpy as np
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag import embeddings  # noqa: E402
+from qa_rag.embedding_cache import HASH_SIZE, EmbeddingCache, text_hash  # noqa: E402
+
+
+class CountingService:
+    model_key = "fake|torch|"
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.append(list(texts))
+        return np.array([[float(len(t)), 1.0, 0.5] for t in texts], dtype=np.float32)
+
+
+def test_vectors_persist_per_model(tmp_path):
+    cache = EmbeddingCache(tmp_path, "model-a")
+    a, b = text_hash("alpha"), text_hash("beta")
+    cache.put_many([a, b, a], np.array([[1, 2], [3, 4], [9, 9]], dtype=np.float32))
+
+    reopened = EmbeddingCache(tmp_path, "model-a")
+    found = reopened.get_many([b, a, text_hash("gamma")])
+    assert len(reopened) == 2
+    assert found[a].tolist() == [1, 2] and found[b].tolist() == [3, 4]
+    assert text_hash("gamma") not in found
+
+    assert EmbeddingCache(tmp_path, "model-b").get_many([a]) == {}
+
+
+def test_interrupted_append_is_trimmed(tmp_path):
+    cache = EmbeddingCache(tmp_path, "m")
+    cache.put_many([text_hash("x")], np.ones((1, 4), dtype=np.float32))
+    with open(cache.vectors_path, "ab") as f:
+        f.write(np.zeros(4, dtype=np.float32).tobytes())  # vector written, hash not
+
+    reopened = EmbeddingCache(tmp_path, "m")
+    assert len(reopened) == 1
+    reopened.put_many([text_hash("y")], np.full((1, 4), 2, dtype=np.float32))
+    assert EmbeddingCache(tmp_path, "m").get_many([text_hash("y")])[text_hash("y")].tolist() == [2, 2, 2, 2]
+    assert os.path.getsize(reopened.hashes_path) == 2 * HASH_SIZE
+
+
+def test_embed_documents_only_encodes_new_texts(tmp_path, monkeypatch):
+    service = CountingService()
+    cache = EmbeddingCache(tmp_path, service.model_key)
+    monkeypatch.setattr(embeddings, "get_embedding_service", lambda: service)
+    monkeypatch.setattr(embeddings, "get_embedding_cache", lambda: cache)
+
+    first = embeddings.embed_documents(["bug one", "bug two", "bug one"])
+    again = embeddings.embed_documents(["bug two", "bug three", "bug one"])
+
+    assert service.encoded == [["bug one", "bug two"], ["bug three"]]
+    assert first.shape == (3, 3)
+    assert again[0].tolist() == first[1].tolist() and again[2].tolist() == first[0].tolist()
@@ -0,0 +1,214 @@
+# tests/test_hybrid_retrieval.py
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag import retrieval  # noqa: E402
+from qa_rag.chroma_store import bug_metadata, bug_to_text  # noqa: E402
+from qa_rag.data import load_bugs_from_csv  # noqa: E402
+from qa_rag.grounding import retrieval_is_weak  # noqa: E402
+from qa_rag.lexical import BM25Builder, bug_lexical_text, tokenize  # noqa: E402
+from qa_rag.llm import build_llm_context  # noqa: E402
+from qa_rag.vector_store import NumpyVectorStore  # noqa: E402
+
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "bugs_sample_20.csv")
+BUGS = load_bugs_from_csv(CSV_PATH)
+
+
+def bug_vector(i: int) -> np.ndarray:
+    # one axis per bug: the dense side knows nothing about the words
+    v = np.zeros(len(BUGS), dtype=np.float32)
+    v[i] = 1.0
+    return v
+
+
+def make_store() -> NumpyVectorStore:
+    store = NumpyVectorStore()
+    store.upsert(
+        ids=[b["id"] for b in BUGS],
+        embeddings=np.stack([bug_vector(i) for i in range(len(BUGS))]),
+        documents=[bug_to_text(b) for b in BUGS],
+        metadatas=[bug_metadata(b) for b in BUGS],
+    )
+    builder = BM25Builder()
+    builder.add_bugs(BUGS, bug_metadata)
+    store.lexical_index = builder.build()
+    return store
+
+
+def test_tokenize_keeps_exact_tokens():
+    assert tokenize('Is there a known bug with "Invalid token" 401 on iOS 17?') == ["invalid", "token", "401", "ios", "17"]
+
+
+def test_bm25_ranks_exact_matches_first():
+    index = make_store().lexical_index
+    assert index.search("invalid token 401", 3)[0][0] == "BUG-1002"
+    assert index.search("Checkout button iOS 17", 3)[0][0] == "BUG-1001"
+    assert index.search("completely unrelated words xyzzy", 3) == []
+
+
+def test_updates_through_the_delta_match_a_rebuild():
+    changed = [
+        dict(BUGS[1], text="Session expires and the wishlist sync crashes on iOS 17"),
+        dict(BUGS[4], closed_date="2025-03-01"),
+        {**BUGS[0], "id": "BUG-2001", "title": "Wishlist sync duplicates items"},
+    ]
+    index = make_store().lexical_index
+    for b in changed:
+        index.update(b["id"], bug_lexical_text(b), bug_metadata(b))
+    latest = {b["id"]: b for b in BUGS + changed}
+    builder = BM25Builder()
+    builder.add_bugs(list(latest.values()), bug_metadata)
+    rebuilt = builder.build()
+
+    assert len(index) == len(rebuilt) == len(BUGS) + 1 and index.delta_size == 3
+    for question, where in (
+        ("wishlist sync crash", None),
+        ("invalid token 401", None),
+        ("checkout button ios 17", {"closed_date": {"$ne": "OPEN"}}),
+    ):
+        got, want = index.search(question, 5, where=where), rebuilt.search(question, 5, where=where)
+        assert [doc for doc, _ in got] == [doc for doc, _ in want]
+
+    # idf and length stay the last build's until the next rebuild (they drift with
+    # the share of updated bugs); terms only the delta has use the delta's idf
+    got, want = index.search("wishlist sync", 3), rebuilt.search("wishlist sync", 3)
+    assert [score for _, score in got] == pytest.approx([score for _, score in want], rel=0.05)
+
+
+def test_decisive_lexical_match_skips_embedding(monkeypatch):
+    def no_embedding(texts):
+        raise AssertionError("fast path must not embed")
+
+    monkeypatch.setattr(retrieval, "embed_queries", no_embedding)
+    [hit] = retrieval.retrieve(make_store(), ["Login fails with invalid token 401 after relaunch"], top_k=3)
+
+    assert hit.mode == "lexical" and hit.query_embedding is None
+    assert hit.results["ids"][0][0] == "BUG-1002"
+    assert hit.results["distances"][0] == sorted(hit.results["distances"][0])
+    assert not retrieval_is_weak(hit.results)
+    assert "BUG_ID: BUG-1002" in build_llm_context(hit.results)
+
+
+def test_lexical_fast_path_has_its_own_grounding_bar(monkeypatch):
+    # a decisive but partial match (half the question's terms) would be refused by
+    # the lexical bar, so it is searched densely instead of short-circuiting
+    embedded = []
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: embedded.extend(texts) or [bug_vector(1).tolist() for _ in texts])
+    monkeypatch.setattr(retrieval, "LEXICAL_FAST_PATH_SCORE", 0.5)
+    [hit] = retrieval.retrieve(make_store(), ["token refresh wallet banner crash invalid"], top_k=3)
+
+    assert hit.mode == "hybrid" and embedded
+    assert hit.results["ids"][0][0] == "BUG-1002"
+    assert retrieval.max_distance("lexical", 0.55) == retrieval.LEXICAL_MAX_DISTANCE
+    assert retrieval.max_distance("hybrid", 0.55) == 0.55
+
+
+def test_near_exact_lexical_match_is_not_refused(monkeypatch):
+    # every term matches but the bug is longer than average: score ~0.998, just
+    # under the lexical grounding bar -> hybrid, graded on cosine distance
+    question = "Refund status not updated after cancellation on android"
+    store = make_store()
+    assert 0.8 < store.lexical_index.search(question, 1)[0][1] < retrieval.LEXICAL_GROUNDING_SCORE
+
+    target = next(i for i, b in enumerate(BUGS) if b["id"] == "BUG-1009")
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: [bug_vector(target).tolist() for _ in texts])
+    [hit] = retrieval.retrieve(store, [question], top_k=3)
+
+    assert hit.mode == "hybrid" and hit.results["ids"][0][0] == "BUG-1009"
+    assert not retrieval_is_weak(hit.results, max_dist_threshold=retrieval.max_distance(hit.mode, 0.55))
+
+
+def test_hybrid_fuses_dense_and_lexical(monkeypatch):
+    # the dense side points at BUG-1010; BM25 finds the iOS 17 checkout bug
+    dense_target = 9
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: [bug_vector(dense_target).tolist() for _ in texts])
+    monkeypatch.setattr(retrieval, "LEXICAL_FAST_PATH_SCORE", 100.0)
+
+    [hit] = retrieval.retrieve(make_store(), ["checkout on ios"], top_k=3)
+    ids = hit.results["ids"][0]
+    distances = dict(zip(ids, hit.results["distances"][0]))
+
+    assert hit.mode == "hybrid" and len(ids) == 3
+    assert BUGS[dense_target]["id"] in ids and "BUG-1001" in ids
+    assert distances[BUGS[dense_target]["id"]] == pytest.approx(0.0, abs=1e-6)
+    assert distances["BUG-1001"] == pytest.approx(1.0, abs=1e-6)  # orthogonal vector, scored by cosine
+    assert [m["component"] for m in hit.results["metadatas"][0]] == [
+        next(b["component"] for b in BUGS if b["id"] == i) for i in ids
+    ]
+
+
+def test_lexical_only_hits_use_the_collection_distance_space(monkeypatch):
+    # BUG-1001 comes only from BM25: its distance is computed locally and must be
+    # in the collection's space, not cosine, to be graded alongside dense hits
+    query = 2 * bug_vector(9) - 0.5 * bug_vector(0)  # BUG-1001 (row 0) ranks last densely
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: [query.tolist() for _ in texts])
+    monkeypatch.setattr(retrieval, "LEXICAL_FAST_PATH_SCORE", 100.0)
+    monkeypatch.setattr(retrieval, "HYBRID_CANDIDATES", 3)
+    monkeypatch.setattr(retrieval, "PASSAGE_OVERSAMPLE", 1)
+    store = make_store()
+    store.metadata = {"hnsw:space": "l2"}
+
+    [hit] = retrieval.retrieve(store, ["checkout on ios"], top_k=3)
+    distances = dict(zip(hit.results["ids"][0], hit.results["distances"][0]))
+    assert distances["BUG-1001"] == pytest.approx(6.25, abs=1e-5)  # |q - e_0|^2: squared l2, like Chroma
+
+
+def test_dense_only_without_lexical_index(monkeypatch):
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: [bug_vector(4).tolist() for _ in texts])
+    store = make_store()
+    del store.lexical_index
+
+    hits = retrieval.retrieve(store, ["anything", "else"], top_k=2)
+    assert [h.mode for h in hits] == ["dense", "dense"]
+    assert [len(h.results["ids"][0]) for h in hits] == [2, 2]
+    assert hits[0].results["ids"][0][0] == BUGS[4]["id"]
+
+
+def test_where_filter_restricts_both_retrievers(monkeypatch):
+    # dense side points at BUG-1010 (Checkout); the filter only allows Payments
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: [bug_vector(9).tolist() for _ in texts])
+    monkeypatch.setattr(retrieval, "LEXICAL_FAST_PATH_SCORE", 100.0)
+    where = {"$and": [{"component": "Payments"}, {"closed_date": {"$ne": "OPEN"}}]}
+
+    [hit] = retrieval.retrieve(make_store(), ["apple pay order pending"], top_k=3, wheres=[where])
+    allowed = {b["id"] for b in BUGS if b["component"] == "Payments" and b["closed_date"]}
+
+    assert hit.where == where
+    assert hit.results["ids"][0] and set(hit.results["ids"][0]) <= allowed
+
+
+def test_lexical_mask_matches_vector_store_filter():
+    store = make_store()
+    for where in (
+        {"component": "Checkout"},
+        {"severity": {"$in": ["P0", "P1"]}},
+        {"$or": [{"component": "Auth"}, {"closed_date": "OPEN"}]},
+        {"component": {"$nin": ["Payments", "Orders"]}},
+    ):
+        lexical_ids = {store.lexical_index.ids[r] for r in store.lexical_index.where_mask(where).nonzero()[0]}
+        assert lexical_ids == set(store.get(where=where, include=[])["ids"])
+
+
+def test_filter_without_matches_falls_back_to_all_bugs(monkeypatch):
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: [bug_vector(4).tolist() for _ in texts])
+    store = make_store()
+    del store.lexical_index
+
+    hits = retrieval.retrieve(store, ["anything", "else"], top_k=2, wheres=[{"component": "Nowhere"}, {"component": "Auth"}])
+    assert hits[0].where is None and hits[0].results["ids"][0][0] == BUGS[4]["id"]
+    assert hits[1].where == {"component": "Auth"}
+    assert {m["component"] for m in hits[1].results["metadatas"][0]} == {"Auth"}
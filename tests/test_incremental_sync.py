@@ -0,0 +1,99 @@
+# tests/test_incremental_sync.py
+
+import os
+import sys
+
+import numpy as np
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag import chroma_store  # noqa: E402
+from qa_rag.chroma_store import delete_missing_bugs, existing_fingerprints, sync_bug_chunk  # noqa: E402
+
+
+class FakeCollection:
+    """
+    The slice of the Chroma collection API the sync uses (get / upsert / delete).
+    """
+
+    def __init__(self):
+        self.rows: dict[str, dict] = {}
+        self.upserted: list[str] = []
+        self.deleted: list[str] = []
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, ids=None, include=None, limit=None, offset=0):
+        keys = list(self.rows)[offset:offset + limit if limit else None]
+        return {"ids": keys, "metadatas": [self.rows[k]["metadata"] for k in keys]}
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        for i, doc, emb, meta in zip(ids, documents, embeddings, metadatas):
+            self.rows[i] = {"document": doc, "embedding": emb, "metadata": meta}
+        self.upserted.extend(ids)
+
+    def delete(self, ids):
+        for i in ids:
+            self.rows.pop(i, None)
+        self.deleted.extend(ids)
+
+
+def bug(bug_id: str, text: str = "Checkout button stays disabled", closed=None) -> dict:
+    return {
+        "id": bug_id, "title": f"Title {bug_id}", "component": "Checkout", "severity": "P2",
+        "created_date": "2025-01-01", "closed_date": closed, "text": text,
+    }
+
+
+def sync(collection, bugs):
+    stored = existing_fingerprints(collection) if collection.count() > 0 else {}
+    seen: set[str] = set()
+    changed = sync_bug_chunk(collection, bugs, stored, seen)
+    deleted = delete_missing_bugs(collection, stored, seen)
+    return changed, deleted
+
+
+def test_only_new_and_changed_bugs_are_encoded(monkeypatch):
+    encoded: list[str] = []
+
+    def fake_embed(texts):
+        encoded.extend(texts)
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    monkeypatch.setattr(chroma_store, "embed_documents", fake_embed)
+    collection = FakeCollection()
+
+    assert sync(collection, [bug("BUG-1"), bug("BUG-2"), bug("BUG-3")]) == (3, 0)
+    assert len(encoded) == 3
+
+    # same data -> no encode, no writes
+    encoded.clear()
+    collection.upserted.clear()
+    assert sync(collection, [bug("BUG-1"), bug("BUG-2"), bug("BUG-3")]) == (0, 0)
+    assert encoded == [] and collection.upserted == []
+
+    # BUG-1 unchanged, BUG-2 closed (metadata change), BUG-3 gone, BUG-4 new
+    changed, deleted = sync(collection, [bug("BUG-1"), bug("BUG-2", closed="2025-02-01"), bug("BUG-4")])
+    assert (changed, deleted) == (2, 1)
+    assert collection.upserted == ["BUG-2", "BUG-4"]
+    assert collection.deleted == ["BUG-3"]
+    assert len(encoded) == 2 and all("BUG-1 " not in t for t in encoded)
+    assert sorted(collection.rows) == ["BUG-1", "BUG-2", "BUG-4"]
+    assert collection.rows["BUG-2"]["metadata"]["closed_date"] == "2025-02-01"
+
+
+def test_vectors_without_fingerprint_are_refreshed_once(monkeypatch):
+    monkeypatch.setattr(chroma_store, "embed_documents", lambda texts: np.ones((len(texts), 2), dtype=np.float32))
+    collection = FakeCollection()
+    collection.rows["BUG-1"] = {"document": "old", "embedding": [0.0, 0.0], "metadata": {"component": "Checkout"}}
+
+    assert sync(collection, [bug("BUG-1")]) == (1, 0)
+    assert sync(collection, [bug("BUG-1")]) == (0, 0)
@@ -0,0 +1,25 @@
+# tests/test_ingest.py
+
+import os
+import sys
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.data import iter_bug_chunks, load_bugs_from_csv
+
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "bugs_sample_20.csv")
+
+
+def test_chunks_are_bounded_and_cover_csv():
+    chunks = list(iter_bug_chunks(CSV_PATH, chunk_size=6))
+
+    assert [len(c) for c in chunks] == [6, 6, 6, 2]
+    assert [b for c in chunks for b in c] == load_bugs_from_csv(CSV_PATH)
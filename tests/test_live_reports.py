@@ -0,0 +1,119 @@
+# tests/test_live_reports.py
+
+import os
+import sys
+
+import pandas as pd
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.app import apply_bug_events, answer_question, build_state_from_csv_or_memory, upsert_bugs
+from qa_rag.data import load_bugs_from_csv
+from qa_rag.analytics import bugs_to_df, analytics_reports
+from qa_rag.live_reports import LiveReports
+
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "bugs_sample_20.csv")
+
+
+def assert_reports_equal(live: LiveReports, bugs: list[dict]):
+    expected = analytics_reports(bugs_to_df(bugs))
+    got = live.reports()
+
+    for name, a, b in zip(["open_by_component", "resolution", "open_critical", "open_critical_by_component"], got, expected):
+        if name == "open_critical":
+            assert a["id"].tolist() == b["id"].tolist(), name
+            continue
+        pd.testing.assert_frame_equal(
+            a.reset_index(drop=True), b.reset_index(drop=True),
+            check_dtype=False, check_exact=False, obj=name,
+        )
+
+
+def test_initial_reports_match_full_recompute():
+    bugs = load_bugs_from_csv(CSV_PATH)
+    live = LiveReports.from_df(bugs_to_df(bugs))
+
+    assert_reports_equal(live, bugs)
+
+
+def test_events_match_full_recompute():
+    bugs = load_bugs_from_csv(CSV_PATH)
+    live = LiveReports.from_df(bugs_to_df(bugs))
+    by_id = {b["id"]: b for b in bugs}
+
+    new_bug = {
+        "id": "BUG-2001", "title": "Wallet crash", "component": "Payments", "severity": "P0",
+        "created_date": "2025-12-01", "closed_date": None, "text": "Crash on wallet screen",
+    }
+    events = [
+        {"type": "insert", "bug": new_bug},
+        {"type": "close", "id": "BUG-1005", "closed_date": "2025-12-28"},
+        {"type": "reopen", "id": "BUG-1002"},
+        {"type": "update", "id": "BUG-1003", "component": "Checkout", "severity": "P0"},
+        {"type": "close", "id": "BUG-2001", "closed_date": "2025-12-04"},
+    ]
+    for event in events:
+        live.apply(event)
+
+    bugs.append(dict(new_bug))
+    by_id["BUG-2001"] = bugs[-1]
+    by_id["BUG-1005"]["closed_date"] = "2025-12-28"
+    by_id["BUG-1002"]["closed_date"] = None
+    by_id["BUG-1003"].update(component="Checkout", severity="P0")
+    by_id["BUG-2001"]["closed_date"] = "2025-12-04"
+
+    assert_reports_equal(live, bugs)
+
+
+def test_state_serves_reports_after_events():
+    state = build_state_from_csv_or_memory(bugs_in_memory=[], CSV_PATH=CSV_PATH)
+    question = "How many open bugs for Checkout?"
+    before = answer_question(state, question, echo=False).tables["open_by_component"]["open_bugs"].iloc[0]
+
+    new_bug = {
+        "id": "BUG-2002", "title": "Promo code ignored", "component": "Checkout", "severity": "P0",
+        "created_date": "2025-12-20", "closed_date": None, "text": "Promo code not applied",
+    }
+    apply_bug_events(state, [{"type": "insert", "bug": new_bug}])
+
+    after = answer_question(state, question, echo=False).tables["open_by_component"]["open_bugs"].iloc[0]
+    assert after == before + 1
+    assert "BUG-2002" in state.open_critical["id"].tolist()
+
+
+def test_case_variant_upsert_replaces_the_same_bug():
+    bugs = load_bugs_from_csv(CSV_PATH)
+    state = build_state_from_csv_or_memory(bugs_in_memory=[], CSV_PATH=CSV_PATH)
+    critical = next(b for b in bugs if b["severity"] == "P0" and not b["closed_date"])
+
+    upsert_bugs(state, [dict(critical, id=critical["id"].lower(), component="Wallet")])
+
+    expected = [dict(critical, component="Wallet") if b["id"] == critical["id"] else b for b in bugs]
+    assert_reports_equal(state.live_reports, expected)
+    assert state.open_critical["id"].tolist().count(critical["id"]) == 1
+
+    live = LiveReports.from_df(bugs_to_df(bugs))
+    live.close(critical["id"].lower(), "2025-12-30")
+    assert critical["id"] not in live.open_critical()["id"].tolist()
+
+
+def test_events_leave_report_frames_for_the_next_read(monkeypatch):
+    state = build_state_from_csv_or_memory(bugs_in_memory=[], CSV_PATH=CSV_PATH)
+    built = []
+    reports = LiveReports.reports
+    monkeypatch.setattr(LiveReports, "reports", lambda self: built.append(1) or reports(self))
+
+    close = {"type": "close", "id": "BUG-1001", "closed_date": "2025-12-30"}
+    for event in (close, {"type": "reopen", "id": "BUG-1001"}, close):
+        apply_bug_events(state, [event])
+    assert built == []
+    assert "BUG-1001" not in state.open_critical["id"].tolist()
+    assert_reports_equal(state.live_reports, list(state.store))
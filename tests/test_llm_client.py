@@ -0,0 +1,131 @@
+# tests/test_llm_client.py
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag import llm  # noqa: E402
+from qa_rag.response_cache import ResponseCache  # noqa: E402
+
+
+class ChatHandler(BaseHTTPRequestHandler):
+    """
+    Minimal OpenAI-compatible /chat/completions endpoint; records the client port
+    of every request (one port per TCP connection).
+    """
+    protocol_version = "HTTP/1.1"
+    ports: list[int] = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        ChatHandler.ports.append(self.client_address[1])
+        if body.get("stream"):
+            self.send_stream(body)
+            return
+        payload = json.dumps({
+            "id": "x",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok BUG-1"}}],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_stream(self, body):
+        events = []
+        for piece in ["ok ", "BUG-", "1"]:
+            events.append("data: " + json.dumps({
+                "id": "x",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": None, "delta": {"content": piece}}],
+            }) + "\n\n")
+        events.append("data: [DONE]\n\n")
+        payload = "".join(events).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_registry_returns_one_client_per_key():
+    llm.close_llm_clients()
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(llm.get_llm_client("http://a/v1", "k", "m")))
+        for _ in range(16)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(c) for c in clients}) == 1
+    assert llm.get_llm_client("http://a/v1", "k", "other") is not clients[0]
+    llm.close_llm_clients()
+
+
+def test_generate_reuses_pooled_connection(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ChatHandler.ports = []
+
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.delenv("GROQ_MODEL", raising=False)
+    monkeypatch.setattr(llm, "GROQ_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(llm, "get_response_cache", lambda: None)
+    llm.close_llm_clients()
+    try:
+        answers = [llm.ollama_generate("q", MODEL="m") for _ in range(5)]
+    finally:
+        llm.close_llm_clients()
+        server.shutdown()
+        server.server_close()
+
+    assert answers == ["ok BUG-1"] * 5
+    assert len(ChatHandler.ports) == 5
+    assert len(set(ChatHandler.ports)) == 1
+
+
+def test_generate_stream_yields_pieces_and_fills_cache(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ChatHandler.ports = []
+    cache = ResponseCache(max_entries=8, ttl=60)
+
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.delenv("GROQ_MODEL", raising=False)
+    monkeypatch.setattr(llm, "GROQ_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(llm, "get_response_cache", lambda: cache)
+    llm.close_llm_clients()
+    try:
+        streamed = list(llm.ollama_generate_stream("q", MODEL="m"))
+        again = list(llm.ollama_generate_stream("q", MODEL="m"))
+    finally:
+        llm.close_llm_clients()
+        server.shutdown()
+        server.server_close()
+
+    assert streamed == ["ok ", "BUG-", "1"]
+    assert again == ["ok BUG-1"]  # served from the cache in one piece
+    assert len(ChatHandler.ports) == 1
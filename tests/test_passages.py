@@ -0,0 +1,112 @@
+# tests/test_passages.py
+
+import os
+import sys
+
+import numpy as np
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag import chroma_store, retrieval  # noqa: E402
+from qa_rag.chroma_store import bug_passages, bug_to_text, delete_missing_bugs, sync_bug_chunk  # noqa: E402
+from qa_rag.llm import build_llm_context  # noqa: E402
+from qa_rag.vector_store import NumpyVectorStore  # noqa: E402
+
+
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot"]
+
+
+def long_bug(bug_id: str = "BUG-2001", n_words: int = 400, tail: str = "") -> dict:
+    words = [WORDS[i % len(WORDS)] + str(i) for i in range(n_words)]
+    return {
+        "id": bug_id, "title": "Crash on resume", "component": "Checkout", "severity": "P1",
+        "created_date": "2025-01-01", "closed_date": None, "text": " ".join(words) + tail,
+    }
+
+
+def fake_embed(texts):
+    # "segfault" in the text points the vector at axis 0, everything else at axis 1
+    return np.array([[1.0, 0.0] if "segfault" in t else [0.0, 1.0] for t in texts], dtype=np.float32)
+
+
+def test_short_bug_is_one_unchanged_document():
+    bug = long_bug(n_words=20)
+    assert bug_passages(bug) == [bug_to_text(bug)]
+
+
+def test_long_bug_is_split_into_overlapping_passages(monkeypatch):
+    monkeypatch.setattr(chroma_store, "PASSAGE_WORDS", 100)
+    monkeypatch.setattr(chroma_store, "PASSAGE_OVERLAP", 20)
+    passages = bug_passages(long_bug(n_words=250))
+
+    assert len(passages) == 3
+    assert all(p.startswith("BUG-2001 | P1 | component : Checkout") for p in passages)
+    assert "Details (1/3) : alpha0 " in passages[0] and "Details (3/3) : " in passages[2]
+    # 20 words shared between neighbours; the last word is indexed
+    assert passages[1].split(" : ")[-1].split()[0] == "charlie80"
+    assert passages[2].split()[-1] == "delta249"
+
+
+def test_sync_stores_passages_and_drops_stale_ones(monkeypatch):
+    monkeypatch.setattr(chroma_store, "embed_documents", fake_embed)
+    monkeypatch.setattr(chroma_store, "PASSAGE_WORDS", 100)
+    monkeypatch.setattr(chroma_store, "PASSAGE_OVERLAP", 20)
+    store = NumpyVectorStore()
+
+    seen: set[str] = set()
+    assert sync_bug_chunk(store, [long_bug(n_words=250)], {}, seen) == 1
+    assert sorted(seen) == ["BUG-2001", "BUG-2001#1", "BUG-2001#2"]
+    assert store.get(ids=["BUG-2001#2"])["metadatas"][0]["bug_id"] == "BUG-2001"
+
+    # unchanged -> nothing re-embedded
+    stored = chroma_store.existing_fingerprints(store)
+    assert sync_bug_chunk(store, [long_bug(n_words=250)], stored, set()) == 0
+
+    # shortened to one passage -> the old continuation passages are deleted
+    seen = set()
+    assert sync_bug_chunk(store, [long_bug(n_words=50)], stored, seen) == 1
+    assert delete_missing_bugs(store, stored, seen) == 2
+    assert store.get()["ids"] == ["BUG-2001"]
+
+
+def test_live_update_drops_passages_of_a_shortened_bug(monkeypatch):
+    monkeypatch.setattr(chroma_store, "embed_documents", fake_embed)
+    monkeypatch.setattr(chroma_store, "PASSAGE_WORDS", 100)
+    monkeypatch.setattr(chroma_store, "PASSAGE_OVERLAP", 20)
+    store = NumpyVectorStore()
+    monkeypatch.setattr(chroma_store, "open_vector_store", lambda name, force_rebuild=False: store)
+    short = dict(long_bug("BUG-2002"), text="Login token expires after relaunch")
+    source = [long_bug(n_words=250), short]
+    lazy = chroma_store.LazyCollection("bugs", lambda: iter([list(source)]))
+    lazy.open()
+    assert store.count() == 4
+
+    lazy.sync_bugs([long_bug(n_words=50), dict(short, closed_date="2025-02-01")])
+    assert store.count() == 4  # queued until the next read
+    assert sorted(lazy.get()["ids"]) == ["BUG-2001", "BUG-2002"]
+
+
+def test_query_scores_bug_by_its_best_passage(monkeypatch):
+    monkeypatch.setattr(chroma_store, "embed_documents", fake_embed)
+    monkeypatch.setattr(chroma_store, "PASSAGE_WORDS", 100)
+    monkeypatch.setattr(chroma_store, "PASSAGE_OVERLAP", 20)
+    monkeypatch.setattr(retrieval, "embed_queries", lambda texts: [[1.0, 0.0] for _ in texts])
+    store = NumpyVectorStore()
+    short = dict(long_bug("BUG-2002"), component="Auth", text="Login token expires after relaunch")
+    sync_bug_chunk(store, [long_bug(n_words=250, tail=" then segfault in libpay"), short], {}, set())
+
+    [hit] = retrieval.retrieve(store, ["segfault"], top_k=2)
+    assert hit.results["ids"][0] == ["BUG-2001", "BUG-2002"]
+    assert hit.results["distances"][0][0] < 1e-6  # the tail passage matched
+
+    # only the matched passage goes to the LLM (one header, the tail of the text)
+    context = build_llm_context(hit.results)
+    assert context.count("BUG_ID: BUG-2001") == 1
+    assert "segfault" in context and "alpha0 " not in context
@@ -0,0 +1,58 @@
+# tests/test_query_embeddings.py
+
+import os
+import sys
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+import numpy as np  # noqa: E402
+
+from qa_rag import chroma_store  # noqa: E402
+
+
+class CountingModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.encoded.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts])
+
+
+def test_repeated_queries_skip_the_model(monkeypatch):
+    model = CountingModel()
+    monkeypatch.setattr(chroma_store, "get_embedding_service", lambda: model)
+    chroma_store.clear_query_embeddings()
+
+    first = chroma_store.embed_queries(["apple pay pending", "login loop"])
+    again = chroma_store.embed_queries(["  apple pay   pending ", "crash on start", "crash on start"])
+
+    assert model.encoded == [["apple pay pending", "login loop"], ["crash on start"]]
+    assert again[0] == first[0]
+    assert again[1] == again[2] == [14.0, 1.0]
+
+    chroma_store.embed_queries(["login loop"])
+    assert len(model.encoded) == 2
+    chroma_store.clear_query_embeddings()
+
+
+def test_cache_is_bounded(monkeypatch):
+    model = CountingModel()
+    monkeypatch.setattr(chroma_store, "get_embedding_service", lambda: model)
+    monkeypatch.setattr(chroma_store, "QUERY_EMBED_CACHE_SIZE", 2)
+    chroma_store.clear_query_embeddings()
+
+    chroma_store.embed_queries(["a", "b"])
+    chroma_store.embed_queries(["a"])  # a is now most recent
+    chroma_store.embed_queries(["c"])
+    chroma_store.embed_queries(["a", "b"])
+
+    assert model.encoded == [["a", "b"], ["c"], ["b"]]
+    chroma_store.clear_query_embeddings()
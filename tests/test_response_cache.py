@@ -0,0 +1,88 @@
+# tests/test_response_cache.py
+
+import os
+import sys
+from types import SimpleNamespace
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag import llm, response_cache  # noqa: E402
+from qa_rag.response_cache import ResponseCache, response_key  # noqa: E402
+
+
+def test_key_depends_on_model_temperature_prompt_and_version():
+    base = response_key("m", 0.2, "prompt", "v1")
+    assert base == response_key("m", 0.2, "prompt", "v1")
+    assert base != response_key("m2", 0.2, "prompt", "v1")
+    assert base != response_key("m", 0.7, "prompt", "v1")
+    assert base != response_key("m", 0.2, "prompt!", "v1")
+    assert base != response_key("m", 0.2, "prompt", "v2")
+
+
+def test_lru_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+
+    cache = ResponseCache(max_entries=2, ttl=10)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"  # a is now most recent
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_disk_tier_survives_restart_and_version_change(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+    cache = ResponseCache(max_entries=8, ttl=60, path=path)
+    cache.put("k1", "answer v1", data_version="v1")
+    cache.put("k2", "answer v2", data_version="v2")
+
+    reopened = ResponseCache(max_entries=8, ttl=60, path=path)
+    assert reopened.get("k1") == "answer v1"
+
+    reopened.use_data_version("v2")
+    assert reopened.get("k1") is None
+    assert ResponseCache(max_entries=8, ttl=60, path=path).get("k1") is None
+    assert reopened.get("k2") == "answer v2"
+
+
+def test_disk_tier_keeps_newest_rows(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+    cache = ResponseCache(max_entries=8, ttl=60, path=path, max_disk_entries=3)
+    for i in range(5):
+        cache.put(f"k{i}", f"answer {i}")
+
+    reopened = ResponseCache(max_entries=8, ttl=60, path=path, max_disk_entries=3)
+    assert [reopened.get(f"k{i}") for i in range(5)] == [None, None, "answer 2", "answer 3", "answer 4"]
+
+
+def test_generate_uses_cache(monkeypatch):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"answer {len(calls)}"))])
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(llm, "get_llm_client", lambda *args: fake_client)
+    monkeypatch.setattr(llm, "get_response_cache", lambda: cache)
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.delenv("GROQ_MODEL", raising=False)
+    cache = ResponseCache(max_entries=8, ttl=60)
+
+    assert llm.ollama_generate("p", MODEL="m", data_version="v1") == "answer 1"
+    assert llm.ollama_generate("p", MODEL="m", data_version="v1") == "answer 1"
+    assert llm.ollama_generate("p", MODEL="m", data_version="v2") == "answer 2"
+    assert len(calls) == 2
@@ -0,0 +1,84 @@
+# tests/test_results.py
+
+import os
+import sys
+
+import pandas as pd
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.analytics import analytics_reports  # noqa: E402
+from qa_rag.bug_store import build_bug_store  # noqa: E402
+from qa_rag.data import load_bugs_from_csv  # noqa: E402
+from qa_rag.results import AnswerResult  # noqa: E402
+from qa_rag.router import analytics_dispatch, lookup_dispatch  # noqa: E402
+
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "bugs_sample_20.csv")
+
+
+def test_render_matches_print(capsys):
+    frame = pd.DataFrame({"component": ["Cart"], "open_bugs": [2]})
+
+    result = AnswerResult(question="q")
+    result.say("\n[Router] Route = ANALYTICS\n")
+    result.say("a", 1, None)
+    result.table("open_by_component", frame)
+
+    print("\n[Router] Route = ANALYTICS\n")
+    print("a", 1, None)
+    print(frame.to_string(index=False))
+
+    assert result.render() == capsys.readouterr().out
+    assert result.tables["open_by_component"] is frame
+
+
+def test_dispatch_fills_result_without_printing(capsys):
+    store = build_bug_store(load_bugs_from_csv(CSV_PATH))
+    df = store.frame
+    open_by_component, resolution_by_component, open_critical, open_critical_by_component = analytics_reports(df)
+
+    result = AnswerResult(question="how many open bugs by component?", route="ANALYTICS")
+    analytics_dispatch(result.question, df, open_by_component, resolution_by_component, open_critical, open_critical_by_component, out=result)
+    assert capsys.readouterr().out == ""
+    pd.testing.assert_frame_equal(result.tables["open_by_component"], open_by_component)
+
+    # without `out` the report is printed (CLI behavior) and still returned
+    printed = analytics_dispatch(result.question, df, open_by_component, resolution_by_component, open_critical, open_critical_by_component)
+    assert capsys.readouterr().out == printed.render() == result.render()
+
+    bug_id = df["id"].iloc[0]
+    looked_up = AnswerResult(question=f"details for {bug_id}")
+    lookup_dispatch(looked_up.question, store, out=looked_up)
+    assert looked_up.tables["bugs"]["id"].tolist() == [bug_id]
+    assert f"BUG: {bug_id}" in looked_up.render()
+
+
+def test_count_and_list_results_carry_breakdowns_for_the_ui():
+    store = build_bug_store(load_bugs_from_csv(CSV_PATH))
+    df = store.frame
+    reports = analytics_reports(df)
+
+    def run(question):
+        result = AnswerResult(question=question, route="ANALYTICS")
+        analytics_dispatch(question, df, *reports, out=result)
+        return result
+
+    listed = run("list open bugs for payments")
+    payments_open = df[df["is_open"] & (df["component"] == "Payments")]
+    expected = payments_open["severity"].astype(str).value_counts()
+    got = listed.tables["open_by_severity"].set_index("severity")["open_bugs"]
+    assert got.to_dict() == expected[expected > 0].to_dict()
+    # UI-only tables: the text report does not show them
+    assert "open_by_severity" not in [value for kind, value in listed.blocks if kind == "table"]
+
+    closed = run("how many closed bugs?")
+    assert closed.tables["closed_by_component"]["closed_bugs"].sum() == int((~df["is_open"]).sum())
+    assert closed.tables["closed_by_severity"]["closed_bugs"].sum() == int((~df["is_open"]).sum())
@@ -0,0 +1,97 @@
+# tests/test_router_scan.py
+
+import os
+import sys
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.components import ComponentMatcher  # noqa: E402
+from qa_rag.router import rule_route, scan_question, extract_metric, rag_where  # noqa: E402
+
+
+def test_route_priority():
+    assert rule_route("How many open bugs mention BUG-12?") == "LOOKUP"
+    assert rule_route("How many open bugs by component?") == "ANALYTICS"
+    assert rule_route("Is there a known bug with login?") == "RAG"
+    assert rule_route("Tell me about the login page") is None
+
+
+def test_rag_phrasing_beats_status_words():
+    assert rule_route("is there a known checkout bug still open on Payments") == "RAG"
+    assert rule_route("which bug is critical on checkout?") == "RAG"
+    assert rule_route("show open critical bugs") == "ANALYTICS"
+    assert rule_route("how many known issues are still open?") == "ANALYTICS"
+
+
+def test_list_requests_with_filter_words_stay_analytics():
+    assert rule_route("show closed bugs related to payments") == "ANALYTICS"
+    assert rule_route("list open bugs related to login") == "ANALYTICS"
+    assert rule_route("list critical bugs related to auth") == "ANALYTICS"
+    # list words are whole words here ("playlist" is not a list request)
+    assert rule_route("playlist crash related to open tabs") == "RAG"
+
+
+def test_route_terms_need_word_boundaries():
+    # "sla" inside "translation", "open" inside "reopened"
+    assert rule_route("translation reopened") is None
+    assert rule_route("is there any known bugs") is None
+    assert rule_route("p05 bugs") == "ANALYTICS"
+    assert rule_route("p750 bugs") is None
+
+
+def test_keyword_flags_use_substring_match():
+    intent = scan_question("Show reopened p05 tickets")
+    assert intent.wants_list
+    assert intent.mentions_open
+    assert intent.mentions_critical  # "p0" inside "p05"
+    assert not intent.mentions_closed
+
+
+def test_release_readiness_and_metric():
+    assert scan_question("release readiness please").release_readiness
+    assert scan_question("readiness of the release").release_readiness
+    assert not scan_question("release notes").release_readiness
+
+    assert extract_metric("median and p90 resolution") == "median_days"
+    assert extract_metric("90th percentile") == "p90_days"
+    assert extract_metric("mean time to close") == "avg_days"
+    assert scan_question("time to close").resolution
+    assert extract_metric("time to close") is None
+
+
+def test_rag_where_from_question_entities():
+    matcher = ComponentMatcher(["Checkout", "Orders", "Payments"])
+    assert rag_where("is there a known checkout bug still open on Payments", matcher) == {
+        "$and": [{"component": {"$in": ["Checkout", "Payments"]}}, {"closed_date": "OPEN"}]
+    }
+    assert rag_where("which P1 or critical payments bug was fixed?", matcher) == {
+        "$and": [{"component": "Payments"}, {"severity": {"$in": ["P0", "P1"]}}, {"closed_date": {"$ne": "OPEN"}}]
+    }
+    assert rag_where("checkout crash not yet fixed", matcher) == {"$and": [{"component": "Checkout"}, {"closed_date": "OPEN"}]}
+
+
+def test_rag_where_ignores_incidental_words():
+    matcher = ComponentMatcher(["Checkout", "Orders", "Payments"])
+    assert rag_where("Is there a known bug where Apple Pay succeeds but order stays pending?", matcher) is None
+    assert rag_where("app crashes when I open the cart", matcher) is None
+    assert rag_where("checkout crash", None) is None
+
+
+def test_rag_where_closed_needs_status_phrasing():
+    matcher = ComponentMatcher(["Checkout", "Login", "Payments"])
+    assert rag_where("why does checkout crash after the session is closed", matcher) == {"component": "Checkout"}
+    assert rag_where("is the login timeout fixed by the retry change", matcher) == {"component": "Login"}
+    assert rag_where("payments refund bug already resolved?", matcher) == {
+        "$and": [{"component": "Payments"}, {"closed_date": {"$ne": "OPEN"}}]
+    }
+    assert rag_where("similar to closed issues on login", matcher) == {
+        "$and": [{"component": "Login"}, {"closed_date": {"$ne": "OPEN"}}]
+    }
+    assert rag_where("login bug that hasn't been fixed", matcher) == {"$and": [{"component": "Login"}, {"closed_date": "OPEN"}]}
@@ -0,0 +1,44 @@
+# tests/test_semantic_cache.py
+
+import os
+import sys
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.semantic_cache import SemanticAnswerCache  # noqa: E402
+
+
+def test_match_needs_similarity_same_ids_and_version():
+    cache = SemanticAnswerCache(max_entries=8, threshold=0.9)
+    cache.store("q", [1.0, 0.0], ["BUG-1", "BUG-2"], "answer", ["BUG-1"], data_version="v1")
+
+    hit = cache.lookup([2.0, 0.1], ["BUG-2", "BUG-1"], data_version="v1")  # scale does not matter
+    assert hit is not None and hit.answer == "answer" and hit.used_ids == ["BUG-1"]
+
+    assert cache.lookup([0.6, 0.8], ["BUG-1", "BUG-2"], data_version="v1") is None  # cosine 0.6
+    assert cache.lookup([1.0, 0.0], ["BUG-1"], data_version="v1") is None
+    assert cache.lookup([1.0, 0.0], ["BUG-1", "BUG-2"], data_version="v2") is None
+
+
+def test_lru_eviction_and_version_change():
+    cache = SemanticAnswerCache(max_entries=2, threshold=0.99)
+    cache.store("a", [1.0, 0.0, 0.0], ["A"], "A!", ["A"])
+    cache.store("b", [0.0, 1.0, 0.0], ["B"], "B!", ["B"])
+    assert cache.lookup([1.0, 0.0, 0.0], ["A"]) is not None  # a is now most recent
+    cache.store("c", [0.0, 0.0, 1.0], ["C"], "C!", ["C"])
+
+    assert cache.lookup([0.0, 1.0, 0.0], ["B"]) is None
+    assert cache.lookup([1.0, 0.0, 0.0], ["A"]).answer == "A!"
+    assert cache.lookup([0.0, 0.0, 1.0], ["C"]).answer == "C!"
+
+    cache.store("d", [0.0, 1.0, 0.0], ["D"], "D!", ["D"], data_version="v2")
+    cache.use_data_version("v2")
+    assert len(cache) == 1
+    assert cache.lookup([0.0, 1.0, 0.0], ["D"], data_version="v2").answer == "D!"
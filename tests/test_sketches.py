@@ -0,0 +1,89 @@
+# tests/test_sketches.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.data import load_bugs_from_csv
+from qa_rag.analytics import (
+    bugs_to_df,
+    resolution_time_by_component,
+    resolution_sketches_by_component,
+    merge_resolution_sketches,
+    resolution_frame_from_sketches,
+)
+from qa_rag.sketches import QuantileSketch
+
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "bugs_sample_20.csv")
+
+
+def rank_error(values: np.ndarray, estimate: float, q: float) -> float:
+    return abs(np.searchsorted(np.sort(values), estimate) / len(values) - q)
+
+
+def test_small_sample_is_exact():
+    df = bugs_to_df(load_bugs_from_csv(CSV_PATH))
+
+    exact = resolution_time_by_component(df, use_sketch=False)
+    sketched = resolution_time_by_component(df, use_sketch=True)
+
+    pd.testing.assert_frame_equal(sketched, exact, check_dtype=False)
+
+
+def test_large_stream_has_bounded_rank_error():
+    rng = np.random.default_rng(7)
+    values = rng.lognormal(mean=1.5, sigma=1.0, size=200_000)
+
+    sketch = QuantileSketch()
+    for chunk in np.array_split(values, 50):
+        sketch.update_many(chunk)
+
+    assert sketch.count == len(values)
+    assert sum(len(level) for level in sketch.levels) < 2_000
+    for q in (0.5, 0.75, 0.9):
+        assert rank_error(values, sketch.quantile(q), q) < 0.02
+
+
+def test_merged_windows_match_single_pass():
+    rng = np.random.default_rng(11)
+    a = rng.exponential(5.0, size=50_000)
+    b = rng.exponential(20.0, size=30_000)
+
+    left, right = QuantileSketch(), QuantileSketch()
+    left.update_many(a)
+    right.update_many(b)
+    merged = QuantileSketch.from_dict(left.to_dict()).merge(right)
+
+    both = np.concatenate([a, b])
+    assert merged.count == len(both)
+    assert abs(merged.mean - both.mean()) < 1e-6
+    for q in (0.5, 0.9):
+        assert rank_error(both, merged.quantile(q), q) < 0.02
+
+
+def test_per_component_sketches_merge_across_datasets():
+    df = bugs_to_df(load_bugs_from_csv(CSV_PATH))
+    half = len(df) // 2
+
+    merged = merge_resolution_sketches(
+        resolution_sketches_by_component(df.iloc[:half]),
+        resolution_sketches_by_component(df.iloc[half:]),
+    )
+
+    pd.testing.assert_frame_equal(
+        resolution_frame_from_sketches(merged),
+        resolution_time_by_component(df, use_sketch=False),
+        check_dtype=False,
+    )
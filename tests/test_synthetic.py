@@ -0,0 +1,47 @@
+# tests/test_synthetic.py
+
+import os
+import sys
+from collections import Counter
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.data import load_bugs_from_csv  # noqa: E402
+from qa_rag.synthetic import CSV_COLUMNS, iter_synthetic_bugs, main  # noqa: E402
+
+
+def test_same_seed_same_file(tmp_path):
+    paths = [tmp_path / "a.csv", tmp_path / "b.csv", tmp_path / "c.csv"]
+    for path, seed in zip(paths, [7, 7, 8]):
+        assert main(["--rows", "500", "--seed", str(seed), "--out", str(path)]) == 0
+    assert paths[0].read_bytes() == paths[1].read_bytes()
+    assert paths[0].read_bytes() != paths[2].read_bytes()
+
+
+def test_csv_round_trips_through_ingest(tmp_path):
+    path = tmp_path / "bugs.csv"
+    main(["--rows", "300", "--seed", "1", "--out", str(path)])
+    assert path.read_text(encoding="utf-8").splitlines()[0] == ",".join(CSV_COLUMNS)
+    assert load_bugs_from_csv(str(path)) == list(iter_synthetic_bugs(300, seed=1))
+
+
+def test_distributions_are_skewed_and_mixed():
+    bugs = list(iter_synthetic_bugs(5000, seed=3))
+    components = Counter(b["component"] for b in bugs).most_common()
+    severities = Counter(b["severity"] for b in bugs)
+    open_share = sum(b["closed_date"] is None for b in bugs) / len(bugs)
+    words = sorted(len(b["text"].split()) for b in bugs)
+
+    assert components[0][1] > 10 * components[-1][1]
+    assert severities["P2"] > severities["P1"] > severities["P0"] > 0
+    assert 0.1 < open_share < 0.4
+    assert all(b["closed_date"] is None or b["closed_date"] > b["created_date"] for b in bugs)
+    assert words[-1] > 10 * words[len(words) // 2]  # a long tail (log excerpts)
+    assert sum("Seen again on" in b["text"] for b in bugs) > 0.1 * len(bugs)  # near-duplicates
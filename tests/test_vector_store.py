@@ -0,0 +1,154 @@
+# tests/test_vector_store.py
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# -------------------------
+# Make src/ importable
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from qa_rag.vector_store import NumpyVectorStore, open_vector_store, where_mask  # noqa: E402
+
+
+COMPONENTS = ["Payments", "Auth", "Checkout"]
+
+
+def random_corpus(n: int = 200, dim: int = 16, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    ids = [f"BUG-{1000 + i}" for i in range(n)]
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    metadatas = [
+        {"component": COMPONENTS[i % 3], "severity": f"P{i % 4}", "closed_date": "OPEN" if i % 2 else "2024-01-01"}
+        for i in range(n)
+    ]
+    documents = [f"doc {i}" for i in ids]
+    return ids, vectors, metadatas, documents
+
+
+def brute_force(vectors, query, k, allowed=None):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    dist = 1.0 - unit @ (query / np.linalg.norm(query))
+    if allowed is not None:
+        dist[~allowed] = np.inf
+    order = np.argsort(dist, kind="stable")[:k]
+    return list(order), dist[order]
+
+
+def test_query_matches_brute_force_and_chroma_shape():
+    ids, vectors, metadatas, documents = random_corpus()
+    store = NumpyVectorStore()
+    store.upsert(ids=ids, embeddings=vectors.tolist(), metadatas=metadatas, documents=documents)
+    queries = np.random.default_rng(1).normal(size=(4, 16)).astype(np.float32)
+
+    res = store.query(query_embeddings=queries.tolist(), n_results=5, include=["documents", "metadatas", "distances"])
+    assert res["embeddings"] is None and len(res["ids"]) == 4
+    for n, q in enumerate(queries):
+        order, dist = brute_force(vectors, q, 5)
+        assert res["ids"][n] == [ids[i] for i in order]
+        assert res["documents"][n] == [documents[i] for i in order]
+        assert res["metadatas"][n] == [metadatas[i] for i in order]
+        assert np.allclose(res["distances"][n], dist, atol=1e-5)
+
+
+def test_where_filter():
+    ids, vectors, metadatas, documents = random_corpus()
+    store = NumpyVectorStore()
+    store.upsert(ids=ids, embeddings=vectors, metadatas=metadatas, documents=documents)
+    where = {"$and": [{"component": "Payments"}, {"severity": {"$in": ["P0", "P1"]}}]}
+
+    allowed = where_mask(metadatas, where)
+    assert allowed.sum() == sum(m["component"] == "Payments" and m["severity"] in ("P0", "P1") for m in metadatas)
+
+    res = store.query(query_embeddings=[vectors[0]], n_results=100, where=where)
+    order, _ = brute_force(vectors, vectors[0], int(allowed.sum()), allowed)
+    assert res["ids"][0] == [ids[i] for i in order]
+
+    assert store.get(where={"closed_date": {"$ne": "OPEN"}}, include=[])["ids"] == ids[0::2]
+
+
+def test_upsert_delete_and_paging():
+    ids, vectors, metadatas, documents = random_corpus(n=10, dim=4)
+    store = NumpyVectorStore()
+    store.upsert(ids=ids, embeddings=vectors, metadatas=metadatas, documents=documents)
+    store.upsert(ids=[ids[3]], embeddings=[vectors[9]], metadatas=[{"component": "Auth"}], documents=["new"])
+    store.delete(ids=[ids[0], ids[5], "BUG-404"])
+
+    assert store.count() == 8
+    page = store.get(include=["metadatas"], limit=3, offset=6)
+    assert len(page["ids"]) == 2 and page["documents"] is None
+    everything = store.get(ids=ids)
+    assert sorted(everything["ids"]) == sorted(set(ids) - {ids[0], ids[5]})
+    assert store.get(ids=[ids[3]])["documents"] == ["new"]
+
+    # the updated vector is found under its id, deleted ones are gone
+    res = store.query(query_embeddings=[vectors[9]], n_results=2)
+    assert set(res["ids"][0]) == {ids[3], ids[9]}
+    assert res["distances"][0][0] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        open_vector_store("bugs", backend="faiss")
+
+
+def test_numpy_ranking_matches_chroma(tmp_path, monkeypatch):
+    pytest.importorskip("chromadb")
+    from qa_rag import chroma_store
+
+    monkeypatch.setattr(chroma_store, "CHROMA_PATH", tmp_path)
+    ids, vectors, metadatas, documents = random_corpus()
+    chroma = open_vector_store("parity", backend="chroma")
+    numpy_store = NumpyVectorStore()
+    for store in (chroma, numpy_store):
+        store.upsert(ids=ids, embeddings=vectors.tolist(), metadatas=metadatas, documents=documents)
+
+    queries = np.random.default_rng(3).normal(size=(5, 16)).astype(np.float32).tolist()
+    expected = chroma.query(query_embeddings=queries, n_results=5, where={"component": "Auth"})
+    got = numpy_store.query(query_embeddings=queries, n_results=5, where={"component": "Auth"})
+    assert got["ids"] == expected["ids"]
+    assert np.allclose(got["distances"], expected["distances"], atol=1e-4)
+
+
+def test_chroma_collection_is_cosine_and_honors_force_rebuild(tmp_path, monkeypatch):
+    chromadb = pytest.importorskip("chromadb")
+    from chromadb.config import Settings
+    from qa_rag import chroma_store
+    from qa_rag.vector_store import DISTANCE_SPACE, distance_space
+
+    monkeypatch.setattr(chroma_store, "CHROMA_PATH", tmp_path)
+    ids, vectors, metadatas, documents = random_corpus()
+
+    # a collection persisted in Chroma's default (l2) space, as chromadb < 1.0 made them
+    client = chromadb.PersistentClient(path=str(tmp_path), settings=Settings(anonymized_telemetry=False))
+    legacy = client.create_collection("spaces", embedding_function=None)
+    legacy.upsert(ids=ids, embeddings=vectors.tolist())
+    assert distance_space(legacy) == "l2"
+
+    chroma = open_vector_store("spaces", backend="chroma")
+    assert distance_space(chroma) == DISTANCE_SPACE == "cosine"
+    assert chroma.count() == 0  # rebuilt: vectors come back on the next sync
+
+    chroma.upsert(ids=ids, embeddings=vectors.tolist(), metadatas=metadatas, documents=documents)
+    assert open_vector_store("spaces", backend="chroma").count() == len(ids)
+    assert open_vector_store("spaces", backend="chroma", force_rebuild=True).count() == 0
+    assert distance_space(NumpyVectorStore()) == DISTANCE_SPACE
+
+
+def test_vector_distances_follow_chroma_spaces():
+    from qa_rag.vector_store import vector_distances
+
+    query = [2.0, 0.0]
+    vectors = [[1.0, 0.0], [0.0, 3.0]]
+    assert vector_distances("cosine", query, vectors) == pytest.approx([0.0, 1.0])
+    assert vector_distances("l2", query, vectors) == pytest.approx([1.0, 13.0])
+    assert vector_distances("ip", query, vectors) == pytest.approx([-1.0, 1.0])
+    with pytest.raises(ValueError):
+        vector_distances("hamming", query, vectors)